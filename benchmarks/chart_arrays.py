@@ -0,0 +1,58 @@
+"""Conversion of CoinGecko market_chart prices into the arrays drawn by the chart renderer.
+
+Compares per-point Python conversion, np.asarray on the decoded pairs and market_chart_arrays
+for payloads shaped like the 1d (5-minute), 90d (hourly) and 365d (daily) responses.
+
+Usage:
+    uv run python -m benchmarks.chart_arrays [--number 500]
+"""
+
+import argparse
+import json
+import random
+import timeit
+from datetime import UTC, datetime
+
+import numpy as np
+
+from src.utils.chart_render import market_chart_arrays
+
+# Points CoinGecko returns for each period and their spacing in milliseconds
+PAYLOADS = {"1d": (288, 300_000), "90d": (2160, 3_600_000), "365d": (366, 86_400_000)}
+
+
+def make_prices(points: int, step_ms: int, rng: random.Random) -> list[list[float]]:
+    """Build the "prices" of a market_chart response, decoded from JSON like fetch_url does."""
+    start = 1_760_000_000_000
+    payload = {"prices": [[start + i * step_ms, rng.uniform(60_000, 70_000)] for i in range(points)]}
+    return json.loads(json.dumps(payload))["prices"]
+
+
+def python_lists(prices: list[list[float]]) -> tuple[list[datetime], list[float]]:
+    return [datetime.fromtimestamp(p[0] / 1000, UTC) for p in prices], [p[1] for p in prices]
+
+
+def numpy_asarray(prices: list[list[float]]) -> tuple[np.ndarray, np.ndarray]:
+    pairs = np.asarray(prices, dtype=np.float64)
+    return pairs[:, 0].astype("datetime64[ms]"), pairs[:, 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for period, (points, step_ms) in PAYLOADS.items():
+        prices = make_prices(points, step_ms, rng)
+        for name, convert in (
+            ("python lists", python_lists),
+            ("np.asarray", numpy_asarray),
+            ("market_chart_arrays", market_chart_arrays),
+        ):
+            seconds = timeit.timeit(lambda f=convert, p=prices: f(p), number=args.number) / args.number
+            print(f"{period:<5} {points:>5} points  {name:<20} {seconds * 1e6:>9.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
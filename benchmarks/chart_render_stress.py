@@ -0,0 +1,65 @@
+"""Render thousands of charts concurrently in threads and check that resident memory stays flat.
+
+Exits with status 1 if memory grew by more than --max-growth-mb between the first and last
+quarter of the run.
+
+Usage:
+    uv run python -m benchmarks.chart_render_stress [--charts 2000] [--threads 8] [--max-growth-mb 20]
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.utils.chart_render import render_chart, warm_up
+
+PERIODS = ("1", "7", "30", "90", "365")
+
+
+def rss_mb() -> float:
+    """Current resident set size, from /proc where available, else the peak."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def render(i: int) -> int:
+    points = 288 if i % 5 == 0 else 720
+    times = np.datetime64("2026-01-01T00:00:00") + np.arange(points) * np.timedelta64(300, "s")
+    prices = 100 + np.cumsum(np.random.default_rng(i).normal(size=points))
+    period = PERIODS[i % len(PERIODS)]
+    return len(render_chart(times, prices, f"Coin {i}", f"{period} days chart", ("dark", "light")[i % 2], period))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--charts", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--max-growth-mb", type=float, default=20.0)
+    args = parser.parse_args()
+
+    warm_up()
+    quarter = max(args.charts // 4, 1)
+    samples = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        for done, _ in enumerate(executor.map(render, range(args.charts)), 1):
+            if done % quarter == 0:
+                samples.append(rss_mb())
+                print(f"{done:>6} charts  rss {samples[-1]:8.1f} MB")
+    seconds = time.perf_counter() - started
+    growth = samples[-1] - samples[0]
+    print(f"{args.charts / seconds:.1f} charts/s with {args.threads} threads, rss growth {growth:+.1f} MB")
+    if growth > args.max_growth_mb:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
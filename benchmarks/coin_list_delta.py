@@ -0,0 +1,48 @@
+"""Coin list refresh with a few changed coins: full rebuild vs. diff and incremental update.
+
+Usage:
+    uv run python -m benchmarks.coin_list_delta [--coins 17000] [--changes 20]
+"""
+
+import argparse
+import random
+import timeit
+
+from src.models import CoinInfo, CoinRegistry
+from src.utils.search import SymbolSearchIndex
+
+
+def make_coins(coins: int, rng: random.Random) -> list[CoinInfo]:
+    return [CoinInfo(f"coin-{i}", f"s{rng.randrange(coins * 4 // 5)}", f"Coin {i}") for i in range(coins)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coins", type=int, default=17_000)
+    parser.add_argument("--changes", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    old = make_coins(args.coins, rng)
+    new = old.copy()
+    for _ in range(args.changes // 2):
+        new.pop(rng.randrange(len(new)))
+    new += [CoinInfo(f"new-{i}", f"n{i}", f"New {i}") for i in range(args.changes - args.changes // 2)]
+
+    registry = CoinRegistry(old)
+    index = SymbolSearchIndex(registry)
+
+    def rebuild() -> None:
+        SymbolSearchIndex(CoinRegistry(new))
+
+    def incremental() -> None:
+        delta = registry.diff(new)
+        index.update(registry.update(delta), delta)
+
+    for name, run in (("full rebuild", rebuild), ("diff + update", incremental)):
+        seconds = timeit.timeit(run, number=5) / 5
+        print(f"{name:<14} {seconds * 1000:>8.2f} ms per refresh ({args.changes} of {args.coins} coins changed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Peak memory of CoinGecko coins/list ingestion: buffered decode vs. streaming decode.
+
+Each variant runs in a fresh interpreter so peak RSS is not shared between them.
+
+Usage:
+    uv run python -m benchmarks.coin_list_memory [--coins 17000]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tracemalloc
+from collections.abc import Iterator
+
+from src.utils.jsonstream import JSONArrayStream
+
+CHUNK_SIZE = 16 * 1024
+EXCLUDED = ["-wormhole", "bridged-", "-peg", "binance-peg", "heco-peg"]
+
+
+def payload_chunks(coins: int) -> Iterator[bytes]:
+    """Generate a synthetic coins/list body in network-sized chunks without materializing it."""
+    buffer = ["["]
+    size = 1
+    for i in range(coins):
+        prefix = "bridged-" if i % 20 == 0 else ""
+        item = json.dumps({"id": f"{prefix}coin-{i}-token", "symbol": f"c{i % 5000}", "name": f"Coin Number {i}"})
+        buffer.append(("," if i else "") + item)
+        size += len(item) + 1
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    buffer.append("]")
+    yield "".join(buffer).encode()
+
+
+def buffered(coins: int) -> int:
+    content = b"".join(payload_chunks(coins))
+    coin_list = json.loads(content)
+    coin_list = [crypto for crypto in coin_list if all(excluded not in crypto["id"] for excluded in EXCLUDED)]
+    return len(coin_list)
+
+
+def streaming(coins: int) -> int:
+    parser = JSONArrayStream()
+    coin_list = []
+    for chunk in payload_chunks(coins):
+        for crypto in parser.feed(chunk.decode()):
+            if all(excluded not in crypto["id"] for excluded in EXCLUDED):
+                coin_list.append(crypto)
+    parser.close()
+    return len(coin_list)
+
+
+VARIANTS = {"buffered": buffered, "streaming": streaming}
+
+
+def run_variant(name: str, coins: int) -> None:
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    kept = VARIANTS[name](coins)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_delta = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss
+    print(json.dumps({"variant": name, "kept": kept, "traced_peak_kb": peak // 1024, "rss_delta_kb": rss_delta}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coins", type=int, default=17_000)
+    parser.add_argument("--variant", choices=VARIANTS)
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args.variant, args.coins)
+        return
+
+    print(f"{'variant':<10} {'kept':>7} {'traced peak':>12} {'peak RSS Δ':>11}")
+    for name in VARIANTS:
+        command = [sys.executable, "-m", "benchmarks.coin_list_memory", "--variant", name, "--coins", str(args.coins)]
+        result = json.loads(subprocess.run(command, capture_output=True, text=True, check=True).stdout)
+        print(f"{name:<10} {result['kept']:>7} {result['traced_peak_kb']:>9} KB {result['rss_delta_kb']:>8} KB")
+
+
+if __name__ == "__main__":
+    main()
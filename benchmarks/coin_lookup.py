@@ -0,0 +1,59 @@
+"""Symbol and id resolution over the CoinGecko coin list: linear scan vs. CoinRegistry.
+
+Usage:
+    uv run python -m benchmarks.coin_lookup [--coins 17000] [--lookups 2000]
+"""
+
+import argparse
+import random
+import timeit
+
+from src.models import CoinRegistry
+
+
+def make_coin_list(coins: int) -> list[dict]:
+    """Build a synthetic coins/list with a realistic share of duplicated symbols."""
+    return [{"id": f"coin-{i}", "symbol": f"s{i % (coins * 4 // 5)}", "name": f"Coin {i}"} for i in range(coins)]
+
+
+def scan_ids(coin_list: list[dict], symbol: str) -> list[str]:
+    return [crypto["id"] for crypto in coin_list if crypto["symbol"] == symbol]
+
+
+def scan_info(coin_list: list[dict], coin_id: str) -> tuple[str, str] | None:
+    for crypto in coin_list:
+        if crypto["id"] == coin_id:
+            return crypto["name"], crypto["symbol"]
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coins", type=int, default=17_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args()
+
+    coin_list = make_coin_list(args.coins)
+    rng = random.Random(0)
+    targets = [rng.choice(coin_list) for _ in range(args.lookups)]
+    symbols = [crypto["symbol"] for crypto in targets]
+    ids = [crypto["id"] for crypto in targets]
+
+    build_seconds = timeit.timeit(lambda: CoinRegistry.from_dicts(coin_list), number=5) / 5
+    registry = CoinRegistry.from_dicts(coin_list)
+    assert all(registry.ids_for_symbol(symbol) == scan_ids(coin_list, symbol) for symbol in symbols[:50])
+
+    results = {
+        "symbol -> ids (scan)": timeit.timeit(lambda: [scan_ids(coin_list, sym) for sym in symbols], number=1),
+        "symbol -> ids (index)": timeit.timeit(lambda: [registry.ids_for_symbol(sym) for sym in symbols], number=1),
+        "id -> info (scan)": timeit.timeit(lambda: [scan_info(coin_list, coin_id) for coin_id in ids], number=1),
+        "id -> info (index)": timeit.timeit(lambda: [registry.get(coin_id) for coin_id in ids], number=1),
+    }
+
+    print(f"registry build: {build_seconds * 1000:.1f} ms for {args.coins} coins")
+    for name, seconds in results.items():
+        print(f"{name:<22} {seconds / args.lookups * 1e6:>10.2f} µs/lookup")
+
+
+if __name__ == "__main__":
+    main()
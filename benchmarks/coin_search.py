@@ -0,0 +1,66 @@
+"""Prefix and typo search over the CoinGecko symbols: linear scan vs. SymbolSearchIndex.
+
+Usage:
+    uv run python -m benchmarks.coin_search [--coins 15000] [--queries 2000]
+"""
+
+import argparse
+import random
+import string
+import timeit
+import tracemalloc
+
+from src.models import CoinRegistry
+from src.utils.search import SymbolSearchIndex, _one_edit_apart
+
+
+def make_registry(coins: int, rng: random.Random) -> CoinRegistry:
+    """Build a synthetic coins/list with 2-6 letter symbols, some of them shared."""
+    symbols = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 6))) for _ in range(coins * 4 // 5)]
+    return CoinRegistry.from_dicts(
+        {"id": f"coin-{i}", "symbol": symbols[i % len(symbols)], "name": f"Coin {i}"} for i in range(coins)
+    )
+
+
+def typo(symbol: str, rng: random.Random) -> str:
+    i = rng.randrange(len(symbol))
+    return symbol[:i] + rng.choice(string.ascii_lowercase) + symbol[i + 1 :]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coins", type=int, default=15_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    registry = make_registry(args.coins, rng)
+    symbols = sorted({coin.symbol for coin in registry})
+    prefixes = [rng.choice(symbols)[: rng.randint(1, 3)] for _ in range(args.queries)]
+    typos = [typo(rng.choice(symbols), rng) for _ in range(args.queries)]
+
+    build_seconds = timeit.timeit(lambda: SymbolSearchIndex(registry), number=3) / 3
+    tracemalloc.start()
+    index = SymbolSearchIndex(registry)
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    for query in typos[:50]:
+        expected = {symbol for symbol in symbols if _one_edit_apart(query, symbol)}
+        assert set(index.similar(query, limit=len(symbols))) == expected
+
+    results = {
+        "prefix (scan)": lambda: [[s for s in symbols if s.startswith(p)][:10] for p in prefixes],
+        "prefix (index)": lambda: [index.complete(p, limit=10) for p in prefixes],
+        "typo (scan)": lambda: [[s for s in symbols if _one_edit_apart(q, s)][:5] for q in typos],
+        "typo (index)": lambda: [index.similar(q, limit=5) for q in typos],
+    }
+
+    print(f"index build: {build_seconds * 1000:.1f} ms, {index_bytes / 1024:.0f} KiB for {len(index)} symbols")
+    for name, run in results.items():
+        seconds = timeit.timeit(run, number=1)
+        print(f"{name:<16} {seconds / args.queries * 1e6:>10.2f} µs/query")
+
+
+if __name__ == "__main__":
+    main()
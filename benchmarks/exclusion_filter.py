@@ -0,0 +1,58 @@
+"""Coin list exclusion filtering: per-pattern substring tests vs. one compiled matcher.
+
+Usage:
+    uv run python -m benchmarks.exclusion_filter [--coins 17000] [--patterns 10 100 1000]
+"""
+
+import argparse
+import random
+import re
+import string
+import timeit
+
+from src.utils.exclusions import ExclusionMatcher
+
+
+def random_word(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(string.ascii_lowercase + "-") for _ in range(length))
+
+
+def substring_filter(coin_ids: list[str], excluded_values: list[str]) -> list[str]:
+    return [coin_id for coin_id in coin_ids if all(excluded not in coin_id for excluded in excluded_values)]
+
+
+def alternation_filter(coin_ids: list[str], excluded_values: list[str]) -> list[str]:
+    regex = re.compile("|".join(map(re.escape, excluded_values)))
+    return [coin_id for coin_id in coin_ids if not regex.search(coin_id)]
+
+
+def matcher_filter(coin_ids: list[str], excluded_values: list[str]) -> list[str]:
+    matcher = ExclusionMatcher(excluded_values)
+    return [coin_id for coin_id in coin_ids if not matcher.matches(coin_id)]
+
+
+VARIANTS = {"substring": substring_filter, "regex alternation": alternation_filter, "trie matcher": matcher_filter}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coins", type=int, default=17_000)
+    parser.add_argument("--patterns", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    coin_ids = [random_word(rng, rng.randint(4, 30)) for _ in range(args.coins)]
+
+    print(f"{'patterns':>8}  " + "  ".join(f"{name:>18}" for name in VARIANTS))
+    for count in args.patterns:
+        excluded = [random_word(rng, rng.randint(4, 12)) for _ in range(count)]
+        expected = substring_filter(coin_ids, excluded)
+        timings = []
+        for variant in VARIANTS.values():
+            assert variant(coin_ids, excluded) == expected
+            timings.append(min(timeit.repeat(lambda v=variant, e=excluded: v(coin_ids, e), number=1, repeat=3)))
+        print(f"{count:>8}  " + "  ".join(f"{seconds * 1000:>15.1f} ms" for seconds in timings))
+
+
+if __name__ == "__main__":
+    main()
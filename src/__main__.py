@@ -0,0 +1,9 @@
+"""Entry point for `python -m src`.
+
+Render pool workers (spawn/forkserver) re-import the parent's main module unless it is a
+`__main__` module of a package, so starting the bot from here keeps them from loading it.
+"""
+
+from src.main import main
+
+main()
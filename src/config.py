@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -13,6 +15,41 @@ class Settings(BaseSettings):
     WEBHOOK_URL: str | None = Field(None)
     WEBHOOK_SECRET_TOKEN: SecretStr | None = Field(None)
     WEBHOOK_PORT: int = Field(8443)
+    HTTP2_ENABLED: bool = Field(True)
+    HTTP_MAX_CONNECTIONS: int = Field(20)
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(10)
+    HTTP_KEEPALIVE_EXPIRY: float = Field(60.0)
+    HTTP_MAX_RETRIES: int = Field(2)
+    HTTP_RETRY_BACKOFF: float = Field(0.5)
+    HTTP_MAX_RETRY_DELAY: float = Field(5.0)
+    BREAKER_FAILURE_THRESHOLD: int = Field(5)
+    BREAKER_RECOVERY_SECONDS: float = Field(30.0)
+    RESPONSE_CACHE_MAX_BYTES: int = Field(32 * 1024 * 1024)
+    VALIDATED_CACHE_MAX_BYTES: int = Field(32 * 1024 * 1024)
+    CHART_CACHE_MAX_BYTES: int = Field(16 * 1024 * 1024)
+    UPSTREAM_CALLS_PER_MINUTE: dict[str, float] = Field({"coingecko": 30, "coinmarketcap": 30, "etherscan": 300})
+    UPSTREAM_BURST: int = Field(5)
+    PREFETCH_TOP_N: int = Field(5)
+    PREFETCH_INTERVAL: float = Field(45.0)
+    PREFETCH_MAX_REQUESTS: int = Field(10)
+    PREFETCH_MIN_REQUESTS: float = Field(2.0)
+    PREFETCH_HALF_LIFE: float = Field(3600.0)
+    RATE_LIMIT_MAX_CHATS: int = Field(100_000)
+    TRACKING_QUEUE_SIZE: int = Field(10_000)
+    TRACKING_BATCH_SIZE: int = Field(100)
+    TRACKING_FLUSH_INTERVAL: float = Field(5.0)
+    TRACKING_SPILL_PATH: str = Field("call_tracking_spill.jsonl")
+    COIN_SNAPSHOT_DIR: str = Field("coin_snapshots")
+    COIN_LIST_REFRESH_INTERVAL: float = Field(600.0)
+    COIN_LIST_REFRESH_JITTER: float = Field(60.0)
+    COIN_LIST_MISS_REFRESH_INTERVAL: float = Field(300.0)
+    MARKET_RANK_PAGES: int = Field(4)
+    MARKET_RANK_REFRESH_SECONDS: float = Field(1800.0)
+    DOMINANT_RANK_RATIO: float = Field(10.0)
+    CHOICE_MEMORY_MAX_ENTRIES: int = Field(10_000)
+    CHART_RENDER_WORKERS: int = Field(2)
+    CHART_RENDER_MAX_QUEUE: int = Field(8)
+    CHART_RENDER_EXECUTOR: Literal["process", "thread"] = Field("process")
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
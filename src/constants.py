@@ -8,6 +8,8 @@ COINGECKO_API_BASE: Final[str] = "https://api.coingecko.com/api/v3"
 COINGECKO_API_COINS: Final[str] = f"{COINGECKO_API_BASE}/coins/"
 COINGECKO_API_GLOBAL: Final[str] = f"{COINGECKO_API_BASE}/global"
 COINGECKO_API_COINS_LIST: Final[str] = f"{COINGECKO_API_BASE}/coins/list"
+COINGECKO_API_COINS_MARKETS: Final[str] = f"{COINGECKO_API_BASE}/coins/markets"
+COINGECKO_API_SIMPLE_PRICE: Final[str] = f"{COINGECKO_API_BASE}/simple/price"
 COINGECKO_CHART_BASE: Final[str] = "https://www.coingecko.com/coins/"
 
 COINMARKETCAP_API_BASE: Final[str] = "https://pro-api.coinmarketcap.com/v1"
@@ -25,6 +27,20 @@ COINDESK_RSS_URL: Final[str] = "https://www.coindesk.com/arc/outboundfeeds/rss/"
 COIN_LIST_CACHE_HOURS: Final[int] = 1
 COIN_LIST_CACHE_SECONDS: Final[int] = COIN_LIST_CACHE_HOURS * 3600
 
+# Response cache TTLs (seconds); stale entries are served for TTL * CACHE_STALE_FACTOR while refreshing
+CACHE_TTL_COIN_DETAIL: Final[int] = 60
+CACHE_TTL_GLOBAL: Final[int] = 120
+CACHE_TTL_CMC_QUOTES: Final[int] = 60
+CACHE_TTL_SIMPLE_PRICE: Final[int] = 60
+CACHE_TTL_MARKET_CHART: Final[dict[str, int]] = {
+    "1": 60,
+    "7": 300,
+    "30": 900,
+    "90": 1800,
+    "365": 3600,
+}
+CACHE_STALE_FACTOR: Final[int] = 2
+
 # Rate Limiting
 MAX_REQUESTS_PER_HOUR: Final[int] = 10
 
@@ -69,6 +85,11 @@ class CallbackPrefix(StrEnum):
     CHART = "chart"
     THEME = "theme"
     PERIOD = "period"
+    OTHERS = "others"
+
+
+# Callback action of disambiguation buttons, e.g. "cg_pick.uniswap"; the chat's choice is remembered.
+CALLBACK_ACTION_PICK: Final[str] = "pick"
 
 
 # Emojis
@@ -87,6 +108,8 @@ MESSAGE_INVALID_THEME: Final[str] = "Invalid theme selected. Please choose eithe
 
 MESSAGE_NO_ARGS_PROVIDED: Final[str] = "Please provide a cryptocurrency symbol. Example: /price btc"
 
+MESSAGE_DID_YOU_MEAN: Final[str] = "🟠 Unknown symbol '{}', did you mean one of these?"
+
 # Formatting
 COLUMN_SEPARATOR: Final[str] = "    "
 PRICE_DECIMAL_PLACES: Final[int] = 2
@@ -102,3 +125,9 @@ COINGECKO_EXCLUDED_IDS: Final[list[str]] = [
 # Display Limits
 MAX_MARKET_CAP_ENTRIES: Final[int] = 10
 MAX_NEWS_ITEMS: Final[int] = 5
+MAX_SYMBOL_SUGGESTIONS: Final[int] = 5
+INLINE_QUERY_MAX_RESULTS: Final[int] = 20
+# Inline results carry a price quote, so Telegram may reuse them only as long as the quote is fresh
+INLINE_QUERY_CACHE_SECONDS: Final[int] = CACHE_TTL_SIMPLE_PRICE
+# Inline answers wait this long for quotes, then list the coins without a price
+INLINE_QUOTE_TIMEOUT: Final[float] = 2.0
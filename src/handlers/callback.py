@@ -9,13 +9,13 @@ from opentelemetry import trace as otel_trace
 from telegram import Update
 from telegram.ext import CallbackContext
 
-from src.constants import CallbackPrefix
-from src.handlers.cg_calls import get_cg_chart, get_cg_price
-from src.handlers.cmc_calls import get_cmc_price
+from src.constants import CALLBACK_ACTION_PICK, CallbackPrefix
+from src.handlers.cg_calls import get_cg_chart, get_cg_price, send_cg_candidates
+from src.handlers.cmc_calls import get_cmc_price, send_cmc_candidates
 from src.models import CallbackData
 from src.utils.bot import send_tg
 from src.utils.errors import send_error
-from src.utils.shared import chart_template
+from src.utils.shared import CoinList, cg_coin_list, chart_template, chat_choices, cmc_coin_list
 
 
 async def _delete_message(context: CallbackContext, chat_id: int, message_id: int) -> None:
@@ -25,6 +25,17 @@ async def _delete_message(context: CallbackContext, chat_id: int, message_id: in
         logging.warning(f"Failed to delete message {message_id}: {e}")
 
 
+def _remember_pick(
+    callback_data: CallbackData, chat_id: int, source: str, coin_list: CoinList, coin_id: str | int
+) -> None:
+    # Only picks from a disambiguation keyboard are remembered, not "did you mean" suggestions.
+    if callback_data.action != CALLBACK_ACTION_PICK:
+        return
+    coin = coin_list.registry.get(coin_id)
+    if coin is not None:
+        chat_choices.remember(chat_id, source, coin.symbol, coin_id)
+
+
 def _build_span_name(callback_data: CallbackData) -> str:
     match callback_data.prefix:
         case CallbackPrefix.CG:
@@ -37,6 +48,8 @@ def _build_span_name(callback_data: CallbackData) -> str:
             return f"cg_chart_period {callback_data.action} {callback_data.value}"
         case CallbackPrefix.THEME:
             return f"chart_theme {callback_data.action}"
+        case CallbackPrefix.OTHERS:
+            return f"other_matches {callback_data.action} {callback_data.value}"
         case _:
             return "callback_handler"
 
@@ -73,12 +86,16 @@ async def callback_handler(update: Update, context: CallbackContext) -> None:
                 match callback_data.prefix:
                     case CallbackPrefix.CG:
                         span.set_attribute("coin.id", callback_data.value)
+                        _remember_pick(callback_data, chat_id, CallbackPrefix.CG, cg_coin_list, callback_data.value)
                         await get_cg_price(callback_data.value, update, context)
                     case CallbackPrefix.CMC:
                         span.set_attribute("coin.id", callback_data.value)
-                        await get_cmc_price(int(callback_data.value), update, context)
+                        coin_id = int(callback_data.value)
+                        _remember_pick(callback_data, chat_id, CallbackPrefix.CMC, cmc_coin_list, coin_id)
+                        await get_cmc_price(coin_id, update, context)
                     case CallbackPrefix.CHART:
                         span.set_attribute("coin.id", callback_data.value)
+                        _remember_pick(callback_data, chat_id, CallbackPrefix.CG, cg_coin_list, callback_data.value)
                         await get_cg_chart(callback_data.value, update, context)
                     case CallbackPrefix.THEME:
                         span.set_attribute("chart.theme", callback_data.action)
@@ -88,6 +105,13 @@ async def callback_handler(update: Update, context: CallbackContext) -> None:
                         span.set_attribute("coin.id", callback_data.value)
                         span.set_attribute("chart.period_days", callback_data.action)
                         await get_cg_chart(callback_data.value, update, context, callback_data.action)
+                    case CallbackPrefix.OTHERS:
+                        span.set_attribute("crypto.symbol", callback_data.value)
+                        if callback_data.action == CallbackPrefix.CMC:
+                            await send_cmc_candidates(callback_data.value, update, context)
+                        else:
+                            call_type = "chart" if callback_data.action == CallbackPrefix.CHART else "price"
+                            await send_cg_candidates(callback_data.value, update, context, call_type)
                     case _:
                         logging.warning(f"Unknown callback prefix: {callback_data.prefix!r} in {callback_string!r}")
             except Exception as e:
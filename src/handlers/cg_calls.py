@@ -3,38 +3,39 @@
 import io
 import logging
 from functools import reduce
-from time import perf_counter
 
 import logfire
-import matplotlib
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
-import pandas as pd
+import numpy as np
 from opentelemetry import metrics as otel_metrics
 from opentelemetry import propagate as otel_propagate
 from opentelemetry import trace as otel_trace
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
-matplotlib.use("Agg")  # non-interactive backend for server rendering
-
+from src.config import settings as s
 from src.constants import (
+    CALLBACK_ACTION_PICK,
     COINGECKO_API_COINS,
     COINGECKO_API_GLOBAL,
     MESSAGE_RATE_LIMIT_EXCEEDED,
     POSITIONAL_EMOJIS,
     CallbackPrefix,
+    ChartPeriod,
 )
 from src.models import AtEntry, GeneralDataEntry, MarketCapEntry, PriceChangeEntry
-from src.utils.bot import send_tg
-from src.utils.errors import send_error
+from src.utils.bot import other_matches_button, send_tg
+from src.utils.chart_cache import chart_image_cache
+from src.utils.chart_render import market_chart_arrays
+from src.utils.errors import send_error, send_symbol_error
 from src.utils.formatters import (
     human_format,
     max_column_size,
 )
-from src.utils.http import fetch_url, write_call
-from src.utils.shared import cg_coin_list, chart_template
+from src.utils.http import fetch_url, prefetch_url, write_call
+from src.utils.periodic import PeriodicTask
+from src.utils.popularity import PopularityTracker
+from src.utils.render_pool import RenderQueueFullError, chart_render_pool
+from src.utils.shared import cg_coin_list, chart_template, chat_choices, disambiguation_total
 
 logger = logging.getLogger(__name__)
 
@@ -52,86 +53,88 @@ chart_generation_errors_total = meter.create_counter(
 chart_generation_duration_seconds = meter.create_histogram(
     "bot.chart.generation.duration_seconds",
     unit="s",
-    description="Duration of chart image generation using matplotlib",
+    description="Time a render worker spent drawing and encoding a chart image",
 )
 
 
-def _render_chart_image(df: pd.DataFrame, title: str, bottom: str, template: str, coin: str, period: str) -> io.BytesIO:
+# Request frequency per coin id, used to keep the most requested coins warm in the response cache.
+coin_popularity = PopularityTracker(capacity=4 * s.PREFETCH_TOP_N, half_life=s.PREFETCH_HALF_LIFE)
+
+
+def cg_price_url(coin: str) -> str:
+    """Return the CoinGecko coin detail URL used by the price command.
+
+    Args:
+        coin: CoinGecko coin ID
+
+    Returns:
+        Absolute URL
+    """
+    return (
+        f"{COINGECKO_API_COINS}{coin}?localization=false&tickers=false&market_data=true"
+        "&community_data=false&developer_data=false&sparkline=false"
+    )
+
+
+def cg_chart_url(coin: str, period: str) -> str:
+    """Return the CoinGecko market chart URL used by the chart command.
+
+    Args:
+        coin: CoinGecko coin ID
+        period: Chart period in days
+
+    Returns:
+        Absolute URL
+    """
+    return f"{COINGECKO_API_COINS}{coin}/market_chart?vs_currency=usd&days={period}"
+
+
+async def prefetch_popular_coins() -> int:
+    """Refresh price and default chart data of the most requested coins before they expire.
+
+    Responses that would turn stale before the next run are refreshed, at most
+    PREFETCH_MAX_REQUESTS per run, so /p and /c for popular coins are answered from memory.
+
+    Returns:
+        Number of upstream requests made
+    """
+    requests = 0
+    for coin in coin_popularity.top(s.PREFETCH_TOP_N, min_count=s.PREFETCH_MIN_REQUESTS):
+        for url in (cg_price_url(coin), cg_chart_url(coin, ChartPeriod.THIRTY_DAYS)):
+            if requests >= s.PREFETCH_MAX_REQUESTS:
+                return requests
+            if await prefetch_url(url, service="coingecko", min_fresh=s.PREFETCH_INTERVAL):
+                requests += 1
+    return requests
+
+
+popular_coin_prefetcher = PeriodicTask(prefetch_popular_coins, s.PREFETCH_INTERVAL, name="prefetch_popular_coins")
+
+
+async def _render_chart_image(
+    times: np.ndarray, prices: np.ndarray, title: str, bottom: str, template: str, coin: str, period: str
+) -> bytes:
     metric_attributes = {
         "chart.period_days": str(period),
         "chart.template": template,
     }
 
     chart_generation_total.add(1, metric_attributes)
-    started_at = perf_counter()
 
     with logfire.span("cg_chart.generate_image"):
         span = otel_trace.get_current_span()
         span.set_attribute("coin.id", coin)
         span.set_attribute("chart.period_days", str(period))
         span.set_attribute("chart.template", template)
-        span.set_attribute("chart.points", len(df))
+        span.set_attribute("chart.points", len(prices))
 
         try:
-            is_dark = template in ("plotly_dark", "dark")
-
-            if is_dark:
-                bg_color = "#1a1a2e"
-                text_color = "#e0e0e0"
-                line_color = "#00cc96"
-                grid_color = "#2a2a3e"
-            else:
-                bg_color = "#ffffff"
-                text_color = "#333333"
-                line_color = "#636efa"
-                grid_color = "#d0d0d0"
-
-            fig, ax = plt.subplots(figsize=(10, 5.5))
-            fig.patch.set_facecolor(bg_color)
-            ax.set_facecolor(bg_color)
-
-            ax.plot(df["timeframe"], df["prices"], color=line_color, linewidth=2)
-
-            ax.set_title(title, color=text_color, fontsize=16, fontweight="bold", pad=12)
-            ax.set_xlabel(bottom, color=text_color, fontsize=10)
-            ax.set_ylabel("price ($)", color=text_color, fontsize=10)
-
-            ax.tick_params(colors=text_color, labelsize=9)
-            ax.grid(True, color=grid_color, alpha=0.4, linestyle="--")
-
-            ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _p: f"${x:,.0f}"))
-
-            # Let AutoDateLocator pick optimal tick positions, then format based on period
-            period_days = int(period) if period.isdigit() else 365
-            if period_days <= 1:
-                date_fmt = "%H:%M"
-            elif period_days <= 7:
-                date_fmt = "%a %d"
-            elif period_days <= 90:
-                date_fmt = "%b %d"
-            else:
-                date_fmt = "%b %Y"
-
-            locator = mdates.AutoDateLocator(minticks=4, maxticks=10)
-            ax.xaxis.set_major_locator(locator)
-            ax.xaxis.set_major_formatter(mdates.DateFormatter(date_fmt))
-            fig.autofmt_xdate(rotation=0, ha="center")
-
-            for spine in ax.spines.values():
-                spine.set_edgecolor(grid_color)
-
-            fig.tight_layout()
-
-            buffer = io.BytesIO()
-            fig.savefig(buffer, format="jpg", dpi=150, facecolor=bg_color)
-            plt.close(fig)
-            buffer.seek(0)
-            return buffer
+            image, render_seconds = await chart_render_pool.render(times, prices, title, bottom, template, period)
         except Exception:
             chart_generation_errors_total.add(1, metric_attributes)
             raise
-        finally:
-            chart_generation_duration_seconds.record(perf_counter() - started_at, metric_attributes)
+        chart_generation_duration_seconds.record(render_seconds, metric_attributes)
+        return image
 
 
 def get_cg_id(crypto_symbol: str) -> list[str]:
@@ -143,11 +146,7 @@ def get_cg_id(crypto_symbol: str) -> list[str]:
     Returns:
         List of matching CoinGecko IDs
     """
-    api_ids = []
-    for crypto in cg_coin_list.coin_list:
-        if crypto["symbol"] == crypto_symbol:
-            api_ids.append(crypto["id"])
-    return api_ids
+    return cg_coin_list.registry.ids_for_symbol(crypto_symbol)
 
 
 async def get_cg_coin_info(coin_id: str) -> dict[str, str] | None:
@@ -159,29 +158,31 @@ async def get_cg_coin_info(coin_id: str) -> dict[str, str] | None:
     Returns:
         Dictionary with 'name' and 'symbol', or None if not found
     """
-    for crypto in cg_coin_list.coin_list:
-        if coin_id == crypto["id"]:
-            return {"name": crypto["name"], "symbol": crypto["symbol"].upper()}
-    return None
+    coin = cg_coin_list.registry.get(coin_id)
+    if coin is None:
+        return None
+    return {"name": coin.name, "symbol": coin.symbol.upper()}
 
 
 @logfire.instrument("get_cg_price {coin}")
-async def get_cg_price(coin: str, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+async def get_cg_price(
+    coin: str,
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    other_matches: InlineKeyboardButton | None = None,
+) -> None:
     """Fetch and display detailed price information for a cryptocurrency.
 
     Args:
         coin: CoinGecko coin ID
         update: Telegram update object
         context: Telegram context
+        other_matches: Button listing the other coins with the same symbol, if the coin was chosen without asking
     """
     span = otel_trace.get_current_span()
     span.set_attribute("chat.id", str(update.effective_chat.id))
     span.set_attribute("user.id", str(update.effective_user.id))
 
-    url_params = (
-        "?localization=false&tickers=false&market_data=true&community_data=false&developer_data=false&sparkline=false"
-    )
-
     # Check rate limiting
     rate_limit_ok = await write_call(1, 1, str(update.effective_chat.id), coin)
     if not rate_limit_ok:
@@ -191,7 +192,8 @@ async def get_cg_price(coin: str, update: Update, context: ContextTypes.DEFAULT_
         )
         return
 
-    url = COINGECKO_API_COINS + coin + url_params
+    coin_popularity.record(coin)
+    url = cg_price_url(coin)
     logger.info(f"Fetching CoinGecko price data: {url}")
 
     crypto_data = await fetch_url(url, service="coingecko")
@@ -330,11 +332,18 @@ async def get_cg_price(coin: str, update: Update, context: ContextTypes.DEFAULT_
         f"`{at_data_message}`"
     )
 
-    await send_tg(context, update.effective_chat.id, message, mk_parse=False)
+    reply_markup = InlineKeyboardMarkup([[other_matches]]) if other_matches else None
+    await send_tg(context, update.effective_chat.id, message, reply_markup=reply_markup, mk_parse=False)
 
 
 @logfire.instrument("get_cg_chart {coin} period={period}")
-async def get_cg_chart(coin: str, update: Update, context: ContextTypes.DEFAULT_TYPE, period="30") -> None:
+async def get_cg_chart(
+    coin: str,
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    period: str = ChartPeriod.THIRTY_DAYS,
+    other_matches: InlineKeyboardButton | None = None,
+) -> None:
     span = otel_trace.get_current_span()
     span.set_attribute("chat.id", str(update.effective_chat.id))
     span.set_attribute("user.id", str(update.effective_user.id))
@@ -346,23 +355,30 @@ async def get_cg_chart(coin: str, update: Update, context: ContextTypes.DEFAULT_
             text=MESSAGE_RATE_LIMIT_EXCEEDED,
         )
         return
-    url = f"https://api.coingecko.com/api/v3/coins/{coin}/market_chart?vs_currency=usd&days={period}"
+    coin_popularity.record(coin)
+    url = cg_chart_url(coin, period)
     chart = await fetch_url(url, service="coingecko")
     if not chart:
         await send_error("generic", update, context)
         return
     logging.info(f"Request URL: {url}")
-    x = [p[0] / 1000 for p in chart["prices"]]
-    y = [p[1] for p in chart["prices"]]
-
-    df = pd.DataFrame({"timeframe": x, "prices": y})
-    df["timeframe"] = pd.to_datetime(df["timeframe"], unit="s")
-    span.set_attribute("chart.points", len(df))
-    info = await get_cg_coin_info(coin)
-    title = f"{info['name']} ({info['symbol']})"
-    bottom = f"{period} day{'s' if period != '1' else ''} chart"
+    span.set_attribute("chart.points", len(chart["prices"]))
     template = chart_template.get_template()
-    buffer = _render_chart_image(df, title, bottom, template, coin, period)
+    # Charts drawn from the same data bucket are identical for every chat; reuse the encoded image.
+    cache_key = chart_image_cache.key(coin, period, template, chart["prices"][-1][0] if chart["prices"] else 0)
+    image = chart_image_cache.get(cache_key)
+    if image is None:
+        times, prices = market_chart_arrays(chart["prices"])
+        info = await get_cg_coin_info(coin)
+        title = f"{info['name']} ({info['symbol']})"
+        bottom = f"{period} day{'s' if period != '1' else ''} chart"
+        try:
+            image = await _render_chart_image(times, prices, title, bottom, template, coin, period)
+        except RenderQueueFullError:
+            logger.warning(f"Chart render queue full, dropping chart for {coin}")
+            await send_error("generic", update, context)
+            return
+        chart_image_cache.set(cache_key, image)
 
     periods = [
         {"1": "24h"},
@@ -388,6 +404,8 @@ async def get_cg_chart(coin: str, update: Update, context: ContextTypes.DEFAULT_
             for i in range(len(periods))
         ]
     ]
+    if other_matches:
+        keyboard.append([other_matches])
 
     reply_markup = InlineKeyboardMarkup(keyboard)
 
@@ -398,9 +416,9 @@ async def get_cg_chart(coin: str, update: Update, context: ContextTypes.DEFAULT_
     if carrier:
         context.user_data["_trace_carrier"] = carrier
 
-    await send_tg(context, update.effective_chat.id, photo=buffer, reply_markup=reply_markup)
-
-    buffer.close()
+    await send_tg(
+        context, update.effective_chat.id, photo=io.BytesIO(image), reply_markup=reply_markup, cache_key=cache_key
+    )
 
 
 @logfire.instrument("get_cg_dominance")
@@ -469,19 +487,51 @@ async def gc_coin_check(
         await send_error("symbol", update, context)
         return None
 
-    coins = get_cg_id(coin)
+    registry = cg_coin_list.registry
+    callback_prefix = CallbackPrefix.CHART if call_type == "chart" else CallbackPrefix.CG
+    coins = registry.candidates(coin)
 
     if not coins:
-        await cg_coin_list.update()
-        coins = get_cg_id(coin)
-        if not coins:
-            await send_error("symbol", update, context)
-            return None
-
-    text = "🟠 There are multiple coins with the same symbol, please select the desired one:"
+        # The coin may be newer than our list; refresh in the background rather than making the user wait.
+        cg_coin_list.request_refresh()
+        await send_symbol_error(coin, cg_coin_list.search_index(), callback_prefix, update, context)
+        return None
 
     if len(coins) == 1:
-        return coins[0]
+        return coins[0].id
+
+    # A coin this chat picked before for the symbol is answered directly, as is one that clearly
+    # outranks the others; either way the other matches stay one button away.
+    attributes = {"registry": cg_coin_list.name}
+    remembered = chat_choices.recall(update.effective_chat.id, CallbackPrefix.CG, coin)
+    if remembered is not None:
+        if any(crypto.id == remembered for crypto in coins):
+            disambiguation_total.add(1, {**attributes, "disambiguation.result": "remembered"})
+            return remembered
+        chat_choices.forget(update.effective_chat.id, CallbackPrefix.CG, coin)
+    dominant = registry.dominant(coin, s.DOMINANT_RANK_RATIO)
+    if dominant is not None:
+        disambiguation_total.add(1, {**attributes, "disambiguation.result": "dominant"})
+        return dominant.id
+
+    disambiguation_total.add(1, {**attributes, "disambiguation.result": "asked"})
+    await send_cg_candidates(coin, update, context, call_type)
+    return None
+
+
+async def send_cg_candidates(
+    coin: str, update: Update, context: ContextTypes.DEFAULT_TYPE, call_type: str = "price"
+) -> None:
+    """Ask the user to pick one of the coins sharing a symbol; the choice is remembered for the chat.
+
+    Args:
+        coin: Symbol as typed by the user
+        update: Telegram update object
+        context: Telegram context
+        call_type: "price" or "chart", the answer shown once a coin is picked
+    """
+    callback_prefix = CallbackPrefix.CHART if call_type == "chart" else CallbackPrefix.CG
+    text = "🟠 There are multiple coins with the same symbol, please select the desired one:"
 
     # Propagate current trace context so the callback handler can link back to this trace
     carrier: dict[str, str] = {}
@@ -489,22 +539,22 @@ async def gc_coin_check(
     if carrier:
         context.user_data["_trace_carrier"] = carrier
 
-    if call_type == "chart":
-        keyboard = []
-        for crypto in coins:
-            button = [InlineKeyboardButton(crypto, callback_data=f"chart.{crypto}")]
-            keyboard.append(button)
-        reply_markup = InlineKeyboardMarkup(keyboard)
+    # Candidates are ordered by market cap rank, unranked coins last.
+    keyboard = []
+    for crypto in cg_coin_list.registry.candidates(coin):
+        label = crypto.label() if crypto.rank else f"{crypto.name} ({crypto.id})"
+        callback = f"{callback_prefix}_{CALLBACK_ACTION_PICK}.{crypto.id}"
+        button = [InlineKeyboardButton(label, callback_data=callback)]
+        keyboard.append(button)
+    reply_markup = InlineKeyboardMarkup(keyboard)
+
+    await send_tg(context, update.effective_chat.id, text, reply_markup=reply_markup)
 
-        await send_tg(context, update.effective_chat.id, text, reply_markup=reply_markup)
-    else:
-        keyboard = []
-        for crypto in coins:
-            button = [InlineKeyboardButton(crypto, callback_data=f"{CallbackPrefix.CG}.{crypto}")]
-            keyboard.append(button)
-        reply_markup = InlineKeyboardMarkup(keyboard)
 
-        await send_tg(context, update.effective_chat.id, text, reply_markup=reply_markup)
+def _other_matches(coin: str, callback_prefix: str) -> InlineKeyboardButton | None:
+    if len(cg_coin_list.registry.ids_for_symbol(coin)) < 2:
+        return None
+    return other_matches_button(callback_prefix, coin)
 
 
 @logfire.instrument("cg_price_handler")
@@ -529,7 +579,7 @@ async def cg_price_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
     if coin:
         try:
-            await get_cg_price(coin, update, context)
+            await get_cg_price(coin, update, context, _other_matches(crypto_symbol, CallbackPrefix.CG))
         except Exception as e:
             span.record_exception(e)
             logger.error(f"Error fetching price for {crypto_symbol}: {e}", exc_info=True)
@@ -558,7 +608,7 @@ async def cg_chart_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
     if coin:
         try:
-            await get_cg_chart(coin, update, context)
+            await get_cg_chart(coin, update, context, other_matches=_other_matches(crypto_symbol, CallbackPrefix.CHART))
         except Exception as e:
             span.record_exception(e)
             logger.error(f"Error fetching chart for {crypto_symbol}: {e}", exc_info=True)
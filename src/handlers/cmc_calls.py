@@ -10,13 +10,13 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
 from src.config import settings as s
-from src.constants import MESSAGE_RATE_LIMIT_EXCEEDED
+from src.constants import CALLBACK_ACTION_PICK, MESSAGE_RATE_LIMIT_EXCEEDED, CallbackPrefix
 from src.models import GeneralDataEntry, PriceChangeEntry
-from src.utils.bot import send_tg
-from src.utils.errors import send_error
+from src.utils.bot import other_matches_button, send_tg
+from src.utils.errors import send_error, send_symbol_error
 from src.utils.formatters import human_format, max_column_size
 from src.utils.http import fetch_url, write_call
-from src.utils.shared import cmc_coin_list
+from src.utils.shared import chat_choices, cmc_coin_list, disambiguation_total
 
 logger = logging.getLogger(__name__)
 
@@ -30,30 +30,31 @@ async def get_cmc_id(crypto_symbol: str) -> list[int]:
     """
     Get the id of a coin from the CoinMarketCap index
     :param crypto_symbol:
-    :return:
+    :return: ids sharing the symbol, best CMC rank first
     """
-    crypto_symbol = crypto_symbol.upper()
-    api_ids = []
-    for crypto in cmc_coin_list.coin_list["data"]:
-        if crypto["symbol"] == crypto_symbol:
-            api_ids.append(crypto["id"])
-    return api_ids
+    return cmc_coin_list.registry.ids_for_symbol(crypto_symbol.upper())
 
 
 async def get_cmc_coin_info(coin_id: int) -> dict[str, str] | None:
-    for crypto in cmc_coin_list.coin_list["data"]:
-        if coin_id == crypto["id"]:
-            return {"name": crypto["name"], "symbol": crypto["symbol"]}
-    return None
+    coin = cmc_coin_list.registry.get(coin_id)
+    if coin is None:
+        return None
+    return {"name": coin.name, "symbol": coin.symbol}
 
 
 @logfire.instrument("get_cmc_price {coin_id}")
-async def get_cmc_price(coin_id: int, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+async def get_cmc_price(
+    coin_id: int,
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    other_matches: InlineKeyboardButton | None = None,
+) -> None:
     """
     Get the price grid of a coin from CoinMarketCap index
     :param coin_id: id of the coin in the CoinMarketCap index
     :param update:
     :param context:
+    :param other_matches: button listing the other coins with the same symbol, if the coin was chosen without asking
     :return: None
     """
     span = otel_trace.get_current_span()
@@ -142,7 +143,8 @@ async def get_cmc_price(coin_id: int, update: Update, context: ContextTypes.DEFA
         f"`{lst_str_header}`"
         f"`{general_data_message}`\n"
     )
-    await send_tg(context, update.effective_chat.id, message, mk_parse=False)
+    reply_markup = InlineKeyboardMarkup([[other_matches]]) if other_matches else None
+    await send_tg(context, update.effective_chat.id, message, reply_markup=reply_markup, mk_parse=False)
 
 
 @logfire.instrument("cmc_key_info")
@@ -182,16 +184,42 @@ async def cmc_coin_check(coin: str, update: Update, context: ContextTypes.DEFAUL
     if len(coin) == 0:
         await send_error(error, update, context)
         return False
-    coins = await get_cmc_id(coin)
-    if not coins:
-        await cmc_coin_list.update()
-        coins = await get_cmc_id(coin)
-        if not coins:
-            await send_error(error, update, context)
-            return False
-    if len(coins) == 1:
-        return coins[0]
+    candidates = cmc_coin_list.registry.candidates(coin.upper())
+    if not candidates:
+        # The coin may be newer than our list; refresh in the background rather than making the user wait.
+        cmc_coin_list.request_refresh()
+        await send_symbol_error(coin, cmc_coin_list.search_index(), CallbackPrefix.CMC, update, context)
+        return False
+    if len(candidates) == 1:
+        return candidates[0].id
+
+    # A coin this chat picked before for the symbol is answered directly, as is one that clearly
+    # outranks the others; either way the other matches stay one button away.
+    attributes = {"registry": cmc_coin_list.name}
+    remembered = chat_choices.recall(update.effective_chat.id, CallbackPrefix.CMC, coin)
+    if remembered is not None:
+        if any(candidate.id == remembered for candidate in candidates):
+            disambiguation_total.add(1, {**attributes, "disambiguation.result": "remembered"})
+            return remembered
+        chat_choices.forget(update.effective_chat.id, CallbackPrefix.CMC, coin)
+    dominant = cmc_coin_list.registry.dominant(coin.upper(), s.DOMINANT_RANK_RATIO)
+    if dominant is not None:
+        disambiguation_total.add(1, {**attributes, "disambiguation.result": "dominant"})
+        return dominant.id
+
+    disambiguation_total.add(1, {**attributes, "disambiguation.result": "asked"})
+    await send_cmc_candidates(coin, update, context)
+    return None
 
+
+async def send_cmc_candidates(coin: str, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Ask the user to pick one of the coins sharing a symbol; the choice is remembered for the chat.
+
+    Args:
+        coin: Symbol as typed by the user
+        update: Telegram update object
+        context: Telegram context
+    """
     # Propagate current trace context so the callback handler can link back to this trace
     carrier: dict[str, str] = {}
     otel_propagate.inject(carrier)
@@ -199,9 +227,9 @@ async def cmc_coin_check(coin: str, update: Update, context: ContextTypes.DEFAUL
         context.user_data["_trace_carrier"] = carrier
 
     keyboard = []
-    for crypto in coins:
-        coin_data = await get_cmc_coin_info(crypto)
-        button = [InlineKeyboardButton(coin_data["name"], callback_data="cmc." + str(crypto))]
+    for candidate in cmc_coin_list.registry.candidates(coin.upper()):
+        callback = f"{CallbackPrefix.CMC}_{CALLBACK_ACTION_PICK}.{candidate.id}"
+        button = [InlineKeyboardButton(candidate.label(), callback_data=callback)]
         keyboard.append(button)
     reply_markup = InlineKeyboardMarkup(keyboard)
     text = "🟠 There are multiple coins with the same symbol, please select the desired one:"
@@ -217,8 +245,11 @@ async def cmc_price_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     span.set_attribute("crypto.symbol", crypto_symbol)
     coin = await cmc_coin_check(crypto_symbol, update, context)
     if coin:
+        other_matches = None
+        if len(cmc_coin_list.registry.ids_for_symbol(crypto_symbol.upper())) > 1:
+            other_matches = other_matches_button(CallbackPrefix.CMC, crypto_symbol)
         try:
-            await get_cmc_price(coin, update, context)
+            await get_cmc_price(coin, update, context, other_matches)
         except Exception as e:
             span.record_exception(e)
             logging.error(f"An error occurred: {str(e)}")
@@ -0,0 +1,128 @@
+"""Inline query handler quoting coin prices while the user types `@bot <symbol>`."""
+
+import asyncio
+
+import logfire
+from opentelemetry import trace as otel_trace
+from telegram import InlineQueryResultArticle, InputTextMessageContent, Update
+from telegram.ext import ContextTypes
+
+from src.constants import (
+    COINGECKO_API_SIMPLE_PRICE,
+    INLINE_QUERY_CACHE_SECONDS,
+    INLINE_QUERY_MAX_RESULTS,
+    INLINE_QUOTE_TIMEOUT,
+)
+from src.models import CoinInfo
+from src.utils.formatters import format_percentage, human_format
+from src.utils.http import fetch_url
+from src.utils.scheduler import Priority
+from src.utils.search import SymbolSearchIndex
+from src.utils.shared import cg_coin_list
+
+
+def inline_symbols(index: SymbolSearchIndex, query: str, limit: int = INLINE_QUERY_MAX_RESULTS) -> list[str]:
+    """Return the symbols to offer for a partial query: prefix matches, then likely typos.
+
+    Args:
+        index: Symbol search index
+        query: Text typed after the bot's username
+        limit: Maximum number of symbols
+
+    Returns:
+        Symbols, most relevant first
+    """
+    symbols = index.complete(query, limit)
+    if len(symbols) < limit:
+        symbols += [symbol for symbol in index.similar(query, limit) if symbol not in symbols][: limit - len(symbols)]
+    return symbols
+
+
+def cg_simple_price_url(coin_ids: list[str]) -> str:
+    """Return the CoinGecko URL quoting several coins in USD with their 24h change.
+
+    Args:
+        coin_ids: CoinGecko coin IDs
+
+    Returns:
+        Absolute URL
+    """
+    return f"{COINGECKO_API_SIMPLE_PRICE}?ids={','.join(coin_ids)}&vs_currencies=usd&include_24hr_change=true"
+
+
+def inline_quote(coin: CoinInfo, quote: dict) -> tuple[str, str] | None:
+    """Format a coin's quote for an inline result.
+
+    Args:
+        coin: Quoted coin
+        quote: The coin's entry in a /simple/price response
+
+    Returns:
+        Tuple of (short description, message text), or None if the quote has no USD price
+    """
+    price = quote.get("usd")
+    if price is None:
+        return None
+    summary = f"{human_format(price)}$"
+    change = quote.get("usd_24h_change")
+    if change is not None:
+        summary += f" ({format_percentage(change)} 24h)"
+    return summary, f"{coin.label()} ({coin.symbol.upper()})\nPrice: {summary}"
+
+
+def inline_result(coin: CoinInfo, quote: dict | None) -> InlineQueryResultArticle:
+    """Build the inline result for a coin, with its price when a quote is available.
+
+    Args:
+        coin: Matching coin
+        quote: The coin's entry in a /simple/price response, or None if it could not be fetched
+
+    Returns:
+        Inline result posting the quote, or only the coin's name without a price
+    """
+    summary, text = inline_quote(coin, quote or {}) or (None, f"{coin.label()} ({coin.symbol.upper()})")
+    return InlineQueryResultArticle(
+        id=coin.id[:64],
+        title=f"{coin.symbol.upper()} · {coin.label()}",
+        description=summary,
+        input_message_content=InputTextMessageContent(text),
+    )
+
+
+@logfire.instrument("inline_query_handler")
+async def inline_query_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Answer an inline query with the matching CoinGecko coins; choosing one posts its price.
+
+    The posted message carries the quote itself, so it works in chats the bot is not a member of.
+    Quotes are fetched at background priority and only waited for briefly: every keystroke is a
+    query, so they must not take the rate budget of commands. Coins are listed without a price
+    when their quote is missing, and such answers are not cached by Telegram.
+
+    Args:
+        update: Telegram update object
+        context: Telegram context
+    """
+    inline_query = update.inline_query
+    span = otel_trace.get_current_span()
+    span.set_attribute("user.id", str(update.effective_user.id))
+    span.set_attribute("inline.query", inline_query.query)
+
+    index = cg_coin_list.search_index()
+    coins = index.coins(inline_symbols(index, inline_query.query), INLINE_QUERY_MAX_RESULTS)
+    quotes = None
+    if coins:
+        url = cg_simple_price_url([coin.id for coin in coins])
+        try:
+            # fetch_url shields the request, so a quote arriving late still fills the cache for the next query.
+            quotes = await asyncio.wait_for(
+                fetch_url(url, service="coingecko", priority=Priority.BACKGROUND), INLINE_QUOTE_TIMEOUT
+            )
+        except TimeoutError:
+            pass
+    quotes = quotes if isinstance(quotes, dict) else {}
+    results = [inline_result(coin, quotes.get(coin.id)) for coin in coins]
+    quoted = all(result.description is not None for result in results)
+    span.set_attribute("inline.results", len(results))
+    span.set_attribute("inline.quoted", quoted)
+
+    await inline_query.answer(results, cache_time=INLINE_QUERY_CACHE_SECONDS if quoted else 0)
@@ -4,9 +4,10 @@ from opentelemetry import trace as otel_trace
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from src.constants import COINDESK_RSS_URL
 from src.utils.bot import send_tg
-
-RSS_URL = "https://www.coindesk.com/arc/outboundfeeds/rss/"
+from src.utils.errors import send_error
+from src.utils.http import fetch_url
 
 
 @logfire.instrument("news_handler")
@@ -15,7 +16,11 @@ async def news(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     span.set_attribute("chat.id", str(update.effective_chat.id))
     span.set_attribute("user.id", str(update.effective_user.id))
 
-    feed = feedparser.parse(RSS_URL)
+    # Conditional GET: an unchanged feed comes back as 304 and the previously parsed feed is reused.
+    feed = await fetch_url(COINDESK_RSS_URL, service="coindesk", decoder=feedparser.parse)
+    if not feed:
+        await send_error("generic", update, context)
+        return
 
     latest_entries = feed.entries[:7]
     span.set_attribute("news.count", len(latest_entries))
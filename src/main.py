@@ -10,15 +10,24 @@ from .telemetry import configure as configure_telemetry
 # registered on the real MeterProvider rather than the default no-op one.
 configure_telemetry()
 from opentelemetry import metrics
-from telegram.ext import ApplicationBuilder, CallbackQueryHandler, CommandHandler
+from telegram.ext import ApplicationBuilder, CallbackQueryHandler, CommandHandler, InlineQueryHandler
 
 from src.handlers.callback import callback_handler
-from src.handlers.cg_calls import cg_chart_handler, cg_price_handler, chart_color_handler, get_cg_dominance
+from src.handlers.cg_calls import (
+    cg_chart_handler,
+    cg_price_handler,
+    chart_color_handler,
+    get_cg_dominance,
+    popular_coin_prefetcher,
+)
 from src.handlers.cmc_calls import cmc_key_info, cmc_price_handler
 from src.handlers.ethersca_calls import gas_handler
 from src.handlers.info import bot_help, start
+from src.handlers.inline import inline_query_handler
 from src.handlers.news import news
-from src.utils.shared import cg_coin_list, cmc_coin_list
+from src.utils.http import call_tracker, close_clients, warm_clients
+from src.utils.render_pool import chart_render_pool
+from src.utils.shared import cg_coin_list, cmc_coin_list, coin_list_refresher
 
 from .config import settings as s
 
@@ -61,9 +70,28 @@ def _instrument_handler(handler_name: str, handler_type: str, handler: Any):
     return wrapped
 
 
+async def _post_init(_application) -> None:
+    # Lookups are served from the snapshots loaded in setup_bot while the lists download.
+    coin_list_refresher.start(delay=0)
+    chart_render_pool.start()
+    if s.hcpb_api_url:
+        call_tracker.start()
+    if s.PREFETCH_TOP_N > 0:
+        popular_coin_prefetcher.start()
+
+
+async def _post_shutdown(_application) -> None:
+    await coin_list_refresher.stop()
+    await popular_coin_prefetcher.stop()
+    await call_tracker.stop()
+    chart_render_pool.close()
+    await close_clients()
+
+
 async def setup_bot():
-    await cmc_coin_list.update()
-    await cg_coin_list.update()
+    await warm_clients()
+    cmc_coin_list.load_snapshot()
+    cg_coin_list.load_snapshot()
 
     handlers = {
         "start": start,
@@ -78,17 +106,24 @@ async def setup_bot():
         "help": bot_help,
     }
 
-    application = ApplicationBuilder().token(s.TELEGRAM_TOKEN.get_secret_value()).build()
+    application = (
+        ApplicationBuilder()
+        .token(s.TELEGRAM_TOKEN.get_secret_value())
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
+        .build()
+    )
 
     for handler_name, handler in handlers.items():
         application.add_handler(CommandHandler(handler_name, _instrument_handler(handler_name, "command", handler)))
 
     application.add_handler(CallbackQueryHandler(_instrument_handler("callback_handler", "callback", callback_handler)))
+    application.add_handler(InlineQueryHandler(_instrument_handler("inline_query", "inline", inline_query_handler)))
 
     return application
 
 
-if __name__ == "__main__":
+def main() -> None:
     if not s.hcpb_api_url:
         logging.info("API_URL not set, no calls control will be performed")
 
@@ -109,3 +144,7 @@ if __name__ == "__main__":
     else:
         logging.info("Starting polling mode (no WEBHOOK_URL set)")
         bot.run_polling()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 """Data models for the crypto price bot."""
 
-from dataclasses import dataclass
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from itertools import chain
 from typing import Any
 
 
@@ -153,15 +157,22 @@ class GasEntry:
         return cls(speed=speed, gwei=f"{gas_price_gwei:.2f}", usd=f"${gas_cost_usd:.2f}", time=time)
 
 
-@dataclass
+@dataclass(slots=True)
 class CoinInfo:
     """Information about a cryptocurrency."""
 
-    id: str
+    id: str | int
+    """CoinGecko id, or CoinMarketCap numeric id."""
     symbol: str
     name: str
+    rank: int | None = None
+    """Market cap rank, if known."""
+
+    def label(self) -> str:
+        """Return a button label: rank and name, or the name alone for unranked coins."""
+        return f"{self.rank}° {self.name}" if self.rank else self.name
 
-    def to_dict(self) -> dict[str, str]:
+    def to_dict(self) -> dict[str, str | int]:
         """Convert to dictionary representation.
 
         Returns:
@@ -173,13 +184,365 @@ class CoinInfo:
     def from_dict(cls, data: dict[str, Any]) -> "CoinInfo":
         """Create CoinInfo from dictionary.
 
+        Symbols are interned, since many coins share the same few thousand symbols.
+
         Args:
-            data: Dictionary containing coin information
+            data: Dictionary containing coin information, optionally with a 'rank'
 
         Returns:
             CoinInfo instance
         """
-        return cls(id=data["id"], symbol=data["symbol"], name=data["name"])
+        return cls(id=data["id"], symbol=sys.intern(data["symbol"]), name=data["name"], rank=data.get("rank"))
+
+
+@dataclass(slots=True)
+class CoinDelta:
+    """Changes between two versions of a coin list, matched by id."""
+
+    added: list[CoinInfo] = field(default_factory=list)
+    removed: list[CoinInfo] = field(default_factory=list)
+    """Coins as they were before removal."""
+    changed: list[tuple[CoinInfo, CoinInfo]] = field(default_factory=list)
+    """(before, after) pairs of coins whose symbol, name or rank changed."""
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def symbols(self) -> set[str]:
+        """Return every symbol whose coins are affected, before and after the changes."""
+        symbols = {coin.symbol for coin in chain(self.added, self.removed)}
+        for before, after in self.changed:
+            symbols.add(before.symbol)
+            symbols.add(after.symbol)
+        return symbols
+
+
+# A delta touching more than this share of a registry is cheaper to apply by rebuilding it.
+_REBUILD_FRACTION = 0.25
+
+
+class CoinRegistry:
+    """Read-only, columnar store of coins with O(1) lookups by id and symbol.
+
+    Only id, symbol, name and rank are kept, as parallel columns, instead of one dict per coin;
+    CoinInfo records are created on demand. A registry is never modified after construction:
+    a refresh derives a new one, with update() or from scratch, and publishes it with a single
+    assignment.
+    """
+
+    __slots__ = ("_ids", "_symbols", "_names", "_ranks", "_row_by_id", "_rows_by_symbol", "_memory_bytes")
+
+    def __init__(self, coins: Iterable[CoinInfo]) -> None:
+        """Build the registry.
+
+        Args:
+            coins: Coins in source order; a repeated id keeps its first occurrence
+        """
+        ids: list[str | int] = []
+        symbols: list[str] = []
+        names: list[str] = []
+        ranks = array("I")
+        row_by_id: dict[str | int, int] = {}
+        for coin in coins:
+            if coin.id in row_by_id:
+                continue
+            row_by_id[coin.id] = len(ids)
+            ids.append(coin.id)
+            symbols.append(sys.intern(coin.symbol))
+            names.append(coin.name)
+            ranks.append(coin.rank or 0)
+        self._set_columns(ids, symbols, names, ranks, row_by_id)
+
+    @staticmethod
+    def _group_order(ranks: array, row: int) -> tuple[bool, int, int]:
+        # Ranked coins first, best rank first; unranked coins keep row (source) order after them.
+        return ranks[row] == 0, ranks[row], row
+
+    def _set_columns(
+        self,
+        ids: list[str | int],
+        symbols: list[str],
+        names: list[str],
+        ranks: array,
+        row_by_id: dict[str | int, int],
+    ) -> None:
+        by_rank = sorted(range(len(ids)), key=lambda row: self._group_order(ranks, row))
+        grouped: dict[str, list[int]] = {}
+        for row in by_rank:
+            grouped.setdefault(symbols[row], []).append(row)
+
+        self._ids = ids
+        self._symbols = symbols
+        self._names = names
+        self._ranks = ranks
+        self._row_by_id = row_by_id
+        # Most symbols belong to a single coin, so a bare row number is stored instead of a 1-tuple.
+        self._rows_by_symbol: dict[str, int | tuple[int, ...]] = {
+            symbol: rows[0] if len(rows) == 1 else tuple(rows) for symbol, rows in grouped.items()
+        }
+        self._memory_bytes: int | None = None
+
+    @classmethod
+    def from_dicts(cls, items: Iterable[dict[str, Any]]) -> "CoinRegistry":
+        """Build a registry from upstream list items, dropping every field but id, symbol, name and rank.
+
+        Args:
+            items: Dicts with 'id', 'symbol', 'name' and optionally 'rank'
+
+        Returns:
+            CoinRegistry instance
+        """
+        return cls(CoinInfo.from_dict(item) for item in items)
+
+    @classmethod
+    def from_columns(cls, ids: list[str | int], symbols: list[str], names: list[str], ranks: array) -> "CoinRegistry":
+        """Rebuild a registry from the columns of another one, e.g. read back from a snapshot.
+
+        Args:
+            ids: Unique coin ids
+            symbols: Symbol of each coin
+            names: Name of each coin
+            ranks: array('I') of ranks, 0 for unranked
+
+        Returns:
+            CoinRegistry instance
+
+        Raises:
+            ValueError: If the columns differ in length or ids repeat
+        """
+        if not len(ids) == len(symbols) == len(names) == len(ranks):
+            raise ValueError("registry columns differ in length")
+        row_by_id = {coin_id: row for row, coin_id in enumerate(ids)}
+        if len(row_by_id) != len(ids):
+            raise ValueError("registry ids are not unique")
+        registry = cls.__new__(cls)
+        registry._set_columns(ids, [sys.intern(symbol) for symbol in symbols], names, ranks, row_by_id)
+        return registry
+
+    def rank_delta(self, ranks: Mapping[str | int, int]) -> CoinDelta:
+        """Compute the delta that sets every coin's rank from a ranking.
+
+        Args:
+            ranks: Rank by coin id; coins missing from it become unranked
+
+        Returns:
+            Changes for the coins whose rank differs
+        """
+        delta = CoinDelta()
+        for row, coin_id in enumerate(self._ids):
+            rank = ranks.get(coin_id, 0)
+            if rank != self._ranks[row]:
+                before = self._row(row)
+                delta.changed.append((before, CoinInfo(coin_id, before.symbol, before.name, rank or None)))
+        return delta
+
+    def diff(self, coins: Iterable[CoinInfo]) -> CoinDelta:
+        """Compare a freshly downloaded list against the registry.
+
+        Args:
+            coins: Coins of the new list; a repeated id keeps its first occurrence
+
+        Returns:
+            Coins added, removed and changed by the new list
+        """
+        delta = CoinDelta()
+        seen: set[str | int] = set()
+        for coin in coins:
+            if coin.id in seen:
+                continue
+            seen.add(coin.id)
+            row = self._row_by_id.get(coin.id)
+            if row is None:
+                delta.added.append(coin)
+            elif (
+                coin.symbol != self._symbols[row]
+                or coin.name != self._names[row]
+                or (coin.rank or 0) != self._ranks[row]
+            ):
+                delta.changed.append((self._row(row), coin))
+        if len(seen) - len(delta.added) < len(self._ids):
+            delta.removed = [self._row(row) for coin_id, row in self._row_by_id.items() if coin_id not in seen]
+        return delta
+
+    def update(self, delta: CoinDelta) -> "CoinRegistry":
+        """Return a new registry with a delta applied, leaving this one untouched.
+
+        Only the rows and symbol groups touched by the delta are recomputed; the rest of the
+        indexes is copied as is. A removed row is filled with the last row, so rows stay dense.
+        Large deltas fall back to a full rebuild.
+
+        Args:
+            delta: Changes computed by diff() against this registry
+
+        Returns:
+            Updated CoinRegistry
+        """
+        if len(delta) > _REBUILD_FRACTION * len(self._ids):
+            removed = {coin.id for coin in delta.removed}
+            changed = {after.id: after for _before, after in delta.changed}
+            kept = (changed.get(coin.id, coin) for coin in self if coin.id not in removed)
+            return CoinRegistry(chain(kept, delta.added))
+
+        ids = self._ids.copy()
+        symbols = self._symbols.copy()
+        names = self._names.copy()
+        ranks = array("I", self._ranks)
+        row_by_id = self._row_by_id.copy()
+        rows_by_symbol = self._rows_by_symbol.copy()
+        # Rows of every symbol touched so far, loaded from the index before their first change.
+        members: dict[str, set[int]] = {}
+
+        def rows_of(symbol: str) -> set[int]:
+            if symbol not in members:
+                rows = rows_by_symbol.get(symbol, ())
+                members[symbol] = {rows} if isinstance(rows, int) else set(rows)
+            return members[symbol]
+
+        for coin in delta.removed:
+            row = row_by_id.pop(coin.id)
+            last = len(ids) - 1
+            rows_of(symbols[row]).discard(row)
+            if row != last:
+                rows_of(symbols[last]).discard(last)
+                rows_of(symbols[last]).add(row)
+                ids[row], symbols[row], names[row], ranks[row] = ids[last], symbols[last], names[last], ranks[last]
+                row_by_id[ids[row]] = row
+            del ids[last], symbols[last], names[last], ranks[last]
+
+        for _before, coin in delta.changed:
+            row = row_by_id[coin.id]
+            rows_of(symbols[row]).discard(row)
+            symbols[row], names[row], ranks[row] = sys.intern(coin.symbol), coin.name, coin.rank or 0
+            rows_of(symbols[row]).add(row)
+
+        for coin in delta.added:
+            row_by_id[coin.id] = len(ids)
+            rows_of(coin.symbol).add(len(ids))
+            ids.append(coin.id)
+            symbols.append(sys.intern(coin.symbol))
+            names.append(coin.name)
+            ranks.append(coin.rank or 0)
+
+        for symbol, rows in members.items():
+            if not rows:
+                rows_by_symbol.pop(symbol, None)
+                continue
+            ordered = sorted(rows, key=lambda row: self._group_order(ranks, row))
+            rows_by_symbol[symbol] = ordered[0] if len(ordered) == 1 else tuple(ordered)
+
+        registry = CoinRegistry.__new__(CoinRegistry)
+        registry._ids = ids
+        registry._symbols = symbols
+        registry._names = names
+        registry._ranks = ranks
+        registry._row_by_id = row_by_id
+        registry._rows_by_symbol = rows_by_symbol
+        registry._memory_bytes = None
+        return registry
+
+    def columns(self) -> tuple[list[str | int], list[str], list[str], array]:
+        """Return the ids, symbols, names and ranks columns; callers must not modify them."""
+        return self._ids, self._symbols, self._names, self._ranks
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, coin_id: object) -> bool:
+        return coin_id in self._row_by_id
+
+    def __iter__(self) -> Iterator[CoinInfo]:
+        return (self._row(row) for row in range(len(self._ids)))
+
+    def _row(self, row: int) -> CoinInfo:
+        return CoinInfo(self._ids[row], self._symbols[row], self._names[row], self._ranks[row] or None)
+
+    def _symbol_rows(self, symbol: str) -> tuple[int, ...]:
+        rows = self._rows_by_symbol.get(symbol, ())
+        return (rows,) if isinstance(rows, int) else rows
+
+    def get(self, coin_id: str | int) -> CoinInfo | None:
+        """Look up a coin by id.
+
+        Args:
+            coin_id: Coin id
+
+        Returns:
+            CoinInfo, or None if the id is unknown
+        """
+        row = self._row_by_id.get(coin_id)
+        return None if row is None else self._row(row)
+
+    def ids_for_symbol(self, symbol: str) -> list[str | int]:
+        """Return the ids of every coin with a symbol, best rank first.
+
+        Args:
+            symbol: Symbol, in the case used by the source list
+
+        Returns:
+            Matching ids; unranked coins follow in source order
+        """
+        return [self._ids[row] for row in self._symbol_rows(symbol)]
+
+    def candidates(self, symbol: str) -> list[CoinInfo]:
+        """Return every coin with a symbol, best rank first.
+
+        Args:
+            symbol: Symbol, in the case used by the source list
+
+        Returns:
+            Matching coins; unranked coins follow in source order
+        """
+        return [self._row(row) for row in self._symbol_rows(symbol)]
+
+    def dominant(self, symbol: str, ratio: float) -> CoinInfo | None:
+        """Return the coin a symbol almost certainly refers to, if any.
+
+        A coin dominates when it is the only one with the symbol, or when it is ranked and the
+        next best coin is unranked or ranked at least `ratio` times lower (e.g. 1 vs 10 or worse).
+
+        Args:
+            symbol: Symbol, in the case used by the source list
+            ratio: Minimum rank ratio between the runner-up and the best coin
+
+        Returns:
+            Dominant coin, or None if the user has to choose
+        """
+        rows = self._symbol_rows(symbol)
+        if not rows:
+            return None
+        if len(rows) > 1:
+            best, runner_up = self._ranks[rows[0]], self._ranks[rows[1]]
+            if not best or (runner_up and runner_up < ratio * best):
+                return None
+        return self._row(rows[0])
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the registry, including its strings and indexes.
+
+        Returns:
+            Size in bytes, computed once and cached
+        """
+        if self._memory_bytes is None:
+            seen: set[int] = set()
+            total = sum(
+                sys.getsizeof(container)
+                for container in (self._ids, self._symbols, self._names, self._ranks, self._row_by_id)
+            )
+            total += sys.getsizeof(self._rows_by_symbol)
+            for value in chain(self._ids, self._symbols, self._names, self._rows_by_symbol.values()):
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    total += sys.getsizeof(value)
+            self._memory_bytes = total
+        return self._memory_bytes
+
+    def bytes_per_entry(self) -> float:
+        """Average memory per coin.
+
+        Returns:
+            memory_bytes() divided by the number of coins, or 0 for an empty registry
+        """
+        return self.memory_bytes() / len(self) if self._ids else 0.0
 
 
 @dataclass
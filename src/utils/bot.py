@@ -2,16 +2,41 @@
 
 import io
 import logging
+from collections.abc import Hashable
 from typing import Any
 
-from telegram import ForceReply, InlineKeyboardMarkup, ReplyKeyboardMarkup, ReplyKeyboardRemove
+from opentelemetry import metrics as otel_metrics
+from telegram import ForceReply, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, ReplyKeyboardRemove
 from telegram.constants import ParseMode
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes
 
+from src.constants import CallbackPrefix
+from src.utils.chart_cache import chart_image_cache
 from src.utils.formatters import mk2_formatter
 
 logger = logging.getLogger(__name__)
 
+meter = otel_metrics.get_meter("h-crypto-price-bot.bot")
+photos_sent_total = meter.create_counter(
+    "bot.telegram.photos_sent_total",
+    unit="1",
+    description="Photos sent to Telegram, by whether the image was uploaded or referenced by file_id",
+)
+
+
+def other_matches_button(callback_prefix: str, symbol: str) -> InlineKeyboardButton:
+    """Build the button that lists every coin sharing a symbol, for answers given without asking.
+
+    Args:
+        callback_prefix: Prefix of the buttons in that list, e.g. CallbackPrefix.CG to show the price
+        symbol: Symbol as typed by the user
+
+    Returns:
+        Inline keyboard button
+    """
+    return InlineKeyboardButton("🔀 other matches", callback_data=f"{CallbackPrefix.OTHERS}_{callback_prefix}.{symbol}")
+
 
 async def send_tg(
     ctx: ContextTypes.DEFAULT_TYPE,
@@ -21,9 +46,13 @@ async def send_tg(
     reply_markup: (InlineKeyboardMarkup | ReplyKeyboardMarkup | ReplyKeyboardRemove | ForceReply | None) = None,
     disable_web_page_preview: bool = True,
     mk_parse: bool = True,
+    cache_key: Hashable | None = None,
 ) -> None:
     """Send a message or photo to a Telegram chat.
 
+    A photo sent with the chart image cache key it was cached under is uploaded once; while
+    the cached image stays fresh, later sends reference the file_id Telegram returned.
+
     Args:
         ctx: Telegram context
         chat_id: Chat ID to send message to
@@ -32,6 +61,7 @@ async def send_tg(
         reply_markup: Optional keyboard markup
         disable_web_page_preview: Whether to disable web page previews
         mk_parse: Whether to apply MarkdownV2 formatting to text
+        cache_key: Optional chart image cache key of the photo
 
     Raises:
         Exception: If message sending fails after retries
@@ -47,9 +77,20 @@ async def send_tg(
             text = mk2_formatter(text)
 
         if photo:
-            send_kwargs["photo"] = photo
             send_kwargs["caption"] = text
-            await ctx.bot.send_photo(**send_kwargs)
+            file_id = chart_image_cache.file_id(cache_key) if cache_key is not None else None
+            if file_id:
+                try:
+                    await ctx.bot.send_photo(photo=file_id, **send_kwargs)
+                    photos_sent_total.add(1, {"photo.sent_as": "file_id"})
+                    return
+                except BadRequest as e:
+                    logger.warning(f"Cached file_id rejected, uploading the photo again: {e}")
+                    chart_image_cache.set_file_id(cache_key, None)
+            message = await ctx.bot.send_photo(photo=photo, **send_kwargs)
+            photos_sent_total.add(1, {"photo.sent_as": "upload"})
+            if cache_key is not None and message.photo:
+                chart_image_cache.set_file_id(cache_key, message.photo[-1].file_id)
         else:
             send_kwargs["disable_web_page_preview"] = disable_web_page_preview
             send_kwargs["text"] = text
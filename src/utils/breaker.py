@@ -0,0 +1,104 @@
+"""Circuit breaker for upstream services."""
+
+from collections.abc import Callable
+from enum import StrEnum
+from time import monotonic
+
+
+class BreakerState(StrEnum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+StateListener = Callable[[BreakerState, BreakerState], None]
+
+
+class CircuitBreaker:
+    """Stop calling an upstream after repeated failures and probe it again after a cool-down.
+
+    While closed every call is allowed. After `failure_threshold` consecutive failures the breaker
+    opens and rejects calls for `recovery_timeout` seconds, or for as long as the upstream asked with
+    Retry-After. It then lets a single probe through; the probe's outcome closes or re-opens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        recovery_timeout: float,
+        on_state_change: StateListener | None = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        """Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds the circuit stays open before a probe is allowed
+            on_state_change: Optional callback receiving (old_state, new_state)
+            clock: Monotonic time source, in seconds
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._on_state_change = on_state_change
+        self._clock = clock
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> BreakerState:
+        """Current state, moving from open to half-open once the cool-down has elapsed."""
+        if self._state is BreakerState.OPEN and self._clock() >= self._open_until:
+            self._transition(BreakerState.HALF_OPEN)
+        return self._state
+
+    def allow(self) -> bool:
+        """Check whether a call may be attempted.
+
+        Returns:
+            True if the call may proceed
+        """
+        match self.state:
+            case BreakerState.CLOSED:
+                return True
+            case BreakerState.HALF_OPEN if not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            case _:
+                return False
+
+    def release_probe(self) -> None:
+        """Free the probe slot of a half-open probe that ended without recording an outcome, e.g. when cancelled.
+
+        Must only be called by the call that was allowed as the probe, before it recorded anything.
+        """
+        if self._state is BreakerState.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        self._failures = 0
+        self._probe_in_flight = False
+        if self._state is not BreakerState.CLOSED:
+            self._transition(BreakerState.CLOSED)
+
+    def record_failure(self, retry_after: float | None = None) -> None:
+        """Record a failed call.
+
+        Args:
+            retry_after: Seconds the upstream asked clients to back off; opens the circuit immediately
+        """
+        self._failures += 1
+        self._probe_in_flight = False
+        if retry_after is not None or self._state is BreakerState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._open_until = self._clock() + (self.recovery_timeout if retry_after is None else retry_after)
+            if self._state is not BreakerState.OPEN:
+                self._transition(BreakerState.OPEN)
+
+    def _transition(self, new_state: BreakerState) -> None:
+        old_state, self._state = self._state, new_state
+        if self._on_state_change:
+            self._on_state_change(old_state, new_state)
@@ -0,0 +1,242 @@
+"""In-process TTL cache with LRU eviction and stale-while-revalidate support."""
+
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+from dataclasses import dataclass
+from enum import StrEnum
+from time import monotonic
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from src.constants import (
+    CACHE_STALE_FACTOR,
+    CACHE_TTL_CMC_QUOTES,
+    CACHE_TTL_COIN_DETAIL,
+    CACHE_TTL_GLOBAL,
+    CACHE_TTL_MARKET_CHART,
+    CACHE_TTL_SIMPLE_PRICE,
+)
+
+
+class CacheState(StrEnum):
+    """Outcome of a cache lookup."""
+
+    HIT = "hit"
+    STALE = "stale"
+    MISS = "miss"
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    size: int
+    fresh_until: float
+    stale_until: float
+
+
+class TTLCache:
+    """LRU cache bounded by total entry size, with a fresh and a stale lifetime per entry.
+
+    Fresh entries are returned as hits. Entries past their TTL but within their stale window
+    are still returned, flagged as stale, so the caller can serve them while refreshing.
+    Expired entries are kept until evicted so they remain available as a last-resort fallback.
+    """
+
+    def __init__(self, max_bytes: int, clock: Callable[[], float] = monotonic) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound on the sum of entry sizes
+            clock: Monotonic time source, in seconds
+        """
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def bytes(self) -> int:
+        """Total size of the cached entries."""
+        return self._bytes
+
+    def get(self, key: Hashable) -> tuple[Any, CacheState]:
+        """Look up a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (value, state); value is None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, CacheState.MISS
+
+        now = self._clock()
+        if now >= entry.stale_until:
+            return None, CacheState.MISS
+
+        self._entries.move_to_end(key)
+        if now < entry.fresh_until:
+            return entry.value, CacheState.HIT
+        return entry.value, CacheState.STALE
+
+    def fresh_for(self, key: Hashable) -> float:
+        """Return how long an entry will still be served as fresh.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Seconds until the entry turns stale, or 0 if it is missing or already stale
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0.0
+        return max(entry.fresh_until - self._clock(), 0.0)
+
+    def fallback(self, key: Hashable) -> Any:
+        """Return the last stored value for a key regardless of its age.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None if the key is not (or no longer) cached
+        """
+        entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale_ttl: float = 0.0, size: int = 1) -> None:
+        """Store a value, evicting least recently used entries to stay within the size bound.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Seconds the entry is served as fresh
+            stale_ttl: Additional seconds the entry may be served as stale
+            size: Size of the entry, in the same unit as max_bytes
+        """
+        self.pop(key)
+        if size > self.max_bytes:
+            return
+
+        now = self._clock()
+        self._entries[key] = _Entry(value, size, now + ttl, now + ttl + stale_ttl)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+
+    def pop(self, key: Hashable) -> Any:
+        """Remove a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The removed value, or None if the key was not cached
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._bytes -= entry.size
+        return entry.value
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
+        self._bytes = 0
+
+
+@dataclass(frozen=True, slots=True)
+class ValidatedResponse:
+    """A decoded upstream response with the validators needed to revalidate it."""
+
+    value: Any
+    etag: str | None
+    last_modified: str | None
+    size: int
+
+    @classmethod
+    def from_headers(cls, headers: Mapping[str, str], value: Any, size: int) -> "ValidatedResponse | None":
+        """Capture the validators of a response.
+
+        Args:
+            headers: Response headers
+            value: Decoded response body
+            size: Size of the raw body, in bytes
+
+        Returns:
+            ValidatedResponse, or None if the response carries neither ETag nor Last-Modified
+        """
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return None
+        return cls(value=value, etag=etag, last_modified=last_modified, size=size)
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Return the request headers that ask the upstream to answer 304 if nothing changed."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Freshness policy for a cached upstream response."""
+
+    ttl: float
+    stale_ttl: float
+
+    @classmethod
+    def from_ttl(cls, ttl: float) -> "CachePolicy":
+        """Create a policy whose stale window is proportional to its TTL.
+
+        Args:
+            ttl: Seconds a response is served as fresh
+
+        Returns:
+            CachePolicy instance
+        """
+        return cls(ttl=ttl, stale_ttl=ttl * CACHE_STALE_FACTOR)
+
+
+_COIN_DETAIL_PATH = re.compile(r"/api/v3/coins/(?!list$|markets$)[^/]+$")
+_MARKET_CHART_PATH = re.compile(r"/api/v3/coins/[^/]+/market_chart$")
+
+
+def cache_policy(url: str) -> CachePolicy | None:
+    """Return the cache policy for an upstream URL.
+
+    Args:
+        url: Absolute request URL
+
+    Returns:
+        CachePolicy for cacheable endpoints, or None if the response must not be cached
+    """
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/")
+
+    if _MARKET_CHART_PATH.search(path):
+        days = parse_qs(parts.query).get("days", [""])[0]
+        ttl = CACHE_TTL_MARKET_CHART.get(days)
+        return CachePolicy.from_ttl(ttl) if ttl else None
+    if _COIN_DETAIL_PATH.search(path):
+        return CachePolicy.from_ttl(CACHE_TTL_COIN_DETAIL)
+    if path.endswith("/api/v3/global"):
+        return CachePolicy.from_ttl(CACHE_TTL_GLOBAL)
+    if path.endswith("/api/v3/simple/price"):
+        return CachePolicy.from_ttl(CACHE_TTL_SIMPLE_PRICE)
+    if path.endswith("/cryptocurrency/quotes/latest"):
+        return CachePolicy.from_ttl(CACHE_TTL_CMC_QUOTES)
+    return None
@@ -0,0 +1,157 @@
+"""Cache of encoded chart images shared across chats."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from time import monotonic
+
+from opentelemetry import metrics as otel_metrics
+from opentelemetry.metrics import Observation
+
+from src.config import settings as s
+from src.constants import CACHE_TTL_MARKET_CHART
+from src.utils.cache import CacheState, TTLCache
+
+meter = otel_metrics.get_meter("h-crypto-price-bot.chart_cache")
+chart_cache_requests_total = meter.create_counter(
+    "bot.chart.cache.requests_total",
+    unit="1",
+    description="Chart image cache lookups by result",
+)
+
+ChartKey = tuple[str, str, str, int]
+
+
+@dataclass(slots=True)
+class _CachedChart:
+    image: bytes
+    file_id: str | None = None
+
+
+def chart_image_ttl(period: str) -> int:
+    """Return how long a chart image of a period stays fresh: as long as the chart data it is drawn from.
+
+    Args:
+        period: Chart period in days
+
+    Returns:
+        TTL in seconds; periods without a data TTL get the longest one
+    """
+    return CACHE_TTL_MARKET_CHART.get(period, max(CACHE_TTL_MARKET_CHART.values()))
+
+
+class ChartImageCache:
+    """LRU cache of encoded chart images bounded by their total size.
+
+    Images are keyed by coin, period, theme and the bucket of the upstream data timestamp, so
+    every chat asking for the same chart within one bucket gets the same image without a render.
+    Once an image has been uploaded, its Telegram file_id is kept with it so it can be sent
+    again by reference until the image expires.
+    """
+
+    def __init__(self, max_bytes: int, clock: Callable[[], float] = monotonic) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound on the total size of the cached images
+            clock: Monotonic time source, in seconds
+        """
+        self._images = TTLCache(max_bytes=max_bytes, clock=clock)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of lookups answered from the cache since startup."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @staticmethod
+    def key(coin: str, period: str, template: str, updated_at_ms: float) -> ChartKey:
+        """Build the cache key of a chart.
+
+        Args:
+            coin: CoinGecko coin ID
+            period: Chart period in days
+            template: Chart theme
+            updated_at_ms: Timestamp of the last data point, in milliseconds
+
+        Returns:
+            Cache key
+        """
+        return coin, period, template, int(updated_at_ms // (chart_image_ttl(period) * 1000))
+
+    def get(self, key: ChartKey) -> bytes | None:
+        """Look up a chart image.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Encoded image, or None if it is not cached or no longer fresh
+        """
+        cached, state = self._images.get(key)
+        if state is not CacheState.HIT:
+            self.misses += 1
+            chart_cache_requests_total.add(1, {"cache.result": CacheState.MISS})
+            return None
+        self.hits += 1
+        chart_cache_requests_total.add(1, {"cache.result": CacheState.HIT})
+        return cached.image
+
+    def set(self, key: ChartKey, image: bytes) -> None:
+        """Store a chart image for as long as its period's data stays fresh.
+
+        Args:
+            key: Cache key
+            image: Encoded image
+        """
+        self._images.set(key, _CachedChart(image), chart_image_ttl(key[1]), size=len(image))
+
+    def file_id(self, key: ChartKey) -> str | None:
+        """Return the Telegram file_id of a cached image that is still fresh.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            file_id, or None if the image was never uploaded or is no longer fresh
+        """
+        if self._images.fresh_for(key) <= 0:
+            return None
+        return self._images.fallback(key).file_id
+
+    def set_file_id(self, key: ChartKey, file_id: str | None) -> None:
+        """Record (or, with None, drop) the Telegram file_id of a cached image.
+
+        Args:
+            key: Cache key
+            file_id: file_id returned by Telegram for the uploaded image
+        """
+        cached = self._images.fallback(key)
+        if cached is not None:
+            cached.file_id = file_id
+
+    # Defined last: the property shadows the builtin in annotations evaluated after it.
+    @property
+    def bytes(self) -> int:
+        """Total size of the cached images."""
+        return self._images.bytes
+
+
+chart_image_cache = ChartImageCache(max_bytes=s.CHART_CACHE_MAX_BYTES)
+
+meter.create_observable_gauge(
+    "bot.chart.cache.bytes",
+    callbacks=[lambda _options: [Observation(chart_image_cache.bytes)]],
+    unit="By",
+    description="Encoded image bytes held by the chart image cache",
+)
+meter.create_observable_gauge(
+    "bot.chart.cache.hit_ratio",
+    callbacks=[lambda _options: [Observation(chart_image_cache.hit_ratio)]],
+    unit="1",
+    description="Share of chart image lookups answered from the cache since startup",
+)
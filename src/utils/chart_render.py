@@ -0,0 +1,127 @@
+"""Chart image rendering, run in the worker processes of the chart render pool.
+
+This module only imports matplotlib and NumPy so that worker processes start quickly. Workers
+load nothing else from the bot as long as it is started with `python -m src`; multiprocessing
+re-imports any other main module, such as src.main, in every worker. Charts are drawn on a standalone Figure
+with its own Agg canvas rather than through pyplot, whose global figure registry is not
+thread-safe, so render_chart can run in several threads at once.
+"""
+
+import io
+import time
+from collections.abc import Sequence
+from itertools import chain
+
+import matplotlib.dates as mdates
+import matplotlib.ticker as mticker
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+def market_chart_arrays(points: Sequence[Sequence[float]]) -> tuple[np.ndarray, np.ndarray]:
+    """Convert CoinGecko market_chart [timestamp_ms, value] pairs into the arrays render_chart takes.
+
+    Args:
+        points: Pairs of (unix time in milliseconds, value), e.g. the "prices" of a market_chart response
+
+    Returns:
+        Tuple of (datetime64[ms] times, float64 values); null values become NaN
+    """
+    try:
+        flat = np.fromiter(chain.from_iterable(points), np.float64, count=2 * len(points)).reshape(-1, 2)
+    except TypeError:
+        # fromiter rejects the nulls CoinGecko sends for missing values; np.array turns them into NaN.
+        flat = np.array(points, dtype=np.float64).reshape(-1, 2)
+    return flat[:, 0].astype("datetime64[ms]"), flat[:, 1]
+
+
+def warm_up() -> None:
+    """Worker initializer: load the Agg backend, fonts and JPEG encoder before the first chart is requested."""
+    render_chart(np.array([0, 60], dtype="datetime64[s]"), np.array([1.0, 2.0]), "", "", "dark", "1")
+
+
+def render_chart(times: np.ndarray, prices: np.ndarray, title: str, bottom: str, template: str, period: str) -> bytes:
+    """Render a price line chart as a JPEG.
+
+    Args:
+        times: datetime64 sample times
+        prices: float64 prices, same length as times
+        title: Chart title
+        bottom: X axis label
+        template: Chart theme, "dark" or "light"
+        period: Chart period in days, used to pick the date format
+
+    Returns:
+        Encoded JPEG bytes
+    """
+    is_dark = template in ("plotly_dark", "dark")
+
+    if is_dark:
+        bg_color = "#1a1a2e"
+        text_color = "#e0e0e0"
+        line_color = "#00cc96"
+        grid_color = "#2a2a3e"
+    else:
+        bg_color = "#ffffff"
+        text_color = "#333333"
+        line_color = "#636efa"
+        grid_color = "#d0d0d0"
+
+    # Nothing outside this call references the figure, so it is freed with it, even on errors.
+    fig = Figure(figsize=(10, 5.5))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    fig.patch.set_facecolor(bg_color)
+    ax.set_facecolor(bg_color)
+
+    ax.plot(times, prices, color=line_color, linewidth=2)
+
+    ax.set_title(title, color=text_color, fontsize=16, fontweight="bold", pad=12)
+    ax.set_xlabel(bottom, color=text_color, fontsize=10)
+    ax.set_ylabel("price ($)", color=text_color, fontsize=10)
+
+    ax.tick_params(colors=text_color, labelsize=9)
+    ax.grid(True, color=grid_color, alpha=0.4, linestyle="--")
+
+    ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, _p: f"${x:,.0f}"))
+
+    # Let AutoDateLocator pick optimal tick positions, then format based on period
+    period_days = int(period) if period.isdigit() else 365
+    if period_days <= 1:
+        date_fmt = "%H:%M"
+    elif period_days <= 7:
+        date_fmt = "%a %d"
+    elif period_days <= 90:
+        date_fmt = "%b %d"
+    else:
+        date_fmt = "%b %Y"
+
+    locator = mdates.AutoDateLocator(minticks=4, maxticks=10)
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter(date_fmt))
+    fig.autofmt_xdate(rotation=0, ha="center")
+
+    for spine in ax.spines.values():
+        spine.set_edgecolor(grid_color)
+
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="jpg", dpi=150, facecolor=bg_color)
+    return buffer.getvalue()
+
+
+def timed_render_chart(*args: object) -> tuple[bytes, float, float]:
+    """Run render_chart and report when it started and how long it took.
+
+    Args:
+        *args: Arguments of render_chart
+
+    Returns:
+        Tuple of (JPEG bytes, start as unix time, render duration in seconds)
+    """
+    started_at = time.time()
+    started = time.perf_counter()
+    image = render_chart(*args)
+    return image, started_at, time.perf_counter() - started
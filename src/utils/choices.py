@@ -0,0 +1,66 @@
+"""Per-chat memory of the coin picked for an ambiguous symbol."""
+
+from collections.abc import Hashable
+
+
+class ChoiceMemory:
+    """Remember which coin each chat picked for each ambiguous symbol.
+
+    Entries are keyed by (chat, source, symbol), so CoinGecko and CoinMarketCap choices are kept
+    apart. At most `max_entries` entries are tracked across all chats, least recently used evicted first.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialize the memory.
+
+        Args:
+            max_entries: Maximum number of remembered choices
+        """
+        self.max_entries = max_entries
+        # Plain dict in least-recently-used order; used keys are re-inserted at the end.
+        self._choices: dict[tuple[Hashable, str, str], str | int] = {}
+
+    def __len__(self) -> int:
+        return len(self._choices)
+
+    def remember(self, chat_id: Hashable, source: str, symbol: str, coin_id: str | int) -> None:
+        """Record the coin a chat picked for a symbol.
+
+        Args:
+            chat_id: Chat identifier
+            source: Coin list the coin belongs to, e.g. CallbackPrefix.CG
+            symbol: Symbol, in any case
+            coin_id: Picked coin id
+        """
+        key = (chat_id, source, symbol.lower())
+        self._choices.pop(key, None)
+        self._choices[key] = coin_id
+        while len(self._choices) > self.max_entries:
+            del self._choices[next(iter(self._choices))]
+
+    def recall(self, chat_id: Hashable, source: str, symbol: str) -> str | int | None:
+        """Return the coin a chat last picked for a symbol, marking the choice as recently used.
+
+        Args:
+            chat_id: Chat identifier
+            source: Coin list the coin belongs to
+            symbol: Symbol, in any case
+
+        Returns:
+            Coin id, or None if the chat never picked one
+        """
+        key = (chat_id, source, symbol.lower())
+        coin_id = self._choices.pop(key, None)
+        if coin_id is not None:
+            self._choices[key] = coin_id
+        return coin_id
+
+    def forget(self, chat_id: Hashable, source: str, symbol: str) -> None:
+        """Drop a chat's choice for a symbol, e.g. when the coin left the list.
+
+        Args:
+            chat_id: Chat identifier
+            source: Coin list the coin belongs to
+            symbol: Symbol, in any case
+        """
+        self._choices.pop((chat_id, source, symbol.lower()), None)
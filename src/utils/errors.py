@@ -1,6 +1,10 @@
-from telegram import Update
+from opentelemetry import propagate as otel_propagate
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
+from src.constants import MAX_SYMBOL_SUGGESTIONS, MESSAGE_DID_YOU_MEAN
+from src.utils.search import SymbolSearchIndex
+
 
 async def send_error(e_type: str, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     errors = {
@@ -12,3 +16,41 @@ async def send_error(e_type: str, update: Update, context: ContextTypes.DEFAULT_
     cur_error = errors.get(e_type, "Generic error.")
 
     await context.bot.send_message(chat_id=update.effective_chat.id, text=cur_error)
+
+
+async def send_symbol_error(
+    symbol: str,
+    index: SymbolSearchIndex,
+    callback_prefix: str,
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+) -> None:
+    """Reply to an unknown symbol, offering the coins of similar symbols as buttons when there are any.
+
+    Args:
+        symbol: Symbol as typed by the user
+        index: Search index of the coin list the symbol was looked up in
+        callback_prefix: Callback prefix of the buttons, e.g. CallbackPrefix.CG to show the price
+        update: Telegram update object
+        context: Telegram context
+    """
+    coins = index.coins(index.similar(symbol), limit=MAX_SYMBOL_SUGGESTIONS)
+    if not coins:
+        await send_error("symbol", update, context)
+        return
+
+    # Propagate current trace context so the callback handler can link back to this trace
+    carrier: dict[str, str] = {}
+    otel_propagate.inject(carrier)
+    if carrier:
+        context.user_data["_trace_carrier"] = carrier
+
+    keyboard = [
+        [InlineKeyboardButton(f"{coin.symbol.upper()} · {coin.name}", callback_data=f"{callback_prefix}.{coin.id}")]
+        for coin in coins
+    ]
+    await context.bot.send_message(
+        chat_id=update.effective_chat.id,
+        text=MESSAGE_DID_YOU_MEAN.format(symbol),
+        reply_markup=InlineKeyboardMarkup(keyboard),
+    )
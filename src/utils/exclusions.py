@@ -0,0 +1,67 @@
+"""Single-pass matching of coin ids against many excluded substrings."""
+
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+
+
+def _trie_regex(patterns: Iterable[str]) -> str:
+    """Build a regex matching any of the patterns, with shared prefixes factored into a trie.
+
+    Factoring keeps the alternation small at every position, so a search costs roughly the
+    length of the id instead of the number of patterns.
+    """
+    trie: dict = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _node_regex(trie)
+
+
+def _node_regex(node: dict) -> str:
+    # A pattern ending here already matches; longer patterns sharing this prefix add nothing to a search.
+    if "" in node:
+        return ""
+    branches = [re.escape(char) + _node_regex(child) for char, child in sorted(node.items())]
+    if len(branches) == 1:
+        return branches[0]
+    return f"(?:{'|'.join(branches)})"
+
+
+class ExclusionMatcher:
+    """Test whether a coin id contains any excluded substring, in one regex search."""
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        """Compile the exclusion patterns.
+
+        Args:
+            patterns: Substrings that exclude any id containing them
+        """
+        patterns = set(patterns)
+        self._regex = re.compile(_trie_regex(patterns)) if patterns else None
+
+    def matches(self, coin_id: str) -> bool:
+        """Return True if the id contains any excluded substring.
+
+        Args:
+            coin_id: CoinGecko coin id
+
+        Returns:
+            Whether the id is excluded
+        """
+        return self._regex is not None and self._regex.search(coin_id) is not None
+
+
+@lru_cache(maxsize=4)
+def compile_exclusions(patterns: frozenset[str]) -> ExclusionMatcher:
+    """Return the matcher for a set of patterns, compiling it only the first time the set is seen.
+
+    Args:
+        patterns: Excluded substrings
+
+    Returns:
+        ExclusionMatcher for the patterns
+    """
+    return ExclusionMatcher(patterns)
@@ -1,13 +1,31 @@
+import asyncio
+import json
 import logging
+import math
+import random
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import replace
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from pathlib import Path
 from time import perf_counter
+from typing import Any
 
 import httpx
 import logfire
 from opentelemetry import metrics as otel_metrics
 from opentelemetry import trace as otel_trace
+from opentelemetry.metrics import Observation
 from opentelemetry.trace import StatusCode
 
 from src.config import settings as s
+from src.constants import COINGECKO_API_BASE, COINMARKETCAP_API_BASE, ETHERSCAN_API_BASE, MAX_REQUESTS_PER_HOUR
+from src.utils.breaker import BreakerState, CircuitBreaker, StateListener
+from src.utils.cache import CachePolicy, CacheState, TTLCache, ValidatedResponse, cache_policy
+from src.utils.jsonstream import JSONArrayStream
+from src.utils.ratelimit import GCRALimiter
+from src.utils.scheduler import DEFAULT_DEADLINES, DeadlineExceededError, Priority, TokenBucketScheduler
+from src.utils.tracking import CallTracker
 
 api_headers = {"X-API-KEY": s.hcpb_api_key.get_secret_value()} if s.hcpb_api_key else None
 
@@ -27,66 +45,675 @@ api_duration_seconds = meter.create_histogram(
     unit="s",
     description="Duration of external API calls",
 )
+api_inflight_requests = meter.create_up_down_counter(
+    "bot.api.inflight_requests",
+    unit="1",
+    description="Number of external API requests currently in flight",
+)
+api_connections_opened_total = meter.create_counter(
+    "bot.api.connections_opened_total",
+    unit="1",
+    description="New connections opened per service; close to bot.api.calls_total when keep-alive is not reused",
+)
+api_coalesced_total = meter.create_counter(
+    "bot.api.coalesced_total",
+    unit="1",
+    description="Total number of API calls served by joining an identical in-flight request",
+)
+api_retries_total = meter.create_counter(
+    "bot.api.retries_total",
+    unit="1",
+    description="Total number of retried external API calls",
+)
+breaker_transitions_total = meter.create_counter(
+    "bot.api.breaker.transitions_total",
+    unit="1",
+    description="Circuit breaker state changes per service",
+)
+api_not_modified_total = meter.create_counter(
+    "bot.api.not_modified_total",
+    unit="1",
+    description="Total number of conditional requests answered with 304 Not Modified",
+)
+api_bytes_saved_total = meter.create_counter(
+    "bot.api.bytes_saved_total",
+    unit="By",
+    description="Response body bytes not downloaded thanks to 304 Not Modified",
+)
+prefetch_requests_total = meter.create_counter(
+    "bot.prefetch.requests_total",
+    unit="1",
+    description="Background prefetches by result (refreshed, fresh)",
+)
+cache_requests_total = meter.create_counter(
+    "bot.cache.requests_total",
+    unit="1",
+    description="Response cache lookups by result (hit, stale, miss, fallback)",
+)
+scheduler_wait_seconds = meter.create_histogram(
+    "bot.scheduler.wait_seconds",
+    unit="s",
+    description="Time outbound requests waited for a rate-limit token",
+)
+scheduler_shed_total = meter.create_counter(
+    "bot.scheduler.shed_total",
+    unit="1",
+    description="Total number of outbound requests dropped because their deadline could not be met",
+)
 rate_limit_exceeded_total = meter.create_counter(
     "bot.rate_limit.exceeded_total",
     unit="1",
     description="Total number of rate limit blocks",
 )
 
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class UpstreamUnavailableError(Exception):
+    """Raised when an upstream service is not being called because of rate limiting or an open circuit."""
+
+
+class NotModifiedError(Exception):
+    """Raised by stream_json_array when the upstream reports the resource unchanged since the last download."""
+
+
+# One long-lived client per upstream service, so TCP/TLS (and HTTP/2) connections are reused across commands.
+_clients: dict[str, httpx.AsyncClient] = {}
+
+# Identical GETs issued while one is already in flight share its result instead of hitting the upstream again.
+RequestKey = tuple[str, tuple[tuple[str, str], ...]]
+_inflight: dict[RequestKey, asyncio.Task] = {}
+
+# Outbound token buckets, one per rate-limited service (see UPSTREAM_CALLS_PER_MINUTE).
+_schedulers: dict[str, TokenBucketScheduler] = {}
+
+# Circuit breakers, one per upstream service.
+_breakers: dict[str, CircuitBreaker] = {}
+
+# Per-chat allowance of MAX_REQUESTS_PER_HOUR, enforced locally and reconciled with hcpb-api.
+chat_rate_limiter = GCRALimiter(limit=MAX_REQUESTS_PER_HOUR, period=3600, max_keys=s.RATE_LIMIT_MAX_CHATS)
+
+# Decoded responses of cacheable endpoints, bounded by the size of their raw payloads.
+response_cache = TTLCache(max_bytes=s.RESPONSE_CACHE_MAX_BYTES)
+
+# Last response carrying an ETag or Last-Modified, per request, so refreshes can be conditional. Responses of
+# cacheable endpoints keep only their validators here; their decoded value is read back from response_cache.
+validated_cache = TTLCache(max_bytes=s.VALIDATED_CACHE_MAX_BYTES)
+
+Decoder = Callable[[bytes], Any]
+
+
+def _warmup_urls() -> dict[str, str]:
+    urls = {"coingecko": f"{COINGECKO_API_BASE}/ping"}
+    if s.CMC_API_KEY.get_secret_value():
+        urls["coinmarketcap"] = COINMARKETCAP_API_BASE
+    if s.ETHSCAN_API_KEY:
+        urls["etherscan"] = ETHERSCAN_API_BASE
+    if s.hcpb_api_url:
+        urls["hcpb-api"] = s.hcpb_api_url
+    return urls
+
+
+def _connection_tracer(service: str) -> Callable[[httpx.Request], Awaitable[None]]:
+    """Return a request event hook counting the connections the service's pool opens.
+
+    The hook installs httpx's "trace" request extension, which reports each new TCP connection.
+    """
+    attrs = {"api.service": service}
+
+    async def trace(event_name: str, _info: dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            api_connections_opened_total.add(1, attrs)
+
+    async def on_request(request: httpx.Request) -> None:
+        request.extensions["trace"] = trace
+
+    return on_request
+
+
+def get_client(service: str) -> httpx.AsyncClient:
+    """Return the shared client for an upstream service, creating it on first use.
+
+    Args:
+        service: Service label (e.g. 'coingecko', 'hcpb-api')
+
+    Returns:
+        Keep-alive AsyncClient dedicated to the service
+    """
+    client = _clients.get(service)
+    if client is None or client.is_closed:
+        transport = httpx.AsyncHTTPTransport(
+            http2=s.HTTP2_ENABLED,
+            limits=httpx.Limits(
+                max_connections=s.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=s.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=s.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        client = httpx.AsyncClient(
+            transport=transport, timeout=30.0, event_hooks={"request": [_connection_tracer(service)]}
+        )
+        _clients[service] = client
+    return client
+
+
+async def warm_clients() -> None:
+    """Open connections to every configured upstream so the first user command skips the handshake."""
+    urls = _warmup_urls()
+    results = await asyncio.gather(
+        *(get_client(service).head(url, timeout=5.0) for service, url in urls.items()),
+        return_exceptions=True,
+    )
+    for service, result in zip(urls, results, strict=True):
+        if isinstance(result, Exception):
+            logging.warning(f"Failed to warm {service} connection: {result}")
+
+
+async def close_clients() -> None:
+    """Close all shared clients and their connection pools."""
+    clients = list(_clients.values())
+    _clients.clear()
+    await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+
+def get_scheduler(service: str) -> TokenBucketScheduler | None:
+    """Return the outbound rate scheduler for a service.
+
+    Args:
+        service: Service label
+
+    Returns:
+        TokenBucketScheduler, or None if the service is not rate limited
+    """
+    scheduler = _schedulers.get(service)
+    if scheduler is None:
+        calls_per_minute = s.UPSTREAM_CALLS_PER_MINUTE.get(service)
+        if not calls_per_minute:
+            return None
+        scheduler = TokenBucketScheduler(rate=calls_per_minute / 60, burst=s.UPSTREAM_BURST)
+        _schedulers[service] = scheduler
+    return scheduler
+
+
+async def _wait_for_token(service: str, priority: Priority) -> None:
+    scheduler = get_scheduler(service)
+    if scheduler is None:
+        return
+    attrs = {"api.service": service, "request.priority": priority.name.lower()}
+    try:
+        waited = await scheduler.acquire(priority, DEFAULT_DEADLINES[priority])
+    except DeadlineExceededError:
+        scheduler_shed_total.add(1, attrs)
+        raise
+    scheduler_wait_seconds.record(waited, attrs)
+    if waited:
+        otel_trace.get_current_span().set_attribute("scheduler.wait_seconds", waited)
+
+
+def _breaker_listener(service: str) -> StateListener:
+    def on_state_change(old_state: BreakerState, new_state: BreakerState) -> None:
+        logging.warning(f"Circuit breaker for {service} moved from {old_state} to {new_state}")
+        attrs = {"api.service": service, "breaker.from": str(old_state), "breaker.to": str(new_state)}
+        breaker_transitions_total.add(1, attrs)
+        otel_trace.get_current_span().add_event("circuit_breaker.state_change", attrs)
+
+    return on_state_change
+
+
+def get_breaker(service: str) -> CircuitBreaker:
+    """Return the circuit breaker guarding a service, creating it on first use.
+
+    Args:
+        service: Service label
+
+    Returns:
+        CircuitBreaker for the service
+    """
+    breaker = _breakers.get(service)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            failure_threshold=s.BREAKER_FAILURE_THRESHOLD,
+            recovery_timeout=s.BREAKER_RECOVERY_SECONDS,
+            on_state_change=_breaker_listener(service),
+        )
+        _breakers[service] = breaker
+    return breaker
+
+
+meter.create_observable_gauge(
+    "bot.scheduler.queue_depth",
+    callbacks=[
+        lambda _options: [
+            Observation(scheduler.queue_depth, {"api.service": service}) for service, scheduler in _schedulers.items()
+        ]
+    ],
+    unit="1",
+    description="Outbound requests waiting for a rate-limit token",
+)
+meter.create_observable_gauge(
+    "bot.cache.bytes",
+    callbacks=[lambda _options: [Observation(response_cache.bytes)]],
+    unit="By",
+    description="Payload bytes held by the response cache",
+)
+meter.create_observable_gauge(
+    "bot.cache.entries",
+    callbacks=[lambda _options: [Observation(len(response_cache))]],
+    unit="1",
+    description="Number of entries in the response cache",
+)
+
+
+def _request_key(url: str, headers: dict[str, str] | None) -> RequestKey:
+    """Build a coalescing key that ignores query parameter order and header name case."""
+    parsed = httpx.URL(url)
+    params = sorted(parsed.params.multi_items(), key=lambda item: item[0])
+    normalized = parsed.copy_with(query=None).copy_merge_params(params)
+    header_items = tuple(sorted((name.lower(), value) for name, value in (headers or {}).items()))
+    return str(normalized), header_items
+
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(UTC)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _validated(key: RequestKey, need_value: bool, policy: CachePolicy | None = None) -> ValidatedResponse | None:
+    validated, _ = validated_cache.get(key)
+    if validated is None or not need_value or validated.value is not None:
+        return validated
+    # The decoded value of a cacheable response is kept once, in response_cache, for as long as it is cached.
+    value = response_cache.fallback(key) if policy else None
+    return replace(validated, value=value) if value is not None else None
+
+
+def _remember_validators(key: RequestKey, response: httpx.Response, value: Any, size: int) -> None:
+    validated = ValidatedResponse.from_headers(response.headers, value, size)
+    if validated is None:
+        validated_cache.pop(key)
+        return
+    # Entries never expire; they are only replaced, or evicted to stay within VALIDATED_CACHE_MAX_BYTES.
+    validated_cache.set(key, validated, ttl=math.inf, size=max(size, 1) if value is not None else 1)
+
+
+def _record_not_modified(validated: ValidatedResponse, service: str) -> None:
+    otel_trace.get_current_span().set_attribute("http.not_modified", True)
+    api_not_modified_total.add(1, {"api.service": service})
+    api_bytes_saved_total.add(validated.size, {"api.service": service})
+
+
+def _fallback(key: RequestKey, policy: CachePolicy | None, service: str) -> Any:
+    """Return the last cached response for a failed request, if there is one."""
+    if not policy:
+        return None
+    cached = response_cache.fallback(key)
+    if cached is not None:
+        otel_trace.get_current_span().set_attribute("cache.result", "fallback")
+        cache_requests_total.add(1, {"api.service": service, "cache.result": "fallback"})
+    return cached
+
+
+async def _fetch(
+    key: RequestKey,
+    url: str,
+    headers: dict[str, str] | None,
+    service: str,
+    timeout: float,
+    policy: CachePolicy | None,
+    priority: Priority,
+    decoder: Decoder,
+) -> Any:
+    span = otel_trace.get_current_span()
+    metric_attrs = {"api.service": service}
+    breaker = get_breaker(service)
+
+    for attempt in range(s.HTTP_MAX_RETRIES + 1):
+        if breaker.state is BreakerState.OPEN:
+            logging.warning(f"Circuit open for {service}, not fetching URL {url}")
+            span.add_event("circuit_breaker.rejected", {"api.service": service})
+            return _fallback(key, policy, service)
+
+        try:
+            await _wait_for_token(service, priority)
+        except DeadlineExceededError as e:
+            logging.warning(f"Shedding request to {service} ({priority.name.lower()}): {e}")
+            span.set_status(StatusCode.ERROR, "rate limit deadline exceeded")
+            return _fallback(key, policy, service)
+
+        if not breaker.allow():
+            span.add_event("circuit_breaker.rejected", {"api.service": service})
+            return _fallback(key, policy, service)
+        # Only the half-open probe is allowed while half-open; it must give its slot back if it never records.
+        probe = breaker.state is BreakerState.HALF_OPEN
+
+        retry_after = None
+        validated = _validated(key, need_value=True, policy=policy)
+        request_headers = {**(headers or {}), **validated.conditional_headers()} if validated else headers
+        api_calls_total.add(1, metric_attrs)
+        api_inflight_requests.add(1, metric_attrs)
+        started_at = perf_counter()
+        try:
+            response = await get_client(service).get(url, headers=request_headers, timeout=timeout)
+            span.set_attribute("http.response.status_code", response.status_code)
+            span.set_attribute("http.flavor", response.http_version)
+            if response.status_code == 304 and validated:
+                # Nothing changed upstream: reuse the object decoded last time instead of parsing again.
+                breaker.record_success()
+                _record_not_modified(validated, service)
+                if policy:
+                    response_cache.set(key, validated.value, policy.ttl, policy.stale_ttl, size=validated.size)
+                return validated.value
+            if response.status_code == 200:
+                data = decoder(response.content)
+                breaker.record_success()
+                _remember_validators(key, response, None if policy else data, len(response.content))
+                if policy:
+                    response_cache.set(key, data, policy.ttl, policy.stale_ttl, size=len(response.content))
+                return data
+
+            logging.error(f"Failed to fetch URL {url}, status code: {response.status_code}")
+            api_errors_total.add(1, metric_attrs)
+            span.set_status(StatusCode.ERROR, f"HTTP {response.status_code}")
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                # The upstream answered deliberately (e.g. 404), so it is healthy.
+                breaker.record_success()
+                return None
+            retry_after = _retry_after_seconds(response)
+            breaker.record_failure(retry_after)
+        except httpx.TransportError as e:
+            span.record_exception(e)
+            span.set_status(StatusCode.ERROR, str(e))
+            logging.error(f"Error fetching URL {url}: {str(e)}")
+            api_errors_total.add(1, metric_attrs)
+            breaker.record_failure()
+        except Exception as e:
+            span.record_exception(e)
+            span.set_status(StatusCode.ERROR, str(e))
+            logging.error(f"Error fetching URL {url}: {str(e)}")
+            api_errors_total.add(1, metric_attrs)
+            breaker.record_failure()
+            return _fallback(key, policy, service)
+        except BaseException:
+            # Cancelled before an outcome was recorded; otherwise the breaker would stay half-open with no probe.
+            if probe:
+                breaker.release_probe()
+            raise
+        finally:
+            api_inflight_requests.add(-1, metric_attrs)
+            api_duration_seconds.record(perf_counter() - started_at, metric_attrs)
+
+        if attempt == s.HTTP_MAX_RETRIES:
+            break
+        delay = retry_after if retry_after is not None else s.HTTP_RETRY_BACKOFF * 2**attempt * random.uniform(0.5, 1.5)
+        if delay > s.HTTP_MAX_RETRY_DELAY:
+            break
+        api_retries_total.add(1, metric_attrs)
+        span.add_event("http.retry", {"attempt": attempt + 1, "delay_seconds": delay})
+        await asyncio.sleep(delay)
+
+    return _fallback(key, policy, service)
+
+
+def _join(
+    key: RequestKey,
+    url: str,
+    headers: dict[str, str] | None,
+    service: str,
+    timeout: float,
+    policy: CachePolicy | None,
+    priority: Priority,
+    decoder: Decoder,
+) -> asyncio.Task:
+    task = _inflight.get(key)
+    if task is not None:
+        otel_trace.get_current_span().set_attribute("http.coalesced", True)
+        api_coalesced_total.add(1, {"api.service": service})
+        return task
+
+    # The upstream call runs in its own task so a cancelled caller does not cancel it for the others.
+    task = asyncio.create_task(_fetch(key, url, headers, service, timeout, policy, priority, decoder))
+    _inflight[key] = task
+    task.add_done_callback(lambda done: _inflight.pop(key, None) if _inflight.get(key) is done else None)
+    return task
+
 
 @logfire.instrument("fetch_url {url}")
 async def fetch_url(
-    url: str, headers: dict[str, str] | None = None, service: str = "unknown", timeout: float = 30.0
-) -> dict | list | None:
-    span = otel_trace.get_current_span()
+    url: str,
+    headers: dict[str, str] | None = None,
+    service: str = "unknown",
+    timeout: float = 30.0,
+    priority: Priority = Priority.INTERACTIVE,
+    decoder: Decoder = json.loads,
+) -> Any:
+    """GET a document (JSON unless another decoder is given) from an upstream service.
+
+    Responses of cacheable endpoints (see cache_policy) are served from the response cache;
+    stale entries are returned immediately while a background request refreshes them.
+    Concurrent calls with the same normalized URL and headers share a single upstream
+    request. Every caller may receive the same decoded object and must not mutate it.
+    Upstream requests are admitted through the service's token bucket in priority order and
+    are dropped when they cannot be admitted before the deadline of their priority class.
+    Transient failures are retried with jittered backoff (honoring Retry-After); while the
+    service's circuit breaker is open, calls fail fast. Failed requests to cacheable endpoints
+    fall back to the last cached response. When a previous response carried an ETag or
+    Last-Modified header the request is made conditional, and a 304 reuses the object decoded
+    from that response without downloading or parsing it again.
+
+    Args:
+        url: Absolute URL to fetch
+        headers: Optional request headers
+        service: Service label used for the client pool and metrics
+        timeout: Request timeout in seconds
+        priority: Scheduling class of the request
+        decoder: Turns the raw response body into the returned object
+
+    Returns:
+        Decoded body, or None on any failure
+    """
+    key = _request_key(url, headers)
+    policy = cache_policy(url)
+
+    if policy:
+        cached, state = response_cache.get(key)
+        otel_trace.get_current_span().set_attribute("cache.result", state)
+        cache_requests_total.add(1, {"api.service": service, "cache.result": state})
+        if state is CacheState.HIT:
+            return cached
+        if state is CacheState.STALE:
+            _join(key, url, headers, service, timeout, policy, Priority.BACKGROUND, decoder)
+            return cached
+
+    return await asyncio.shield(_join(key, url, headers, service, timeout, policy, priority, decoder))
+
+
+async def prefetch_url(
+    url: str,
+    headers: dict[str, str] | None = None,
+    service: str = "unknown",
+    timeout: float = 30.0,
+    min_fresh: float = 0.0,
+) -> bool:
+    """Refresh the cached response of a cacheable endpoint before it expires.
+
+    The request runs at background priority, so it is the first to be shed when the service's
+    rate budget is needed by interactive commands.
+
+    Args:
+        url: Absolute URL to fetch
+        headers: Optional request headers
+        service: Service label used for the client pool and metrics
+        timeout: Request timeout in seconds
+        min_fresh: Skip the refresh if the cached response stays fresh for longer than this, in seconds
+
+    Returns:
+        True if an upstream request was made, False if the cached response was fresh enough
+        or the endpoint is not cacheable
+    """
+    policy = cache_policy(url)
+    if not policy:
+        return False
+    key = _request_key(url, headers)
+    if response_cache.fresh_for(key) > min_fresh:
+        prefetch_requests_total.add(1, {"api.service": service, "prefetch.result": "fresh"})
+        return False
+    prefetch_requests_total.add(1, {"api.service": service, "prefetch.result": "refreshed"})
+    await asyncio.shield(_join(key, url, headers, service, timeout, policy, Priority.BACKGROUND, json.loads))
+    return True
+
+
+async def stream_json_array(
+    url: str,
+    headers: dict[str, str] | None = None,
+    service: str = "unknown",
+    timeout: float = 30.0,
+    priority: Priority = Priority.REFRESH,
+    conditional: bool = False,
+) -> AsyncIterator[Any]:
+    """Yield the items of a JSON array response while it is being downloaded.
+
+    Meant for large list endpoints: the body is decoded chunk by chunk, so neither the raw
+    text nor a fully decoded copy of the list is ever held in memory. The request goes
+    through the service's rate scheduler and circuit breaker but is not retried or cached.
+    Validators of the last complete download are remembered; with conditional set, the caller
+    states it still holds the items of that download and the request is made conditional.
+
+    Args:
+        url: Absolute URL to fetch
+        headers: Optional request headers
+        service: Service label used for the client pool and metrics
+        timeout: Request timeout in seconds
+        priority: Scheduling class of the request
+        conditional: Send the validators of the last complete download, if any
+
+    Yields:
+        Decoded array items
+
+    Raises:
+        NotModifiedError: If conditional is set and the upstream answered 304 Not Modified
+        UpstreamUnavailableError: If the circuit breaker is open or the request was shed
+        httpx.HTTPError: If the request fails or returns a non-2xx status
+        ValueError: If the body is not a complete JSON array
+    """
     metric_attrs = {"api.service": service}
+    key = _request_key(url, headers)
+    validated = _validated(key, need_value=False) if conditional else None
+    request_headers = {**(headers or {}), **validated.conditional_headers()} if validated else headers
+    breaker = get_breaker(service)
+    if breaker.state is BreakerState.OPEN:
+        raise UpstreamUnavailableError(f"circuit open for {service}")
+    try:
+        await _wait_for_token(service, priority)
+    except DeadlineExceededError as e:
+        raise UpstreamUnavailableError(f"{service} request shed: {e}") from e
+    if not breaker.allow():
+        raise UpstreamUnavailableError(f"circuit open for {service}")
+    probe = breaker.state is BreakerState.HALF_OPEN
+
     api_calls_total.add(1, metric_attrs)
+    api_inflight_requests.add(1, metric_attrs)
     started_at = perf_counter()
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(url, headers=headers)
-            span.set_attribute("http.response.status_code", response.status_code)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logging.error(f"Failed to fetch URL {url}, status code: {response.status_code}")
-                api_errors_total.add(1, metric_attrs)
-                span.set_status(StatusCode.ERROR, f"HTTP {response.status_code}")
-                return None
-    except Exception as e:
-        span.record_exception(e)
-        span.set_status(StatusCode.ERROR, str(e))
-        logging.error(f"Error fetching URL {url}: {str(e)}")
+        async with get_client(service).stream("GET", url, headers=request_headers, timeout=timeout) as response:
+            # Every path from here records an outcome, which frees the probe slot.
+            probe = False
+            if response.status_code == 304 and validated:
+                breaker.record_success()
+                _record_not_modified(validated, service)
+                raise NotModifiedError(url)
+            response.raise_for_status()
+            breaker.record_success()
+            parser = JSONArrayStream()
+            async for chunk in response.aiter_text():
+                for item in parser.feed(chunk):
+                    yield item
+            parser.close()
+            # The caller keeps the items, so only the validators are remembered.
+            _remember_validators(key, response, None, response.num_bytes_downloaded)
+    except httpx.HTTPStatusError as e:
         api_errors_total.add(1, metric_attrs)
-        return None
+        if e.response.status_code in RETRYABLE_STATUS_CODES:
+            breaker.record_failure(_retry_after_seconds(e.response))
+        else:
+            breaker.record_success()
+        raise
+    except httpx.TransportError:
+        api_errors_total.add(1, metric_attrs)
+        breaker.record_failure()
+        raise
+    except BaseException:
+        if probe:
+            breaker.release_probe()
+        raise
     finally:
+        api_inflight_requests.add(-1, metric_attrs)
         api_duration_seconds.record(perf_counter() - started_at, metric_attrs)
 
 
+async def _send_calls(batch: list[dict]) -> None:
+    response = await get_client("hcpb-api").post(
+        f"{s.hcpb_api_url}/calls/bulk", json=batch, headers=api_headers, timeout=10.0
+    )
+    response.raise_for_status()
+    # The batch is delivered once the status is 2xx; a reply that cannot be read must not have it retried.
+    # The remote tracker reports chats it sees over quota (e.g. calls made through another replica).
+    try:
+        body = response.json() if response.content else {}
+        for chat_id in (body.get("rate_limited") or []) if isinstance(body, dict) else []:
+            chat_rate_limiter.saturate(str(chat_id))
+    except (ValueError, TypeError) as e:
+        logging.warning(f"Ignoring unreadable reply from hcpb-api calls/bulk: {e}")
+
+
+call_tracker = CallTracker(
+    send=_send_calls,
+    max_queue=s.TRACKING_QUEUE_SIZE,
+    batch_size=s.TRACKING_BATCH_SIZE,
+    flush_interval=s.TRACKING_FLUSH_INTERVAL,
+    spill_path=Path(s.TRACKING_SPILL_PATH),
+)
+
+
 @logfire.instrument("write_call service={service_id} type={type_id}")
 async def write_call(service_id: int, type_id: int, chat_id: str, coin: str | None = None) -> bool:
+    """Apply the per-chat rate limit and record the call.
+
+    The limit is enforced in-process. The call is queued for batched delivery to hcpb-api,
+    whose replies are only used to reconcile the local limiter, so the command never waits on it.
+
+    Args:
+        service_id: Data provider id (1 CoinGecko, 2 CoinMarketCap)
+        type_id: Call type id (1 price, 2 chart)
+        chat_id: Telegram chat id
+        coin: Optional coin id
+
+    Returns:
+        False if the chat exceeded its allowance, True otherwise
+    """
     if not s.hcpb_api_url:
         return True
     span = otel_trace.get_current_span()
     span.set_attribute("chat.id", chat_id)
     if coin:
         span.set_attribute("coin.id", coin)
-    url = f"{s.hcpb_api_url}/calls"
-    data = {"service_id": service_id, "type_id": type_id, "chat_id": chat_id, "coin": coin}
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=data, headers=api_headers)
-            if response.status_code != 401:
-                span.set_attribute("rate_limited", False)
-                return True
-            else:
-                span.set_attribute("rate_limited", True)
-                rate_limit_exceeded_total.add(1, {"chat.id": chat_id})
-                return False
-    except Exception as e:
-        span.record_exception(e)
-        logging.error(f"Error tracking API: {str(e)}")
-        return True
+
+    if not chat_rate_limiter.allow(chat_id):
+        span.set_attribute("rate_limited", True)
+        rate_limit_exceeded_total.add(1, {"chat.id": chat_id})
+        return False
+
+    span.set_attribute("rate_limited", False)
+    call_tracker.record({"service_id": service_id, "type_id": type_id, "chat_id": chat_id, "coin": coin})
+    return True
 
 
 async def get_excluded() -> list[str]:
@@ -0,0 +1,89 @@
+"""Incremental decoding of JSON arrays."""
+
+import json
+import sys
+from collections.abc import Iterator
+from typing import Any
+
+_WHITESPACE = " \t\n\r"
+
+
+class JSONArrayStream:
+    """Decode the items of a top-level JSON array from text chunks as they arrive.
+
+    Only the undecoded tail of the input is buffered, so the full document text is never held
+    in memory. Items are expected to be objects or arrays, as in upstream list endpoints.
+    Object keys are interned so that thousands of items share one copy of each key, as they
+    would with a single json.loads call.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder(object_pairs_hook=_interned_dict)
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+
+    def feed(self, chunk: str) -> Iterator[Any]:
+        """Add a chunk of text and yield every item it completes.
+
+        Args:
+            chunk: Next piece of the JSON document
+
+        Yields:
+            Decoded array items
+
+        Raises:
+            ValueError: If the document is not a JSON array
+        """
+        self._buffer += chunk
+        position = 0
+        buffer = self._buffer
+
+        while True:
+            position = _skip_whitespace(buffer, position)
+            if position == len(buffer) or self._finished:
+                break
+
+            if not self._started:
+                if buffer[position] != "[":
+                    raise ValueError("Expected a JSON array")
+                self._started = True
+                position += 1
+                continue
+
+            if buffer[position] == "]":
+                self._finished = True
+                position += 1
+                break
+            if buffer[position] == ",":
+                position += 1
+                continue
+
+            try:
+                item, end = self._decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Incomplete item; wait for the next chunk.
+                break
+            position = end
+            yield item
+
+        self._buffer = buffer[position:]
+
+    def close(self) -> None:
+        """Check that the whole array was received.
+
+        Raises:
+            ValueError: If the document ended before the closing bracket
+        """
+        if not self._finished or self._buffer.strip(_WHITESPACE):
+            raise ValueError("Truncated or malformed JSON array")
+
+
+def _interned_dict(pairs: list[tuple[str, Any]]) -> dict[str, Any]:
+    return {sys.intern(key): value for key, value in pairs}
+
+
+def _skip_whitespace(text: str, position: int) -> int:
+    while position < len(text) and text[position] in _WHITESPACE:
+        position += 1
+    return position
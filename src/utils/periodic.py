@@ -0,0 +1,65 @@
+"""Background coroutines run at a fixed interval."""
+
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run a coroutine function every `interval` seconds in a background task.
+
+    Runs never overlap: the next one starts `interval` seconds (plus or minus a random `jitter`)
+    after the previous one finished. Exceptions are logged and do not stop the schedule.
+    """
+
+    def __init__(self, run: Callable[[], Awaitable[Any]], interval: float, name: str, jitter: float = 0.0) -> None:
+        """Initialize the task.
+
+        Args:
+            run: Coroutine function called on every tick
+            interval: Seconds between the end of a run and the start of the next
+            name: Name used in logs and for the asyncio task
+            jitter: Maximum random deviation from the interval, in seconds
+        """
+        self._run = run
+        self.interval = interval
+        self.name = name
+        self.jitter = jitter
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background task is active."""
+        return self._task is not None and not self._task.done()
+
+    def start(self, delay: float | None = None) -> None:
+        """Start the background task.
+
+        Args:
+            delay: Seconds before the first run, defaults to one (jittered) interval
+        """
+        if not self.running:
+            self._task = asyncio.create_task(self._loop(delay), name=self.name)
+
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to finish."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _next_delay(self) -> float:
+        return max(self.interval + random.uniform(-self.jitter, self.jitter), 0.0)
+
+    async def _loop(self, delay: float | None) -> None:
+        await asyncio.sleep(self._next_delay() if delay is None else delay)
+        while True:
+            try:
+                await self._run()
+            except Exception as e:
+                logger.error(f"Periodic task {self.name} failed: {e}", exc_info=True)
+            await asyncio.sleep(self._next_delay())
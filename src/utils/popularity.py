@@ -0,0 +1,140 @@
+"""Approximate, time-decayed request frequency of keys."""
+
+import math
+from collections.abc import Callable, Hashable
+from time import monotonic
+
+# Counters are rescaled once the forward-decay weight grows past this, long before floats lose precision.
+_MAX_WEIGHT = 2.0**32
+
+
+class DecayingCountMinSketch:
+    """Count-min sketch whose counts halve every `half_life` seconds.
+
+    Decay uses forward weighting: each increment is scaled by 2 ** (age / half_life) and
+    estimates are divided by the current weight, so no periodic pass over the counters is needed.
+    Estimates never undercount; they overcount by at most a few collisions per row.
+    """
+
+    def __init__(self, width: int, depth: int, half_life: float, clock: Callable[[], float] = monotonic) -> None:
+        """Initialize the sketch.
+
+        Args:
+            width: Counters per row; larger widths reduce overcounting
+            depth: Number of independent rows
+            half_life: Seconds after which a count weighs half
+            clock: Monotonic time source, in seconds
+        """
+        self.width = width
+        self.depth = depth
+        self.half_life = half_life
+        self._clock = clock
+        self._rows = [[0.0] * width for _ in range(depth)]
+        self._epoch = clock()
+
+    def _weight(self, now: float) -> float:
+        return math.exp2((now - self._epoch) / self.half_life)
+
+    def _indexes(self, key: Hashable) -> list[int]:
+        return [hash((row, key)) % self.width for row in range(self.depth)]
+
+    def add(self, key: Hashable, count: float = 1.0) -> None:
+        """Count occurrences of a key.
+
+        Args:
+            key: Counted key
+            count: Number of occurrences
+        """
+        now = self._clock()
+        weight = self._weight(now)
+        if weight > _MAX_WEIGHT:
+            for row in self._rows:
+                row[:] = [value / weight for value in row]
+            self._epoch = now
+            weight = 1.0
+        for row, index in zip(self._rows, self._indexes(key), strict=True):
+            row[index] += count * weight
+
+    def estimate(self, key: Hashable) -> float:
+        """Return the decayed count of a key.
+
+        Args:
+            key: Counted key
+
+        Returns:
+            Upper-bound estimate of the decayed number of occurrences
+        """
+        weighted = min(row[index] for row, index in zip(self._rows, self._indexes(key), strict=True))
+        return weighted / self._weight(self._clock())
+
+
+class PopularityTracker:
+    """Track the most frequently requested keys using a decaying count-min sketch.
+
+    A count-min sketch cannot enumerate its keys, so a small candidate set of the current
+    heaviest keys is kept alongside it; a new key replaces the weakest candidate once its
+    estimate overtakes it.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        half_life: float,
+        width: int = 1024,
+        depth: int = 4,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        """Initialize the tracker.
+
+        Args:
+            capacity: Maximum number of candidate keys kept for ranking
+            half_life: Seconds after which a request weighs half
+            width: Counters per sketch row
+            depth: Number of sketch rows
+            clock: Monotonic time source, in seconds
+        """
+        self.capacity = capacity
+        self._sketch = DecayingCountMinSketch(width, depth, half_life, clock)
+        self._candidates: set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._candidates)
+
+    def record(self, key: Hashable) -> None:
+        """Count one request for a key.
+
+        Does nothing when capacity is 0, i.e. popularity tracking is disabled.
+
+        Args:
+            key: Requested key
+        """
+        if self.capacity <= 0:
+            return
+        self._sketch.add(key)
+        if key in self._candidates:
+            return
+        if len(self._candidates) < self.capacity:
+            self._candidates.add(key)
+            return
+        weakest = min(self._candidates, key=self._sketch.estimate)
+        if self._sketch.estimate(key) > self._sketch.estimate(weakest):
+            self._candidates.remove(weakest)
+            self._candidates.add(key)
+
+    def estimate(self, key: Hashable) -> float:
+        """Return the decayed request count of a key."""
+        return self._sketch.estimate(key)
+
+    def top(self, n: int, min_count: float = 0.0) -> list[Hashable]:
+        """Return the most requested keys.
+
+        Args:
+            n: Maximum number of keys
+            min_count: Minimum decayed request count for a key to be returned
+
+        Returns:
+            Keys ordered from most to least requested
+        """
+        scored = [(self._sketch.estimate(key), key) for key in self._candidates]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [key for count, key in scored[:n] if count >= min_count]
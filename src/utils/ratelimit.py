@@ -0,0 +1,71 @@
+"""In-process per-chat rate limiting."""
+
+from collections.abc import Callable, Hashable
+from time import monotonic
+
+
+class GCRALimiter:
+    """Generic Cell Rate Algorithm limiter keyed by chat.
+
+    Allows `limit` requests per `period` seconds, including bursts of up to `limit`, while storing a
+    single timestamp (the theoretical arrival time) per key. Keys whose timestamp is in the past carry no
+    state and are dropped first; at most `max_keys` keys are tracked, least recently used evicted first.
+    """
+
+    def __init__(self, limit: int, period: float, max_keys: int, clock: Callable[[], float] = monotonic) -> None:
+        """Initialize the limiter.
+
+        Args:
+            limit: Requests allowed per period
+            period: Window length, in seconds
+            max_keys: Maximum number of tracked keys
+            clock: Monotonic time source, in seconds
+        """
+        self.limit = limit
+        self.period = period
+        self.max_keys = max_keys
+        self._clock = clock
+        self._interval = period / limit
+        self._tolerance = period - self._interval
+        # Plain dict in least-recently-used order; updated keys are re-inserted at the end.
+        self._tat: dict[Hashable, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    def allow(self, key: Hashable) -> bool:
+        """Check and record a request.
+
+        Args:
+            key: Chat identifier
+
+        Returns:
+            True if the request is within the limit
+        """
+        now = self._clock()
+        tat = max(self._tat.pop(key, now), now)
+        if tat - now > self._tolerance:
+            self._tat[key] = tat
+            return False
+        self._store(key, tat + self._interval, now)
+        return True
+
+    def saturate(self, key: Hashable) -> None:
+        """Mark a key as having used its whole allowance, e.g. when the remote tracker reports it limited.
+
+        Args:
+            key: Chat identifier
+        """
+        now = self._clock()
+        tat = max(self._tat.pop(key, now), now + self._tolerance + self._interval)
+        self._store(key, tat, now)
+
+    def _store(self, key: Hashable, tat: float, now: float) -> None:
+        self._tat[key] = tat
+        while len(self._tat) > self.max_keys:
+            oldest = next(iter(self._tat))
+            del self._tat[oldest]
+        # Opportunistically drop the oldest key if it no longer carries any state.
+        oldest = next(iter(self._tat))
+        if self._tat[oldest] <= now:
+            del self._tat[oldest]
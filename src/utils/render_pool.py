@@ -0,0 +1,154 @@
+"""Off-loop chart rendering in a pool of warm worker processes or threads."""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Literal
+
+import numpy as np
+from opentelemetry import metrics as otel_metrics
+from opentelemetry.metrics import Observation
+
+from src.config import settings as s
+from src.utils import chart_render
+
+logger = logging.getLogger(__name__)
+
+meter = otel_metrics.get_meter("h-crypto-price-bot.render_pool")
+chart_render_queue_wait_seconds = meter.create_histogram(
+    "bot.chart.render.queue_wait_seconds",
+    unit="s",
+    description="Time a chart spent waiting for a free render worker",
+)
+chart_render_rejected_total = meter.create_counter(
+    "bot.chart.render.rejected_total",
+    unit="1",
+    description="Charts rejected because the render queue was full",
+)
+chart_render_restarts_total = meter.create_counter(
+    "bot.chart.render.restarts_total",
+    unit="1",
+    description="Render pools replaced after a worker process died",
+)
+
+
+class RenderQueueFullError(Exception):
+    """Raised when a chart is submitted while the render queue is at its limit."""
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    # Never fork the bot: it runs exporter and HTTP threads. A fork server preloaded with the
+    # renderer hands out workers that already have matplotlib imported.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([chart_render.__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class ChartRenderPool:
+    """Render charts in worker processes or threads so matplotlib never blocks the event loop.
+
+    Processes render in parallel on any Python build; threads avoid process start-up and copying
+    the arrays, and render in parallel on free-threaded builds. At most `workers` charts render at
+    once and at most `max_queue` more wait for a worker; further charts are rejected with
+    RenderQueueFullError instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_queue: int, executor: Literal["process", "thread"] = "process") -> None:
+        """Initialize the pool. Workers are started by start(), or on the first render.
+
+        Args:
+            workers: Number of worker processes or threads
+            max_queue: Maximum number of charts waiting for a worker
+            executor: "process" or "thread"
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = executor
+        self._executor: Executor | None = None
+        self._in_flight = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of charts waiting for a worker."""
+        return max(self._in_flight - self.workers, 0)
+
+    def start(self) -> None:
+        """Start the workers and have each render a warm-up chart."""
+        if self._executor is not None:
+            return
+        if self.executor == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="chart_render", initializer=chart_render.warm_up
+            )
+        else:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=_mp_context(), initializer=chart_render.warm_up
+            )
+        # Workers are spawned on demand; one task per worker brings them all up now.
+        for _ in range(self.workers):
+            self._executor.submit(os.getpid)
+
+    def close(self) -> None:
+        """Stop the workers, dropping charts that have not started rendering."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def render(
+        self, times: np.ndarray, prices: np.ndarray, title: str, bottom: str, template: str, period: str
+    ) -> tuple[bytes, float]:
+        """Render a chart in a worker.
+
+        Args:
+            times: datetime64 sample times
+            prices: float64 prices
+            title: Chart title
+            bottom: X axis label
+            template: Chart theme
+            period: Chart period in days
+
+        Returns:
+            Tuple of (JPEG bytes, seconds the worker spent rendering)
+
+        Raises:
+            RenderQueueFullError: If the queue is at its limit
+            BrokenProcessPool: If a worker died; the pool is replaced for the next render
+        """
+        if self._in_flight >= self.workers + self.max_queue:
+            chart_render_rejected_total.add(1)
+            raise RenderQueueFullError(f"{self._in_flight} charts already rendering or queued")
+        self.start()
+        executor = self._executor
+        self._in_flight += 1
+        submitted_at = time.time()
+        try:
+            image, started_at, render_seconds = await asyncio.get_running_loop().run_in_executor(
+                executor, chart_render.timed_render_chart, times, prices, title, bottom, template, period
+            )
+        except BrokenProcessPool:
+            # A dead worker (OOM kill, crash) breaks the executor for good; replace it on the next render.
+            if self._executor is executor:
+                logger.error("Chart render worker died, restarting the render pool")
+                chart_render_restarts_total.add(1)
+                self.close()
+            raise
+        finally:
+            self._in_flight -= 1
+        chart_render_queue_wait_seconds.record(max(started_at - submitted_at, 0.0))
+        return image, render_seconds
+
+
+chart_render_pool = ChartRenderPool(s.CHART_RENDER_WORKERS, s.CHART_RENDER_MAX_QUEUE, s.CHART_RENDER_EXECUTOR)
+
+meter.create_observable_gauge(
+    "bot.chart.render.queue_depth",
+    callbacks=[lambda _options: [Observation(chart_render_pool.queue_depth)]],
+    unit="1",
+    description="Charts waiting for a free render worker",
+)
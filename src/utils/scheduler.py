@@ -0,0 +1,119 @@
+"""Token-bucket scheduler for outbound requests with priority classes."""
+
+import asyncio
+import heapq
+import itertools
+from collections.abc import Callable
+from enum import IntEnum
+from time import monotonic
+
+
+class Priority(IntEnum):
+    """Request priority classes; lower values are served first."""
+
+    INTERACTIVE = 0
+    REFRESH = 1
+    BACKGROUND = 2
+
+
+# Seconds a request of each class may wait for a token before it is shed
+DEFAULT_DEADLINES: dict[Priority, float] = {
+    Priority.INTERACTIVE: 10.0,
+    Priority.REFRESH: 120.0,
+    Priority.BACKGROUND: 5.0,
+}
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a request could not be scheduled within its deadline."""
+
+
+class TokenBucketScheduler:
+    """Admit requests at a sustained rate with bounded bursts, highest priority first.
+
+    Waiters queue in (priority, arrival) order. A request whose estimated wait already exceeds
+    its deadline is rejected immediately instead of being queued.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = monotonic) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+            clock: Monotonic time source, in seconds
+        """
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated_at = clock()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a token."""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _estimated_wait(self, priority: Priority) -> float:
+        ahead = sum(
+            1 for waiter_priority, _, future in self._waiters if waiter_priority <= priority and not future.done()
+        )
+        missing = ahead + 1 - self._tokens
+        return max(missing, 0.0) / self.rate
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if self._waiters:
+            delay = (1 - self._tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    async def acquire(self, priority: Priority, deadline: float) -> float:
+        """Wait for a token.
+
+        Args:
+            priority: Priority class of the request
+            deadline: Maximum number of seconds the caller is willing to wait
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            DeadlineExceededError: If the request cannot be admitted within the deadline
+        """
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        if self._estimated_wait(priority) > deadline:
+            raise DeadlineExceededError(f"estimated wait exceeds {deadline:.1f}s")
+
+        started_at = self._clock()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._timer is None:
+            self._dispatch()
+
+        try:
+            await asyncio.wait_for(future, deadline)
+        except TimeoutError:
+            raise DeadlineExceededError(f"not admitted within {deadline:.1f}s") from None
+        return self._clock() - started_at
@@ -0,0 +1,199 @@
+"""Prefix and typo-tolerant search over the symbols of a coin registry."""
+
+import heapq
+import sys
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+
+from src.models import CoinDelta, CoinInfo, CoinRegistry
+
+_UNRANKED = 1 << 32
+
+# Sorts after every character, so [prefix, prefix + _MAX_CHAR) spans all keys starting with prefix.
+_MAX_CHAR = "\U0010ffff"
+
+
+def _variants(key: str) -> set[str]:
+    """Return the key and every string obtained by deleting one of its characters."""
+    return {key, *(key[:i] + key[i + 1 :] for i in range(len(key)))}
+
+
+def _score(key: str, rank: int) -> int:
+    """Relevance of a key, lower is better: rank first, unranked (0) last, then length."""
+    return (rank or _UNRANKED) << 8 | min(len(key), 255)
+
+
+def _one_edit_apart(a: str, b: str) -> bool:
+    """Return True if a and b differ by one insertion, deletion, substitution or adjacent transposition."""
+    if a == b or abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1 :]
+    if a[i + 1 :] == b[i + 1 :]:
+        return True
+    return a[i + 1 : i + 2] == b[i : i + 1] and a[i : i + 1] == b[i + 1 : i + 2] and a[i + 2 :] == b[i + 2 :]
+
+
+class SymbolSearchIndex:
+    """Search the symbols of a registry by prefix or by a one-edit typo.
+
+    Symbols are matched case-insensitively. Prefix queries binary-search a sorted array of
+    distinct symbols. Typo queries use a symmetric deletion index: every symbol is stored under
+    itself and each of its single-character deletions, so the symbols one edit away from a query
+    are found with len(query) + 1 dict lookups instead of comparing against every symbol.
+    Results are ordered by the best rank among the coins sharing a symbol, then by length.
+    Like the registry it is built from, an index is never modified after construction.
+    """
+
+    __slots__ = ("registry", "_keys", "_symbols", "_scores", "_by_variant")
+
+    def __init__(self, registry: CoinRegistry) -> None:
+        """Build the index.
+
+        Args:
+            registry: Registry whose symbols are indexed
+        """
+        self.registry = registry
+        _ids, symbols, _names, ranks = registry.columns()
+        self._symbols: dict[str, str] = {}
+        self._scores: dict[str, int] = {}
+        for symbol, rank in zip(symbols, ranks, strict=True):
+            key = sys.intern(symbol.lower())
+            self._symbols.setdefault(key, symbol)
+            score = _score(key, rank)
+            if score < self._scores.get(key, score + 1):
+                self._scores[key] = score
+        self._keys = sorted(self._symbols)
+
+        grouped: dict[str, list[str]] = {}
+        for key in self._keys:
+            for variant in _variants(key):
+                grouped.setdefault(variant, []).append(key)
+        # As in CoinRegistry, a bare key is stored for the common single-symbol case.
+        self._by_variant: dict[str, str | tuple[str, ...]] = {
+            variant: keys[0] if len(keys) == 1 else tuple(keys) for variant, keys in grouped.items()
+        }
+
+    def update(self, registry: CoinRegistry, delta: CoinDelta) -> "SymbolSearchIndex":
+        """Return a new index for a registry derived from this index's one by a delta.
+
+        Only the symbols touched by the delta are re-indexed; everything else is copied as is.
+
+        Args:
+            registry: Result of applying the delta to the indexed registry
+            delta: Changes applied to the registry
+
+        Returns:
+            Index of the new registry
+        """
+        index = SymbolSearchIndex.__new__(SymbolSearchIndex)
+        index.registry = registry
+        index._keys = self._keys.copy()
+        index._symbols = self._symbols.copy()
+        index._scores = self._scores.copy()
+        index._by_variant = self._by_variant.copy()
+
+        affected: dict[str, set[str]] = {}
+        for symbol in delta.symbols():
+            affected.setdefault(sys.intern(symbol.lower()), set()).add(symbol)
+        for key, symbols in affected.items():
+            if key in self._symbols:
+                symbols.add(self._symbols[key])
+            coins = [coin for symbol in symbols for coin in registry.candidates(symbol)]
+            if not coins:
+                index._drop(key)
+                continue
+            # Keep the symbol shown so far while it still has coins, as a full build would.
+            symbol = self._symbols.get(key)
+            if symbol is None or not registry.candidates(symbol):
+                symbol = coins[0].symbol
+            index._put(key, symbol, min(_score(key, coin.rank or 0) for coin in coins))
+        return index
+
+    def _put(self, key: str, symbol: str, score: int) -> None:
+        if key not in self._symbols:
+            insort(self._keys, key)
+            for variant in _variants(key):
+                keys = self._by_variant.get(variant, ())
+                self._by_variant[variant] = key if not keys else (*((keys,) if isinstance(keys, str) else keys), key)
+        self._symbols[key] = symbol
+        self._scores[key] = score
+
+    def _drop(self, key: str) -> None:
+        if key not in self._symbols:
+            return
+        del self._symbols[key], self._scores[key]
+        del self._keys[bisect_left(self._keys, key)]
+        for variant in _variants(key):
+            keys = self._by_variant[variant]
+            rest = () if isinstance(keys, str) else tuple(k for k in keys if k != key)
+            if not rest:
+                del self._by_variant[variant]
+            else:
+                self._by_variant[variant] = rest[0] if len(rest) == 1 else rest
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _ranked(self, keys: Iterable[str], limit: int) -> list[str]:
+        return [self._symbols[key] for key in heapq.nsmallest(limit, keys, key=self._scores.__getitem__)]
+
+    def complete(self, prefix: str, limit: int = 10) -> list[str]:
+        """Return symbols starting with a prefix, an exact match first.
+
+        Args:
+            prefix: Beginning of a symbol, in any case
+            limit: Maximum number of symbols
+
+        Returns:
+            Matching symbols, in the case used by the registry
+        """
+        key = prefix.strip().lower()
+        if not key or limit <= 0:
+            return []
+        start = bisect_left(self._keys, key)
+        end = bisect_left(self._keys, key + _MAX_CHAR, start)
+        if start < end and self._keys[start] == key:
+            return [self._symbols[key], *self._ranked(self._keys[start + 1 : end], limit - 1)]
+        return self._ranked(self._keys[start:end], limit)
+
+    def similar(self, query: str, limit: int = 5) -> list[str]:
+        """Return symbols one edit away from a query, e.g. a mistyped symbol.
+
+        Args:
+            query: Symbol as typed, in any case
+            limit: Maximum number of symbols
+
+        Returns:
+            Symbols differing by one insertion, deletion, substitution or transposition
+        """
+        key = query.strip().lower()
+        if not key or limit <= 0:
+            return []
+        candidates: set[str] = set()
+        for variant in _variants(key):
+            keys = self._by_variant.get(variant, ())
+            candidates.update((keys,) if isinstance(keys, str) else keys)
+        return self._ranked((candidate for candidate in candidates if _one_edit_apart(key, candidate)), limit)
+
+    def coins(self, symbols: Iterable[str], limit: int) -> list[CoinInfo]:
+        """Expand symbols into their coins, best rank first within each symbol.
+
+        Args:
+            symbols: Symbols returned by complete() or similar()
+            limit: Maximum number of coins
+
+        Returns:
+            Coins in symbol order
+        """
+        coins: list[CoinInfo] = []
+        for symbol in symbols:
+            coins.extend(self.registry.candidates(symbol)[: limit - len(coins)])
+            if len(coins) >= limit:
+                break
+        return coins
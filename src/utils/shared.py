@@ -1,14 +1,61 @@
 """Shared singleton classes and global instances."""
 
+import asyncio
 import datetime
+import json
 import logging
+import math
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable
+from pathlib import Path
+from time import monotonic, perf_counter
+from typing import Any
+
+from opentelemetry import metrics as otel_metrics
+from opentelemetry.metrics import Observation
 
 from src.config import settings as s
-from src.utils.http import fetch_url, get_excluded
+from src.constants import COIN_LIST_CACHE_SECONDS, COINGECKO_API_COINS_MARKETS
+from src.models import CoinDelta, CoinInfo, CoinRegistry
+from src.utils.choices import ChoiceMemory
+from src.utils.exclusions import compile_exclusions
+from src.utils.http import NotModifiedError, fetch_url, get_excluded, stream_json_array
+from src.utils.periodic import PeriodicTask
+from src.utils.scheduler import Priority
+from src.utils.search import SymbolSearchIndex
+from src.utils.snapshot import SnapshotError, read_snapshot, write_snapshot
+
+meter = otel_metrics.get_meter("h-crypto-price-bot.shared")
+registry_refresh_duration_seconds = meter.create_histogram(
+    "bot.coin_registry.refresh_duration_seconds",
+    unit="s",
+    description="Duration of coin list refreshes, download included",
+)
+registry_refresh_failures_total = meter.create_counter(
+    "bot.coin_registry.refresh_failures_total",
+    unit="1",
+    description="Total number of coin list refreshes that failed",
+)
+registry_entries_delta = meter.create_histogram(
+    "bot.coin_registry.entries_delta",
+    unit="1",
+    description="Change in the number of coins when a refreshed coin list is published",
+)
+disambiguation_total = meter.create_counter(
+    "bot.disambiguation.total",
+    unit="1",
+    description="Lookups of symbols shared by several coins, by how the coin was chosen",
+)
+registry_changes_total = meter.create_counter(
+    "bot.coin_registry.changes_total",
+    unit="1",
+    description="Total number of coins added, removed or changed by coin list refreshes",
+)
 
 
-class CoinList:
+class CoinList(ABC):
     _instance = None
+    name = ""
 
     def __new__(cls) -> None:
         if not cls._instance:
@@ -16,8 +63,136 @@ class CoinList:
         return cls._instance
 
     def __init__(self) -> None:
-        self.coin_list: list[dict] | None = None
+        # Replaced as a whole on every refresh, never modified in place.
+        self.registry = CoinRegistry([])
         self.coin_last_update = datetime.datetime(2023, 1, 1)
+        # Single writer: at most one download per list at any time.
+        self._refresh_lock = asyncio.Lock()
+        self._last_miss_refresh = -math.inf
+        self._background: set[asyncio.Task] = set()
+        self._search_index: SymbolSearchIndex | None = None
+
+    @property
+    def snapshot_path(self) -> Path:
+        return Path(s.COIN_SNAPSHOT_DIR) / f"{self.name}.snapshot"
+
+    def enabled(self) -> bool:
+        """Whether the list can be downloaded with the current configuration."""
+        return True
+
+    @abstractmethod
+    async def _download(self) -> list[CoinInfo] | None:
+        """Download the list; return its coins, or None on failure."""
+
+    def search_index(self) -> SymbolSearchIndex:
+        """Return the symbol search index of the current registry, building it on first use after a refresh."""
+        if self._search_index is None or self._search_index.registry is not self.registry:
+            self._search_index = SymbolSearchIndex(self.registry)
+        return self._search_index
+
+    def load_snapshot(self) -> bool:
+        """Serve the registry saved by a previous run until the next refresh.
+
+        Returns:
+            True if a valid snapshot was loaded
+        """
+        try:
+            registry, created_at = read_snapshot(self.snapshot_path)
+        except FileNotFoundError:
+            return False
+        except (OSError, SnapshotError) as e:
+            logging.warning(f"Ignoring coin list snapshot {self.snapshot_path}: {e}")
+            return False
+        self.registry = registry
+        self.coin_last_update = datetime.datetime.fromtimestamp(created_at)
+        logging.info(f"Loaded {len(registry)} coins from snapshot {self.snapshot_path} ({self.coin_last_update})")
+        return True
+
+    async def update(self, force: bool = False, trigger: str = "scheduled") -> None:
+        """Refresh the list if it is older than COIN_LIST_CACHE_SECONDS.
+
+        Concurrent calls wait for the running refresh instead of starting another download.
+
+        Args:
+            force: Refresh regardless of the list's age
+            trigger: Reason for the refresh, used as a metric attribute
+        """
+        if not self.enabled():
+            return
+        async with self._refresh_lock:
+            now = datetime.datetime.now()
+            if not force and (now - self.coin_last_update).total_seconds() < COIN_LIST_CACHE_SECONDS:
+                return
+
+            attrs = {"registry": self.name, "refresh.trigger": trigger}
+            coins = await self._timed(self._download(), attrs)
+            if coins is None:
+                return
+            self.coin_last_update = now
+            await self._publish(self.registry.diff(coins), attrs, now)
+
+    async def _timed(self, download: Awaitable[Any], attrs: dict[str, str]) -> Any:
+        """Await a download, recording its duration and counting failures."""
+        started_at = perf_counter()
+        try:
+            result = await download
+        except Exception as e:
+            logging.error(f"Failed to refresh {self.name} coin list: {e}", exc_info=True)
+            result = None
+        registry_refresh_duration_seconds.record(perf_counter() - started_at, attrs)
+        if result is None:
+            registry_refresh_failures_total.add(1, attrs)
+        return result
+
+    async def _publish(self, delta: CoinDelta, attrs: dict[str, str], now: datetime.datetime) -> None:
+        """Apply a delta to the registry and its search index, then save a snapshot."""
+        if not delta:
+            return
+        # Only the coins that changed are re-indexed, so the cost follows the churn.
+        registry = self.registry.update(delta)
+        search_index = self._search_index
+        if search_index is not None and search_index.registry is self.registry:
+            search_index = search_index.update(registry, delta)
+        for change, count in (
+            ("added", len(delta.added)),
+            ("removed", len(delta.removed)),
+            ("changed", len(delta.changed)),
+        ):
+            registry_changes_total.add(count, {**attrs, "change": change})
+        registry_entries_delta.record(len(registry) - len(self.registry), attrs)
+        self.registry = registry
+        self._search_index = search_index
+        logging.info(
+            f"Updated {self.name} coin list: {len(delta.added)} added, {len(delta.removed)} removed, "
+            f"{len(delta.changed)} changed; {len(registry)} coins"
+        )
+        try:
+            await asyncio.to_thread(write_snapshot, self.snapshot_path, registry, now.timestamp())
+        except OSError as e:
+            logging.warning(f"Failed to save coin list snapshot {self.snapshot_path}: {e}")
+
+    def request_refresh(self) -> bool:
+        """Schedule a forced refresh in the background after a lookup miss.
+
+        Misses never wait for the download. Requests are dropped while a refresh is running
+        and for COIN_LIST_MISS_REFRESH_INTERVAL seconds after the previous miss-triggered one,
+        so a stream of typos cannot cause repeated downloads.
+
+        Returns:
+            True if a refresh was scheduled
+        """
+        now = monotonic()
+        if self._refresh_lock.locked() or now - self._last_miss_refresh < s.COIN_LIST_MISS_REFRESH_INTERVAL:
+            return False
+        self._last_miss_refresh = now
+        task = asyncio.create_task(self.update(force=True, trigger="miss"))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return True
+
+
+def _decode_cmc_map(content: bytes) -> list[CoinInfo]:
+    return [CoinInfo.from_dict(item) for item in json.loads(content)["data"]]
 
 
 class CMCCoinList(CoinList):
@@ -25,38 +200,105 @@ class CMCCoinList(CoinList):
     Singleton class to store the CoinMarketCap coin list
     """
 
-    async def update(self) -> None:
-        cmc_api_key = s.CMC_API_KEY.get_secret_value()
-        if not cmc_api_key:
-            return
-        now = datetime.datetime.now()
-        if (now - self.coin_last_update) >= datetime.timedelta(hours=1):
-            url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/map"
-            coin_list_cmc = await fetch_url(url, headers={"X-CMC_PRO_API_KEY": cmc_api_key})
-            if not coin_list_cmc:
-                logging.error("Failed to fetch CoinMarketCap, list not updated")
-                return
-            self.coin_list = coin_list_cmc
-            self.coin_last_update = now
-            logging.info("Reloaded coin list from CoinMarketCap API")
+    name = "coinmarketcap"
+
+    def enabled(self) -> bool:
+        return bool(s.CMC_API_KEY.get_secret_value())
+
+    async def _download(self) -> list[CoinInfo] | None:
+        url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/map"
+        # Decoding straight into CoinInfo records means the raw map (platforms, token addresses...) is never kept.
+        # A 304 revalidation hands back the same records, which diff to an empty delta.
+        coins = await fetch_url(
+            url,
+            headers={"X-CMC_PRO_API_KEY": s.CMC_API_KEY.get_secret_value()},
+            service="coinmarketcap",
+            priority=Priority.REFRESH,
+            decoder=_decode_cmc_map,
+        )
+        if not coins:
+            logging.error("Failed to fetch CoinMarketCap, list not updated")
+            return None
+        return coins
+
+
+def _decode_market_ranks(content: bytes) -> list[tuple[str, int]]:
+    return [(item["id"], item["market_cap_rank"]) for item in json.loads(content) if item.get("market_cap_rank")]
 
 
 class CGCoinList(CoinList):
-    async def update(self) -> None:
-        now = datetime.datetime.now()
-        if (now - self.coin_last_update) >= datetime.timedelta(hours=1):
-            url = "https://api.coingecko.com/api/v3/coins/list?include_platform=false"
-            coin_request = await fetch_url(url)
-            if not coin_request:
-                logging.error("Failed to fetch CoinGecko, list not updated")
+    name = "coingecko"
+
+    def __init__(self) -> None:
+        super().__init__()
+        # The coins/list endpoint has no ranks; they come from /coins/markets and are merged into every refresh.
+        self._market_ranks: dict[str, int] = {}
+        self.ranks_last_update = datetime.datetime(2023, 1, 1)
+        # Exclusions the registry was filtered with; None until a full list has been downloaded.
+        self._exclusions: frozenset[str] | None = None
+
+    def load_snapshot(self) -> bool:
+        loaded = super().load_snapshot()
+        ids, _symbols, _names, ranks = self.registry.columns()
+        self._market_ranks = {coin_id: rank for coin_id, rank in zip(ids, ranks, strict=True) if rank}
+        return loaded
+
+    async def update_ranks(self, force: bool = False) -> None:
+        """Refresh the market cap rank of every coin if the ranking is older than MARKET_RANK_REFRESH_SECONDS.
+
+        The ranking is one snapshot of the top MARKET_RANK_PAGES * 250 coins by market cap;
+        coins outside it become unranked.
+
+        Args:
+            force: Refresh regardless of the ranking's age
+        """
+        async with self._refresh_lock:
+            now = datetime.datetime.now()
+            if not force and (now - self.ranks_last_update).total_seconds() < s.MARKET_RANK_REFRESH_SECONDS:
                 return
-            self.coin_list = coin_request
-            self.coin_last_update = now
-            excluded_values = await get_excluded()
-            self.coin_list = [
-                crypto for crypto in self.coin_list if all(excluded not in crypto["id"] for excluded in excluded_values)
-            ]
-            logging.info("Reloaded coin list from CoinGecko API")
+            attrs = {"registry": self.name, "refresh.trigger": "ranks"}
+            ranks = await self._timed(self._download_ranks(), attrs)
+            if ranks is None:
+                return
+            self._market_ranks = ranks
+            self.ranks_last_update = now
+            await self._publish(self.registry.rank_delta(ranks), attrs, now)
+
+    async def _download_ranks(self) -> dict[str, int] | None:
+        ranks: dict[str, int] = {}
+        for page in range(1, s.MARKET_RANK_PAGES + 1):
+            url = f"{COINGECKO_API_COINS_MARKETS}?vs_currency=usd&order=market_cap_desc&per_page=250&page={page}"
+            # Only id and rank are kept from the ~40 fields of every market entry.
+            entries = await fetch_url(url, service="coingecko", priority=Priority.REFRESH, decoder=_decode_market_ranks)
+            if entries is None:
+                logging.error("Failed to fetch CoinGecko markets, ranks not updated")
+                return None
+            ranks.update(entries)
+        return ranks
+
+    async def _download(self) -> list[CoinInfo] | None:
+        url = "https://api.coingecko.com/api/v3/coins/list?include_platform=false"
+        exclusions = frozenset(await get_excluded())
+        excluded = compile_exclusions(exclusions)
+        # A 304 only says the upstream list is unchanged; it can be reused as is only if the exclusions are too.
+        conditional = bool(self.registry) and exclusions == self._exclusions
+        coins = []
+        try:
+            # Filter while streaming so the raw payload and an unfiltered copy are never held at once.
+            async for crypto in stream_json_array(
+                url, service="coingecko", priority=Priority.REFRESH, conditional=conditional
+            ):
+                if not excluded.matches(crypto["id"]):
+                    coin = CoinInfo.from_dict(crypto)
+                    coin.rank = self._market_ranks.get(coin.id)
+                    coins.append(coin)
+        except NotModifiedError:
+            return list(self.registry)
+        except Exception as e:
+            logging.error(f"Failed to fetch CoinGecko, list not updated: {e}")
+            return None
+        self._exclusions = exclusions
+        return coins
 
 
 class ChartTemplate:
@@ -81,3 +323,38 @@ class ChartTemplate:
 cg_coin_list = CGCoinList()
 cmc_coin_list = CMCCoinList()
 chart_template = ChartTemplate()
+chat_choices = ChoiceMemory(s.CHOICE_MEMORY_MAX_ENTRIES)
+
+
+async def refresh_coin_lists() -> None:
+    """Refresh every coin list that is due, concurrently, then the CoinGecko market cap ranks."""
+    await asyncio.gather(cmc_coin_list.update(), cg_coin_list.update())
+    await cg_coin_list.update_ranks()
+
+
+coin_list_refresher = PeriodicTask(
+    refresh_coin_lists, s.COIN_LIST_REFRESH_INTERVAL, name="refresh_coin_lists", jitter=s.COIN_LIST_REFRESH_JITTER
+)
+
+meter.create_observable_gauge(
+    "bot.coin_registry.bytes",
+    callbacks=[
+        lambda _options: [
+            Observation(coin_list.registry.memory_bytes(), {"registry": coin_list.name})
+            for coin_list in (cg_coin_list, cmc_coin_list)
+        ]
+    ],
+    unit="By",
+    description="Approximate memory held by the in-process coin registries",
+)
+meter.create_observable_gauge(
+    "bot.coin_registry.entries",
+    callbacks=[
+        lambda _options: [
+            Observation(len(coin_list.registry), {"registry": coin_list.name})
+            for coin_list in (cg_coin_list, cmc_coin_list)
+        ]
+    ],
+    unit="1",
+    description="Number of coins in the in-process coin registries",
+)
@@ -0,0 +1,176 @@
+"""Versioned, checksummed binary snapshots of coin registries.
+
+Layout (little endian)::
+
+    header   magic "HCPBREG\\0", version u16, id kind u16, created_at f64, payload size u64, crc32 u32
+    payload  count u32, ranks u32[count], ids, symbols, names
+
+Integer ids are stored as i64[count]. String columns (and string ids) are stored as the
+code-point length of every string, u32[count], followed by the UTF-8 size u64 and the
+concatenated UTF-8 text. Files are written to a temporary sibling and atomically renamed
+over the previous snapshot; they are read through a read-only memory map.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from array import array
+from pathlib import Path
+
+from src.models import CoinRegistry
+
+SNAPSHOT_MAGIC = b"HCPBREG\0"
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct("<8sHHdQI")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+
+_STR_IDS = 0
+_INT_IDS = 1
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot file is truncated, corrupted or of an unsupported version."""
+
+
+def _encode_strings(strings: list[str]) -> bytes:
+    lengths = array("I", map(len, strings))
+    text = "".join(strings).encode("utf-8")
+    return lengths.tobytes() + _U64.pack(len(text)) + text
+
+
+def encode_registry(registry: CoinRegistry, created_at: float) -> bytes:
+    """Serialize a registry to the snapshot format.
+
+    Args:
+        registry: Registry to serialize
+        created_at: Unix time at which the registry's data was downloaded
+
+    Returns:
+        Snapshot bytes, header included
+    """
+    ids, symbols, names, ranks = registry.columns()
+    int_ids = bool(ids) and isinstance(ids[0], int)
+    parts = [
+        _U32.pack(len(ids)),
+        ranks.tobytes(),
+        array("q", ids).tobytes() if int_ids else _encode_strings(ids),
+        _encode_strings(symbols),
+        _encode_strings(names),
+    ]
+    payload = b"".join(parts)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        _INT_IDS if int_ids else _STR_IDS,
+        created_at,
+        len(payload),
+        zlib.crc32(payload),
+    )
+    return header + payload
+
+
+class _Reader:
+    def __init__(self, buffer: mmap.mmap, offset: int, end: int) -> None:
+        self._buffer = buffer
+        self._offset = offset
+        self._end = end
+
+    def take(self, size: int) -> bytes:
+        if self._offset + size > self._end:
+            raise SnapshotError("snapshot payload is truncated")
+        chunk = self._buffer[self._offset : self._offset + size]
+        self._offset += size
+        return chunk
+
+    def array(self, typecode: str, count: int) -> array:
+        values = array(typecode)
+        values.frombytes(self.take(values.itemsize * count))
+        return values
+
+    def strings(self, count: int) -> list[str]:
+        lengths = self.array("I", count)
+        (size,) = _U64.unpack(self.take(_U64.size))
+        text = self.take(size).decode("utf-8")
+        strings = []
+        start = 0
+        for length in lengths:
+            strings.append(text[start : start + length])
+            start += length
+        if start != len(text):
+            raise SnapshotError("snapshot string column does not match its lengths")
+        return strings
+
+
+def read_snapshot(path: Path) -> tuple[CoinRegistry, float]:
+    """Load a registry snapshot through a read-only memory map.
+
+    Args:
+        path: Snapshot file
+
+    Returns:
+        Tuple of (registry, created_at unix time)
+
+    Raises:
+        OSError: If the file cannot be opened
+        SnapshotError: If the file is not a valid snapshot of the supported version
+    """
+    with path.open("rb") as snapshot_file:
+        if os.fstat(snapshot_file.fileno()).st_size < _HEADER.size:
+            raise SnapshotError("snapshot is shorter than its header")
+        with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            magic, version, id_kind, created_at, payload_size, checksum = _HEADER.unpack(buffer[: _HEADER.size])
+            if magic != SNAPSHOT_MAGIC:
+                raise SnapshotError("not a coin registry snapshot")
+            if version != SNAPSHOT_VERSION:
+                raise SnapshotError(f"unsupported snapshot version {version}")
+            end = _HEADER.size + payload_size
+            if len(buffer) != end:
+                raise SnapshotError("snapshot size does not match its header")
+            with memoryview(buffer)[_HEADER.size :] as payload:
+                valid = zlib.crc32(payload) == checksum
+            if not valid:
+                raise SnapshotError("snapshot checksum mismatch")
+
+            reader = _Reader(buffer, _HEADER.size, end)
+            (count,) = _U32.unpack(reader.take(_U32.size))
+            ranks = reader.array("I", count)
+            ids = reader.array("q", count).tolist() if id_kind == _INT_IDS else reader.strings(count)
+            symbols = reader.strings(count)
+            names = reader.strings(count)
+
+    try:
+        return CoinRegistry.from_columns(ids, symbols, names, ranks), created_at
+    except ValueError as e:
+        raise SnapshotError(str(e)) from e
+
+
+def write_snapshot(path: Path, registry: CoinRegistry, created_at: float) -> None:
+    """Atomically replace a snapshot file.
+
+    The snapshot is written and fsynced under a temporary name in the same directory, then
+    renamed over the target, so readers see either the previous or the new complete file.
+
+    Args:
+        path: Snapshot file
+        registry: Registry to save
+        created_at: Unix time at which the registry's data was downloaded
+
+    Raises:
+        OSError: If the snapshot cannot be written
+    """
+    data = encode_registry(registry, created_at)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(data)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,229 @@
+"""Batched, fire-and-forget delivery of call tracking events."""
+
+import asyncio
+import json
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from time import perf_counter
+
+from opentelemetry import metrics as otel_metrics
+
+logger = logging.getLogger(__name__)
+
+meter = otel_metrics.get_meter("h-crypto-price-bot.tracking")
+tracking_flushed_total = meter.create_counter(
+    "bot.tracking.flushed_total",
+    unit="1",
+    description="Total number of tracking events delivered",
+)
+tracking_dropped_total = meter.create_counter(
+    "bot.tracking.dropped_total",
+    unit="1",
+    description="Total number of tracking events dropped",
+)
+tracking_spilled_total = meter.create_counter(
+    "bot.tracking.spilled_total",
+    unit="1",
+    description="Total number of tracking events written to the local spill file",
+)
+tracking_flush_duration_seconds = meter.create_histogram(
+    "bot.tracking.flush_duration_seconds",
+    unit="s",
+    description="Duration of tracking batch deliveries, including retries",
+)
+
+SendBatch = Callable[[list[dict]], Awaitable[None]]
+
+
+class CallTracker:
+    """Queue tracking events in memory and deliver them in batches from a background task.
+
+    Events are flushed when `batch_size` are queued or `flush_interval` seconds after the first
+    one arrived. Failed deliveries are retried with jittered exponential backoff and finally
+    appended to a local JSON-lines spill file, which is replayed after the next successful flush.
+    """
+
+    def __init__(
+        self,
+        send: SendBatch,
+        max_queue: int,
+        batch_size: int,
+        flush_interval: float,
+        spill_path: Path,
+        max_attempts: int = 3,
+        backoff: float = 1.0,
+    ) -> None:
+        """Initialize the tracker.
+
+        Args:
+            send: Coroutine delivering a batch; must raise on failure
+            max_queue: Maximum number of queued events; further events are dropped
+            batch_size: Maximum number of events per delivery
+            flush_interval: Maximum seconds an event waits before its batch is sent
+            spill_path: File receiving events that could not be delivered
+            max_attempts: Delivery attempts per batch before spilling
+            backoff: Base delay between attempts, in seconds
+        """
+        self._send = send
+        self._queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of queued events."""
+        return self._queue.qsize()
+
+    def record(self, event: dict) -> bool:
+        """Queue an event without waiting.
+
+        Args:
+            event: JSON-serializable tracking event
+
+        Returns:
+            False if the queue was full and the event was dropped
+        """
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            tracking_dropped_total.add(1, {"reason": "queue_full"})
+            return False
+
+    def start(self) -> None:
+        """Start the background flush task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and deliver (or spill) whatever is still queued.
+
+        Events the task already took off the queue (a batch being gathered, retried or sent)
+        are spilled as the task is cancelled, so they are replayed rather than lost.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait() for _ in range(min(self.batch_size, self._queue.qsize()))]
+            await self.flush(batch, attempts=1)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            await self.flush(batch)
+
+    async def _next_batch(self) -> list[dict]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        try:
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            await self._spill(batch)
+            raise
+        return batch
+
+    async def flush(self, batch: list[dict], attempts: int | None = None) -> bool:
+        """Deliver a batch, retrying with backoff and spilling it to disk on failure.
+
+        Args:
+            batch: Events to deliver
+            attempts: Delivery attempts, defaults to max_attempts
+
+        Returns:
+            True if the batch was delivered
+        """
+        attempts = attempts or self.max_attempts
+        started_at = perf_counter()
+        delivered = False
+        try:
+            for attempt in range(attempts):
+                try:
+                    await self._send(batch)
+                except Exception as e:
+                    logger.warning(f"Tracking flush attempt {attempt + 1}/{attempts} failed: {e}")
+                    if attempt + 1 < attempts:
+                        await asyncio.sleep(self.backoff * 2**attempt * random.uniform(0.5, 1.5))
+                    continue
+                tracking_flushed_total.add(len(batch))
+                delivered = True
+                break
+        except asyncio.CancelledError:
+            # Stopped while retrying or sending: keep the batch for the next replay.
+            await self._spill(batch)
+            raise
+        finally:
+            tracking_flush_duration_seconds.record(perf_counter() - started_at)
+
+        if delivered:
+            await self._replay_spill()
+            return True
+        await self._spill(batch)
+        return False
+
+    async def _spill(self, batch: list[dict]) -> None:
+        lines = "".join(json.dumps(event) + "\n" for event in batch)
+        try:
+            await asyncio.to_thread(_append_text, self.spill_path, lines)
+            tracking_spilled_total.add(len(batch))
+        except OSError as e:
+            logger.error(f"Failed to spill {len(batch)} tracking events: {e}")
+            tracking_dropped_total.add(len(batch), {"reason": "spill_failed"})
+
+    async def _replay_spill(self) -> None:
+        if not self.spill_path.exists():
+            return
+        try:
+            content = await asyncio.to_thread(self.spill_path.read_text)
+        except OSError as e:
+            logger.error(f"Failed to read tracking spill file: {e}")
+            return
+
+        # A crash mid-write can leave a truncated last line; skip unreadable lines rather than the whole file.
+        events = []
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping corrupt tracking spill line: {line[:100]!r}")
+                tracking_dropped_total.add(1, {"reason": "spill_corrupt"})
+
+        try:
+            self.spill_path.unlink()
+        except OSError as e:
+            logger.error(f"Failed to remove tracking spill file: {e}")
+            return
+        for start in range(0, len(events), self.batch_size):
+            batch = events[start : start + self.batch_size]
+            try:
+                await self._send(batch)
+                tracking_flushed_total.add(len(batch))
+            except asyncio.CancelledError:
+                await self._spill(events[start:])
+                raise
+            except Exception as e:
+                logger.warning(f"Replaying spilled tracking events failed: {e}")
+                await self._spill(events[start:])
+                return
+
+
+def _append_text(path: Path, text: str) -> None:
+    with path.open("a", encoding="utf-8") as spill_file:
+        spill_file.write(text)
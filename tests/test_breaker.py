@@ -0,0 +1,86 @@
+"""Tests for the circuit breaker."""
+
+from src.utils.breaker import BreakerState, CircuitBreaker
+from tests.test_cache import FakeClock
+
+
+def _breaker(clock, transitions=None) -> CircuitBreaker:
+    listener = (lambda old, new: transitions.append((old, new))) if transitions is not None else None
+    return CircuitBreaker(failure_threshold=3, recovery_timeout=30, on_state_change=listener, clock=clock)
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the circuit opens at the failure threshold and rejects calls."""
+        breaker = _breaker(FakeClock())
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state is BreakerState.OPEN
+        assert not breaker.allow()
+
+    def test_success_resets_failure_count(self):
+        """Test that failures must be consecutive to open the circuit."""
+        breaker = _breaker(FakeClock())
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state is BreakerState.CLOSED
+
+    def test_half_open_allows_single_probe(self):
+        """Test that only one probe is allowed after the cool-down, and its success closes the circuit."""
+        clock = FakeClock()
+        transitions = []
+        breaker = _breaker(clock, transitions)
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 30
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state is BreakerState.CLOSED
+        assert transitions == [
+            (BreakerState.CLOSED, BreakerState.OPEN),
+            (BreakerState.OPEN, BreakerState.HALF_OPEN),
+            (BreakerState.HALF_OPEN, BreakerState.CLOSED),
+        ]
+
+    def test_released_probe_can_be_retried(self):
+        """Test that a probe released without an outcome lets the next call probe, and is a no-op otherwise."""
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        breaker.release_probe()
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 30
+        assert breaker.allow()
+        breaker.release_probe()
+        assert breaker.state is BreakerState.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+
+    def test_failed_probe_reopens(self):
+        """Test that a failed probe re-opens the circuit for another cool-down."""
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 30
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state is BreakerState.OPEN
+        clock.now = 59
+        assert not breaker.allow()
+
+    def test_retry_after_opens_immediately(self):
+        """Test that Retry-After opens the circuit for the requested duration."""
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        breaker.record_failure(retry_after=5)
+        assert breaker.state is BreakerState.OPEN
+        clock.now = 5
+        assert breaker.state is BreakerState.HALF_OPEN
@@ -0,0 +1,129 @@
+"""Tests for the response cache."""
+
+from src.constants import CACHE_STALE_FACTOR, CACHE_TTL_COIN_DETAIL, CACHE_TTL_MARKET_CHART
+from src.utils.cache import CachePolicy, CacheState, TTLCache, ValidatedResponse, cache_policy
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTTLCache:
+    """Tests for TTLCache."""
+
+    def test_miss_on_empty_cache(self):
+        """Test lookup of a missing key."""
+        cache = TTLCache(max_bytes=100)
+        assert cache.get("btc") == (None, CacheState.MISS)
+
+    def test_hit_stale_and_expiry(self):
+        """Test that entries move from fresh to stale to expired."""
+        clock = FakeClock()
+        cache = TTLCache(max_bytes=100, clock=clock)
+        cache.set("btc", {"price": 1}, ttl=10, stale_ttl=20)
+
+        assert cache.get("btc") == ({"price": 1}, CacheState.HIT)
+        clock.now = 15
+        assert cache.get("btc") == ({"price": 1}, CacheState.STALE)
+        clock.now = 30
+        assert cache.get("btc") == (None, CacheState.MISS)
+
+    def test_fresh_for(self):
+        """Test the remaining fresh lifetime of entries."""
+        clock = FakeClock()
+        cache = TTLCache(max_bytes=100, clock=clock)
+        cache.set("btc", 1, ttl=10, stale_ttl=20)
+        clock.now = 4
+        assert cache.fresh_for("btc") == 6
+        clock.now = 15
+        assert cache.fresh_for("btc") == 0
+        assert cache.fresh_for("eth") == 0
+
+    def test_expired_entry_available_as_fallback(self):
+        """Test that expired entries can still be read as a fallback until evicted."""
+        clock = FakeClock()
+        cache = TTLCache(max_bytes=100, clock=clock)
+        cache.set("btc", {"price": 1}, ttl=10)
+        clock.now = 1000
+        assert cache.get("btc") == (None, CacheState.MISS)
+        assert cache.fallback("btc") == {"price": 1}
+        assert cache.fallback("eth") is None
+
+    def test_lru_eviction_by_size(self):
+        """Test that least recently used entries are evicted to honor the size bound."""
+        cache = TTLCache(max_bytes=10)
+        cache.set("a", 1, ttl=60, size=4)
+        cache.set("b", 2, ttl=60, size=4)
+        cache.get("a")
+        cache.set("c", 3, ttl=60, size=4)
+
+        assert cache.get("b")[1] is CacheState.MISS
+        assert cache.get("a")[1] is CacheState.HIT
+        assert cache.get("c")[1] is CacheState.HIT
+        assert cache.bytes == 8
+
+    def test_oversized_entry_not_stored(self):
+        """Test that an entry larger than the bound is ignored."""
+        cache = TTLCache(max_bytes=10)
+        cache.set("big", "x", ttl=60, size=11)
+        assert len(cache) == 0
+
+    def test_set_replaces_existing_entry(self):
+        """Test that overwriting a key keeps size accounting consistent."""
+        cache = TTLCache(max_bytes=10)
+        cache.set("a", 1, ttl=60, size=6)
+        cache.set("a", 2, ttl=60, size=3)
+        assert cache.get("a") == (2, CacheState.HIT)
+        assert cache.bytes == 3
+
+
+class TestValidatedResponse:
+    """Tests for response validators."""
+
+    def test_conditional_headers_from_validators(self):
+        """Test that ETag and Last-Modified become If-None-Match and If-Modified-Since."""
+        validated = ValidatedResponse.from_headers(
+            {"ETag": '"abc"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}, value=[1], size=3
+        )
+        assert validated.conditional_headers() == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+        }
+
+    def test_response_without_validators(self):
+        """Test that responses without validators are not remembered."""
+        assert ValidatedResponse.from_headers({"Content-Type": "application/json"}, value=[1], size=3) is None
+
+
+class TestCachePolicy:
+    """Tests for endpoint cache policies."""
+
+    def test_coin_detail_policy(self):
+        """Test that coin detail responses are cached."""
+        policy = cache_policy("https://api.coingecko.com/api/v3/coins/bitcoin?localization=false")
+        assert policy == CachePolicy(CACHE_TTL_COIN_DETAIL, CACHE_TTL_COIN_DETAIL * CACHE_STALE_FACTOR)
+
+    def test_market_chart_policy_depends_on_period(self):
+        """Test that market chart TTL follows the requested period."""
+        base = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart?vs_currency=usd&days="
+        assert cache_policy(base + "1").ttl == CACHE_TTL_MARKET_CHART["1"]
+        assert cache_policy(base + "365").ttl == CACHE_TTL_MARKET_CHART["365"]
+        assert cache_policy(base + "max") is None
+
+    def test_global_and_cmc_quotes_cached(self):
+        """Test that /global, simple prices and CMC quotes are cacheable."""
+        assert cache_policy("https://api.coingecko.com/api/v3/global") is not None
+        assert cache_policy("https://pro-api.coinmarketcap.com/v2/cryptocurrency/quotes/latest?id=1") is not None
+        assert cache_policy("https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd") is not None
+
+    def test_uncached_endpoints(self):
+        """Test that coin lists and other endpoints are not cached."""
+        assert cache_policy("https://api.coingecko.com/api/v3/coins/list?include_platform=false") is None
+        assert cache_policy("https://pro-api.coinmarketcap.com/v1/cryptocurrency/map") is None
+        assert cache_policy("https://api.etherscan.io/api?module=gastracker") is None
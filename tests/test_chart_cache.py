@@ -0,0 +1,121 @@
+"""Tests for the chart image cache."""
+
+import asyncio
+import io
+from types import SimpleNamespace
+
+from telegram.error import BadRequest
+
+import src.utils.bot as bot_module
+from src.constants import CACHE_TTL_MARKET_CHART
+from src.utils.bot import send_tg
+from src.utils.chart_cache import ChartImageCache, chart_image_ttl
+from tests.test_cache import FakeClock
+
+
+class TestChartImageCache:
+    """Tests for ChartImageCache."""
+
+    def test_key_buckets_data_timestamp_by_period_ttl(self):
+        """Test that data points within one TTL bucket share a key and the next bucket does not."""
+        day = ChartImageCache.key("bitcoin", "1", "dark", 120_000)
+        assert day == ChartImageCache.key("bitcoin", "1", "dark", 179_999)
+        assert day != ChartImageCache.key("bitcoin", "1", "dark", 180_000)
+        assert day != ChartImageCache.key("bitcoin", "1", "light", 120_000)
+        year = ChartImageCache.key("bitcoin", "365", "dark", 0)
+        assert year == ChartImageCache.key("bitcoin", "365", "dark", 3_599_999)
+
+    def test_ttl_depends_on_period(self):
+        """Test that short periods expire sooner than long ones and unknown periods get the longest TTL."""
+        assert chart_image_ttl("1") < chart_image_ttl("30") < chart_image_ttl("365")
+        assert chart_image_ttl("max") == max(CACHE_TTL_MARKET_CHART.values())
+
+    def test_hit_miss_and_expiry(self):
+        """Test that images are served until their period's TTL and counted in the hit ratio."""
+        clock = FakeClock()
+        cache = ChartImageCache(max_bytes=100, clock=clock)
+        key = ChartImageCache.key("bitcoin", "1", "dark", 0)
+        assert cache.get(key) is None
+        cache.set(key, b"jpeg")
+        assert cache.get(key) == b"jpeg"
+        clock.now = chart_image_ttl("1")
+        assert cache.get(key) is None
+        assert (cache.hits, cache.misses) == (1, 2)
+        assert cache.hit_ratio == 1 / 3
+
+    def test_bounded_by_image_bytes(self):
+        """Test that the least recently used images are evicted to stay within the byte bound."""
+        cache = ChartImageCache(max_bytes=10)
+        keys = [ChartImageCache.key(coin, "30", "dark", 0) for coin in ("bitcoin", "ethereum", "pepe")]
+        cache.set(keys[0], b"1234")
+        cache.set(keys[1], b"5678")
+        cache.get(keys[0])
+        cache.set(keys[2], b"9012")
+        assert cache.bytes == 8
+        assert len(cache) == 2
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == b"1234"
+
+    def test_file_id_lives_with_fresh_image(self):
+        """Test that a recorded file_id is returned only while its image is cached and fresh."""
+        clock = FakeClock()
+        cache = ChartImageCache(max_bytes=100, clock=clock)
+        key = ChartImageCache.key("bitcoin", "7", "dark", 0)
+        cache.set_file_id(key, "ignored")
+        assert cache.file_id(key) is None
+        cache.set(key, b"jpeg")
+        cache.set_file_id(key, "AgAD")
+        assert cache.file_id(key) == "AgAD"
+        clock.now = chart_image_ttl("7")
+        assert cache.file_id(key) is None
+
+
+class FakeBot:
+    """Records send_photo calls and answers like Telegram, optionally rejecting file_ids."""
+
+    def __init__(self, reject_file_ids: bool = False) -> None:
+        self.sent: list[object] = []
+        self.reject_file_ids = reject_file_ids
+
+    async def send_photo(self, photo, **_kwargs):
+        self.sent.append(photo)
+        if isinstance(photo, str):
+            if self.reject_file_ids:
+                raise BadRequest("Wrong file identifier/http url specified")
+            return SimpleNamespace(photo=[])
+        sizes = [SimpleNamespace(file_id="thumb"), SimpleNamespace(file_id=f"file-{len(self.sent)}")]
+        return SimpleNamespace(photo=sizes)
+
+
+class TestSendTgFileId:
+    """Tests for sending cached chart images by file_id."""
+
+    def send(self, bot, key):
+        asyncio.run(send_tg(SimpleNamespace(bot=bot), 1, photo=io.BytesIO(b"jpeg"), cache_key=key))
+
+    def test_uploads_once_then_sends_by_reference(self, monkeypatch):
+        """Test that the first send uploads and later sends of the same fresh chart reuse the file_id."""
+        cache = ChartImageCache(max_bytes=100)
+        monkeypatch.setattr(bot_module, "chart_image_cache", cache)
+        key = ChartImageCache.key("bitcoin", "30", "dark", 0)
+        cache.set(key, b"jpeg")
+        bot = FakeBot()
+        self.send(bot, key)
+        self.send(bot, key)
+        self.send(bot, None)
+        assert isinstance(bot.sent[0], io.BytesIO)
+        assert bot.sent[1] == "file-1"
+        assert isinstance(bot.sent[2], io.BytesIO)
+
+    def test_rejected_file_id_is_uploaded_again(self, monkeypatch):
+        """Test that a file_id Telegram no longer accepts is replaced by a fresh upload."""
+        cache = ChartImageCache(max_bytes=100)
+        monkeypatch.setattr(bot_module, "chart_image_cache", cache)
+        key = ChartImageCache.key("bitcoin", "30", "dark", 0)
+        cache.set(key, b"jpeg")
+        cache.set_file_id(key, "expired")
+        bot = FakeBot(reject_file_ids=True)
+        self.send(bot, key)
+        assert bot.sent[0] == "expired"
+        assert isinstance(bot.sent[1], io.BytesIO)
+        assert cache.file_id(key) == "file-2"
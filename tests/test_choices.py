@@ -0,0 +1,50 @@
+"""Tests for the per-chat disambiguation choice memory."""
+
+from src.constants import CallbackPrefix
+from src.models import CallbackData
+from src.utils.bot import other_matches_button
+from src.utils.choices import ChoiceMemory
+
+
+class TestChoiceMemory:
+    """Tests for ChoiceMemory."""
+
+    def test_recall_is_per_chat_source_and_symbol(self):
+        """Test that a choice is only recalled for the same chat, coin list and symbol."""
+        memory = ChoiceMemory(max_entries=10)
+        memory.remember(1, CallbackPrefix.CG, "uni", "uniswap")
+        assert memory.recall(1, CallbackPrefix.CG, "UNI") == "uniswap"
+        assert memory.recall(2, CallbackPrefix.CG, "uni") is None
+        assert memory.recall(1, CallbackPrefix.CMC, "uni") is None
+        assert memory.recall(1, CallbackPrefix.CG, "eth") is None
+
+    def test_remember_overwrites(self):
+        """Test that a new pick replaces the previous one."""
+        memory = ChoiceMemory(max_entries=10)
+        memory.remember(1, CallbackPrefix.CMC, "UNI", 7083)
+        memory.remember(1, CallbackPrefix.CMC, "uni", 1)
+        assert memory.recall(1, CallbackPrefix.CMC, "uni") == 1
+        assert len(memory) == 1
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that recalling a choice protects it from eviction."""
+        memory = ChoiceMemory(max_entries=2)
+        memory.remember(1, CallbackPrefix.CG, "uni", "uniswap")
+        memory.remember(2, CallbackPrefix.CG, "uni", "universe")
+        memory.recall(1, CallbackPrefix.CG, "uni")
+        memory.remember(3, CallbackPrefix.CG, "uni", "unicorn")
+        assert len(memory) == 2
+        assert memory.recall(1, CallbackPrefix.CG, "uni") == "uniswap"
+        assert memory.recall(2, CallbackPrefix.CG, "uni") is None
+
+    def test_forget(self):
+        """Test that a forgotten choice is no longer recalled."""
+        memory = ChoiceMemory(max_entries=2)
+        memory.remember(1, CallbackPrefix.CG, "uni", "uniswap")
+        memory.forget(1, CallbackPrefix.CG, "UNI")
+        assert memory.recall(1, CallbackPrefix.CG, "uni") is None
+
+    def test_other_matches_button_round_trips(self):
+        """Test that the other matches button encodes the list to show and the symbol."""
+        button = other_matches_button(CallbackPrefix.CHART, "uni")
+        assert CallbackData.parse(button.callback_data) == CallbackData("others", "chart", "uni")
@@ -0,0 +1,74 @@
+"""Tests for the compiled exclusion matcher."""
+
+import random
+import string
+
+from src.utils.exclusions import ExclusionMatcher, compile_exclusions
+
+
+def _substring_filter(coin_ids: list[str], excluded_values: list[str]) -> list[str]:
+    """The filter CGCoinList.update applied before the matcher existed."""
+    return [coin_id for coin_id in coin_ids if all(excluded not in coin_id for excluded in excluded_values)]
+
+
+def _matcher_filter(coin_ids: list[str], excluded_values: list[str]) -> list[str]:
+    matcher = ExclusionMatcher(excluded_values)
+    return [coin_id for coin_id in coin_ids if not matcher.matches(coin_id)]
+
+
+class TestExclusionMatcher:
+    """Tests for ExclusionMatcher."""
+
+    COIN_IDS = [
+        "bitcoin",
+        "wrapped-bitcoin",
+        "binance-peg-dogecoin",
+        "heco-peg-bnb",
+        "bridged-usdc-polygon-pos-bridge",
+        "ethereum-wormhole",
+        "matic-network",
+        "solana",
+        "a.b+c",
+    ]
+
+    def test_same_output_as_substring_filter(self):
+        """Test the matcher against the previous filter on typical exclusions."""
+        excluded = ["-wormhole", "bridged-", "-peg", "binance-peg"]
+        assert _matcher_filter(self.COIN_IDS, excluded) == _substring_filter(self.COIN_IDS, excluded)
+        assert _matcher_filter(self.COIN_IDS, excluded) == [
+            "bitcoin",
+            "wrapped-bitcoin",
+            "matic-network",
+            "solana",
+            "a.b+c",
+        ]
+
+    def test_regex_metacharacters_are_literal(self):
+        """Test that patterns are matched as plain substrings."""
+        assert _matcher_filter(self.COIN_IDS, [".", "+"]) == _substring_filter(self.COIN_IDS, [".", "+"])
+        assert ExclusionMatcher(["a.b"]).matches("a.b+c")
+        assert not ExclusionMatcher(["a.b"]).matches("axb")
+
+    def test_empty_pattern_lists_and_patterns(self):
+        """Test that no patterns exclude nothing and an empty pattern excludes everything."""
+        assert _matcher_filter(self.COIN_IDS, []) == self.COIN_IDS
+        assert _matcher_filter(self.COIN_IDS, [""]) == []
+
+    def test_same_output_on_random_inputs(self):
+        """Test equivalence with the substring filter on random ids and overlapping patterns."""
+        rng = random.Random(42)
+        alphabet = string.ascii_lowercase[:4] + "-"
+
+        def word(low: int, high: int) -> str:
+            return "".join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+
+        for _ in range(50):
+            coin_ids = [word(1, 12) for _ in range(200)]
+            excluded = [word(1, 5) for _ in range(rng.randint(1, 30))]
+            assert _matcher_filter(coin_ids, excluded) == _substring_filter(coin_ids, excluded)
+
+    def test_compiled_once_per_pattern_set(self):
+        """Test that the same exclusion set reuses its compiled matcher."""
+        assert compile_exclusions(frozenset({"-peg", "bridged-"})) is compile_exclusions(
+            frozenset({"bridged-", "-peg"})
+        )
@@ -0,0 +1,485 @@
+"""Tests for HTTP client utilities."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from src.constants import CACHE_TTL_COIN_DETAIL
+from src.utils import http
+from src.utils.cache import TTLCache
+from src.utils.ratelimit import GCRALimiter
+from tests.test_cache import FakeClock
+
+
+class TestClientRegistry:
+    """Tests for the per-service client registry."""
+
+    def test_client_reused_per_service(self):
+        """Test that the same client is returned for the same service."""
+
+        async def scenario():
+            try:
+                assert http.get_client("coingecko") is http.get_client("coingecko")
+            finally:
+                await http.close_clients()
+
+        asyncio.run(scenario())
+
+    def test_clients_isolated_between_services(self):
+        """Test that each service gets its own client."""
+
+        async def scenario():
+            try:
+                assert http.get_client("coingecko") is not http.get_client("coinmarketcap")
+            finally:
+                await http.close_clients()
+
+        asyncio.run(scenario())
+
+    def test_close_clients_resets_registry(self):
+        """Test that closed clients are replaced on next use."""
+
+        async def scenario():
+            client = http.get_client("etherscan")
+            await http.close_clients()
+            assert client.is_closed
+            replacement = http.get_client("etherscan")
+            assert replacement is not client
+            await http.close_clients()
+
+        asyncio.run(scenario())
+
+
+class TestConnectionTracing:
+    """Tests for counting the connections opened by the shared clients."""
+
+    def test_counts_new_connections_only(self, monkeypatch):
+        """Test that requests reusing a keep-alive connection do not count as new connections."""
+        opened = []
+        monkeypatch.setattr(http.s, "HTTP2_ENABLED", False)
+        counter = SimpleNamespace(add=lambda _amount, attrs: opened.append(attrs))
+        monkeypatch.setattr(http, "api_connections_opened_total", counter)
+
+        async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}")
+                await writer.drain()
+
+        async def scenario():
+            server = await asyncio.start_server(serve, "127.0.0.1", 0)
+            url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+            try:
+                for _ in range(3):
+                    (await http.get_client("test").get(url)).raise_for_status()
+            finally:
+                await http.close_clients()
+                server.close()
+
+        asyncio.run(scenario())
+        assert opened == [{"api.service": "test"}]
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestSingleFlight:
+    """Tests for coalescing of identical in-flight requests."""
+
+    def test_concurrent_identical_requests_share_upstream_call(self):
+        """Test that concurrent GETs for the same URL hit the upstream once."""
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"id": "pepe"})
+
+        async def scenario():
+            http._clients["test"] = _mock_client(handler)
+            try:
+                return await asyncio.gather(
+                    http.fetch_url("https://example.com/coins/pepe?a=1&b=2", service="test"),
+                    http.fetch_url("https://example.com/coins/pepe?b=2&a=1", service="test"),
+                    http.fetch_url("https://example.com/coins/pepe?a=1&b=2", service="test"),
+                )
+            finally:
+                await http.close_clients()
+
+        results = asyncio.run(scenario())
+        assert len(calls) == 1
+        assert results == [{"id": "pepe"}] * 3
+        assert not http._inflight
+
+    def test_different_headers_are_not_coalesced(self):
+        """Test that requests with different headers are sent separately."""
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.headers.get("x-key"))
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json=[])
+
+        async def scenario():
+            http._clients["test"] = _mock_client(handler)
+            try:
+                await asyncio.gather(
+                    http.fetch_url("https://example.com/list", headers={"X-Key": "a"}, service="test"),
+                    http.fetch_url("https://example.com/list", headers={"X-Key": "b"}, service="test"),
+                )
+            finally:
+                await http.close_clients()
+
+        asyncio.run(scenario())
+        assert sorted(calls) == ["a", "b"]
+
+    def test_request_key_normalization(self):
+        """Test that query order and header case do not affect the key."""
+        first = http._request_key("https://example.com/x?b=2&a=1", {"X-Key": "v"})
+        second = http._request_key("https://example.com/x?a=1&b=2", {"x-key": "v"})
+        assert first == second
+
+
+class TestResponseCache:
+    """Tests for response caching in fetch_url."""
+
+    URL = "https://api.coingecko.com/api/v3/coins/bitcoin"
+
+    def test_fresh_entry_served_from_cache(self, monkeypatch):
+        """Test that a cached response avoids a second upstream call."""
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url)
+            return httpx.Response(200, json={"id": "bitcoin"})
+
+        monkeypatch.setattr(http, "response_cache", TTLCache(max_bytes=1024))
+
+        async def scenario():
+            http._clients["test"] = _mock_client(handler)
+            try:
+                first = await http.fetch_url(self.URL, service="test")
+                second = await http.fetch_url(self.URL, service="test")
+            finally:
+                await http.close_clients()
+            return first, second
+
+        assert asyncio.run(scenario()) == ({"id": "bitcoin"}, {"id": "bitcoin"})
+        assert len(calls) == 1
+
+    def test_stale_entry_served_while_refreshing(self, monkeypatch):
+        """Test that a stale entry is returned immediately and refreshed in the background."""
+        clock = FakeClock()
+        prices = iter([1, 2])
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"price": next(prices)})
+
+        monkeypatch.setattr(http, "response_cache", TTLCache(max_bytes=1024, clock=clock))
+
+        async def scenario():
+            http._clients["test"] = _mock_client(handler)
+            try:
+                await http.fetch_url(self.URL, service="test")
+                clock.now = CACHE_TTL_COIN_DETAIL + 1
+                stale = await http.fetch_url(self.URL, service="test")
+                await asyncio.gather(*http._inflight.values())
+                refreshed = await http.fetch_url(self.URL, service="test")
+            finally:
+                await http.close_clients()
+            return stale, refreshed
+
+        assert asyncio.run(scenario()) == ({"price": 1}, {"price": 2})
+
+
+class TestRetriesAndCircuitBreaker:
+    """Tests for retries, Retry-After and circuit breaking in fetch_url."""
+
+    URL = "https://api.coingecko.com/api/v3/coins/bitcoin"
+
+    def _run(self, handler, *urls):
+        async def scenario():
+            http._clients["test"] = _mock_client(handler)
+            try:
+                return [await http.fetch_url(url, service="test") for url in urls]
+            finally:
+                await http.close_clients()
+
+        return asyncio.run(scenario())
+
+    def _isolate(self, monkeypatch):
+        monkeypatch.setattr(http, "response_cache", TTLCache(max_bytes=1024))
+        monkeypatch.setattr(http, "_breakers", {})
+        monkeypatch.setattr(http.s, "HTTP_RETRY_BACKOFF", 0.001)
+
+    def test_transient_error_is_retried(self, monkeypatch):
+        """Test that a 503 is retried and the later success returned."""
+        self._isolate(monkeypatch)
+        statuses = iter([503, 200])
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(next(statuses), json={"id": "bitcoin"})
+
+        assert self._run(handler, self.URL) == [{"id": "bitcoin"}]
+
+    def test_client_error_is_not_retried(self, monkeypatch):
+        """Test that a 404 returns None without retrying."""
+        self._isolate(monkeypatch)
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(404)
+
+        assert self._run(handler, self.URL) == [None]
+        assert len(calls) == 1
+
+    def test_retry_after_opens_circuit_and_serves_cached(self, monkeypatch):
+        """Test that a long Retry-After stops retries, opens the circuit and falls back to the cache."""
+        self._isolate(monkeypatch)
+        clock = FakeClock()
+        monkeypatch.setattr(http, "response_cache", TTLCache(max_bytes=1024, clock=clock))
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(200, json={"id": "bitcoin"})
+            return httpx.Response(429, headers={"Retry-After": "120"})
+
+        assert self._run(handler, self.URL) == [{"id": "bitcoin"}]
+        clock.now = 3600
+        assert self._run(handler, self.URL) == [{"id": "bitcoin"}]
+        assert http.get_breaker("test").state is http.BreakerState.OPEN
+
+        assert self._run(handler, "https://api.coingecko.com/api/v3/coins/ethereum") == [None]
+        assert len(calls) == 2
+
+    def test_cancelled_probe_frees_the_breaker(self, monkeypatch):
+        """Test that cancelling the half-open probe lets a later call probe instead of leaving the circuit stuck."""
+        self._isolate(monkeypatch)
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(10)
+            return httpx.Response(200, json=[])
+
+        async def scenario():
+            http._clients["test"] = _mock_client(handler)
+            breaker = http.get_breaker("test")
+            breaker.record_failure(retry_after=0)
+            try:
+                for probe in (
+                    http._fetch(
+                        http._request_key(self.URL, None),
+                        self.URL,
+                        None,
+                        "test",
+                        30.0,
+                        None,
+                        http.Priority.REFRESH,
+                        json.loads,
+                    ),
+                    anext(http.stream_json_array(self.URL, service="test")),
+                ):
+                    task = asyncio.ensure_future(probe)
+                    await asyncio.sleep(0.01)
+                    assert not breaker.allow()
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    assert breaker.state is http.BreakerState.HALF_OPEN
+                    assert breaker.allow()
+                    breaker.release_probe()
+            finally:
+                await http.close_clients()
+
+        asyncio.run(scenario())
+
+
+class TestConditionalRequests:
+    """Tests for ETag / Last-Modified revalidation."""
+
+    URL = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/map"
+
+    def _isolate(self, monkeypatch):
+        monkeypatch.setattr(http, "validated_cache", TTLCache(max_bytes=1024 * 1024))
+        monkeypatch.setattr(http, "_breakers", {})
+
+    def test_not_modified_reuses_decoded_object(self, monkeypatch):
+        """Test that a 304 returns the object decoded from the previous 200 without decoding again."""
+        self._isolate(monkeypatch)
+        seen_headers = []
+        decoded = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen_headers.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"'})
+            return httpx.Response(200, json={"data": [1, 2, 3]}, headers={"ETag": '"v1"'})
+
+        def decoder(content: bytes):
+            decoded.append(content)
+            return json.loads(content)
+
+        async def scenario():
+            http._clients["test"] = _mock_client(handler)
+            try:
+                first = await http.fetch_url(self.URL, service="test", decoder=decoder)
+                second = await http.fetch_url(self.URL, service="test", decoder=decoder)
+            finally:
+                await http.close_clients()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert second is first
+        assert seen_headers == [None, '"v1"']
+        assert len(decoded) == 1
+
+    def test_cacheable_response_keeps_value_in_response_cache_only(self, monkeypatch):
+        """Test that a cacheable response stores only validators and a 304 reads the value from response_cache."""
+        self._isolate(monkeypatch)
+        clock = FakeClock()
+        monkeypatch.setattr(http, "response_cache", TTLCache(max_bytes=1024 * 1024, clock=clock))
+        url = "https://api.coingecko.com/api/v3/coins/bitcoin"
+        seen_headers = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen_headers.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"'})
+            return httpx.Response(200, json={"id": "bitcoin"}, headers={"ETag": '"v1"'})
+
+        async def fetch():
+            http._clients["test"] = _mock_client(handler)
+            try:
+                return await http.fetch_url(url, service="test")
+            finally:
+                await http.close_clients()
+
+        first = asyncio.run(fetch())
+        assert http.validated_cache.bytes == 1
+        clock.now = 3600
+        assert asyncio.run(fetch()) is first
+        http.response_cache.clear()
+        assert asyncio.run(fetch()) == first
+        assert seen_headers == [None, '"v1"', None]
+
+    def test_response_without_validators_is_not_conditional(self, monkeypatch):
+        """Test that no conditional headers are sent when the upstream gave no validators."""
+        self._isolate(monkeypatch)
+        seen_headers = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen_headers.append(request.headers.get("If-None-Match"))
+            return httpx.Response(200, json={"data": []})
+
+        async def scenario():
+            http._clients["test"] = _mock_client(handler)
+            try:
+                await http.fetch_url(self.URL, service="test")
+                await http.fetch_url(self.URL, service="test")
+            finally:
+                await http.close_clients()
+
+        asyncio.run(scenario())
+        assert seen_headers == [None, None]
+
+    def test_stream_not_modified(self, monkeypatch):
+        """Test that a conditional stream raises NotModifiedError on 304."""
+        self._isolate(monkeypatch)
+        url = "https://api.coingecko.com/api/v3/coins/list"
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.headers.get("If-Modified-Since") == "Wed, 01 Jan 2025 00:00:00 GMT":
+                return httpx.Response(304)
+            return httpx.Response(
+                200, json=[{"id": "bitcoin"}], headers={"Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+            )
+
+        async def collect(conditional: bool) -> list:
+            return [item async for item in http.stream_json_array(url, service="test", conditional=conditional)]
+
+        async def scenario():
+            http._clients["test"] = _mock_client(handler)
+            try:
+                first = await collect(conditional=True)
+                unconditional = await collect(conditional=False)
+                with pytest.raises(http.NotModifiedError):
+                    await collect(conditional=True)
+            finally:
+                await http.close_clients()
+            return first, unconditional
+
+        assert asyncio.run(scenario()) == ([{"id": "bitcoin"}], [{"id": "bitcoin"}])
+
+
+class TestPrefetch:
+    """Tests for background prefetching of cacheable responses."""
+
+    URL = "https://api.coingecko.com/api/v3/coins/bitcoin"
+
+    def test_refreshes_only_entries_about_to_expire(self, monkeypatch):
+        """Test that prefetch skips responses that stay fresh long enough and refreshes the others."""
+        clock = FakeClock()
+        monkeypatch.setattr(http, "response_cache", TTLCache(max_bytes=1024, clock=clock))
+        prices = iter([1, 2])
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"price": next(prices)})
+
+        async def scenario():
+            http._clients["test"] = _mock_client(handler)
+            try:
+                missing = await http.prefetch_url(self.URL, service="test", min_fresh=30)
+                fresh = await http.prefetch_url(self.URL, service="test", min_fresh=30)
+                clock.now = CACHE_TTL_COIN_DETAIL - 10
+                expiring = await http.prefetch_url(self.URL, service="test", min_fresh=30)
+                cached = await http.fetch_url(self.URL, service="test")
+            finally:
+                await http.close_clients()
+            return missing, fresh, expiring, cached
+
+        assert asyncio.run(scenario()) == (True, False, True, {"price": 2})
+
+    def test_uncacheable_endpoint_is_not_prefetched(self):
+        """Test that prefetch ignores endpoints without a cache policy."""
+        url = "https://api.coingecko.com/api/v3/coins/list"
+        assert asyncio.run(http.prefetch_url(url, service="test")) is False
+
+
+class TestSendCalls:
+    """Tests for delivering tracked calls to hcpb-api."""
+
+    def _send(self, monkeypatch, response: httpx.Response) -> GCRALimiter:
+        limiter = GCRALimiter(limit=10, period=3600, max_keys=100, clock=FakeClock())
+        monkeypatch.setattr(http, "chat_rate_limiter", limiter)
+        monkeypatch.setattr(http.s, "hcpb_api_url", "https://hcpb.test")
+
+        async def scenario():
+            http._clients["hcpb-api"] = _mock_client(lambda request: response)
+            try:
+                await http._send_calls([{"chat_id": "1"}])
+            finally:
+                await http.close_clients()
+
+        asyncio.run(scenario())
+        return limiter
+
+    def test_rate_limited_hint_saturates_chats(self, monkeypatch):
+        """Test that chats reported over quota are blocked by the local limiter."""
+        limiter = self._send(monkeypatch, httpx.Response(200, json={"rate_limited": [1]}))
+        assert not limiter.allow("1")
+        assert limiter.allow("2")
+
+    @pytest.mark.parametrize("content", [b"<html>ok</html>", b'["accepted"]', b'{"rate_limited": 5}'])
+    def test_unreadable_reply_still_delivers(self, monkeypatch, content):
+        """Test that a 2xx reply whose body cannot be read does not fail the batch."""
+        limiter = self._send(monkeypatch, httpx.Response(200, content=content))
+        assert limiter.allow("1")
+
+    def test_error_status_fails_the_batch(self, monkeypatch):
+        """Test that a non-2xx reply raises so the tracker retries or spills the batch."""
+        with pytest.raises(httpx.HTTPStatusError):
+            self._send(monkeypatch, httpx.Response(503, request=httpx.Request("POST", "https://hcpb.test")))
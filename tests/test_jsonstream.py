@@ -0,0 +1,54 @@
+"""Tests for incremental JSON array decoding."""
+
+import json
+
+import pytest
+
+from src.utils.jsonstream import JSONArrayStream
+
+
+def _decode_in_chunks(text: str, size: int) -> list:
+    stream = JSONArrayStream()
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(stream.feed(text[start : start + size]))
+    stream.close()
+    return items
+
+
+class TestJSONArrayStream:
+    """Tests for JSONArrayStream."""
+
+    COINS = [
+        {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+        {"id": "ethereum", "symbol": "eth", "name": 'Ethereum, "the world computer" ]'},
+        {"id": "pepe", "symbol": "pepe", "name": "Pepe", "tags": [1, 2, {"a": None}]},
+    ]
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 10_000])
+    def test_items_match_full_decode(self, chunk_size):
+        """Test that chunked decoding yields the same items as json.loads."""
+        text = json.dumps(self.COINS, indent=1)
+        assert _decode_in_chunks(text, chunk_size) == json.loads(text)
+
+    def test_empty_array(self):
+        """Test decoding an empty array."""
+        assert _decode_in_chunks(" [ ] ", 2) == []
+
+    def test_items_yielded_before_end(self):
+        """Test that complete items are available before the array is closed."""
+        stream = JSONArrayStream()
+        assert list(stream.feed('[{"id": "a"}, {"id"')) == [{"id": "a"}]
+        assert list(stream.feed(': "b"}]')) == [{"id": "b"}]
+
+    def test_truncated_document_rejected(self):
+        """Test that a document without the closing bracket fails on close."""
+        stream = JSONArrayStream()
+        list(stream.feed('[{"id": "a"}, {"id": '))
+        with pytest.raises(ValueError):
+            stream.close()
+
+    def test_non_array_rejected(self):
+        """Test that a top-level object is rejected."""
+        with pytest.raises(ValueError):
+            list(JSONArrayStream().feed('{"id": "a"}'))
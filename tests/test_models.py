@@ -1,11 +1,16 @@
 """Tests for data models."""
 
+import random
+import sys
+
 import pytest
 
 from src.models import (
     AtEntry,
     CallbackData,
+    CoinDelta,
     CoinInfo,
+    CoinRegistry,
     GeneralDataEntry,
     MarketCapEntry,
     PriceChangeEntry,
@@ -195,6 +200,160 @@ class TestCoinInfo:
         assert restored.name == original.name
 
 
+class TestCoinRegistry:
+    """Tests for CoinRegistry."""
+
+    CG_COINS = [
+        {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+        {"id": "batcat", "symbol": "btc", "name": "Batcat"},
+        {"id": "ethereum", "symbol": "eth", "name": "Ethereum"},
+    ]
+    CMC_COINS = [
+        {"id": 9000, "symbol": "ETH", "name": "Ether Clone", "rank": None, "platform": {"token_address": "0x0"}},
+        {"id": 1027, "symbol": "ETH", "name": "Ethereum", "rank": 2},
+        {"id": 8000, "symbol": "ETH", "name": "Ethereum Classic Wrapped", "rank": 900},
+        {"id": 1, "symbol": "BTC", "name": "Bitcoin", "rank": 1},
+    ]
+
+    def test_ids_for_symbol_keep_source_order_without_ranks(self):
+        """Test that unranked coins sharing a symbol are returned in list order."""
+        registry = CoinRegistry.from_dicts(self.CG_COINS)
+        assert registry.ids_for_symbol("btc") == ["bitcoin", "batcat"]
+        assert registry.ids_for_symbol("eth") == ["ethereum"]
+        assert registry.ids_for_symbol("doge") == []
+
+    def test_candidates_sorted_by_rank(self):
+        """Test that coins sharing a symbol are ordered by rank, unranked last."""
+        registry = CoinRegistry.from_dicts(self.CMC_COINS)
+        assert registry.candidates("ETH") == [
+            CoinInfo(id=1027, symbol="ETH", name="Ethereum", rank=2),
+            CoinInfo(id=8000, symbol="ETH", name="Ethereum Classic Wrapped", rank=900),
+            CoinInfo(id=9000, symbol="ETH", name="Ether Clone"),
+        ]
+
+    def test_get_by_id(self):
+        """Test id lookups."""
+        registry = CoinRegistry.from_dicts(self.CMC_COINS)
+        assert registry.get(1) == CoinInfo(id=1, symbol="BTC", name="Bitcoin", rank=1)
+        assert registry.get(2) is None
+        assert 1027 in registry
+        assert len(registry) == 4
+
+    def test_iteration_preserves_source_order(self):
+        """Test that iterating yields every coin in source order."""
+        registry = CoinRegistry.from_dicts(self.CG_COINS)
+        assert [coin.id for coin in registry] == ["bitcoin", "batcat", "ethereum"]
+
+    def test_symbols_are_interned(self):
+        """Test that equal symbols share one string object."""
+        coins = [{"id": f"coin-{i}", "symbol": "".join(["d", "up"]), "name": str(i)} for i in range(3)]
+        registry = CoinRegistry.from_dicts(coins)
+        first, second, _ = list(registry)
+        assert first.symbol is second.symbol
+
+    def test_memory_accounting(self):
+        """Test that the registry reports its footprint and is smaller than the source dicts."""
+        items = [{"id": f"coin-{i}", "symbol": f"s{i % 500}", "name": f"Coin {i}"} for i in range(2000)]
+        registry = CoinRegistry.from_dicts(items)
+        dicts_bytes = sum(sys.getsizeof(item) + sum(map(sys.getsizeof, item.values())) for item in items)
+        assert 0 < registry.memory_bytes() < dicts_bytes
+        assert registry.bytes_per_entry() == registry.memory_bytes() / 2000
+        assert CoinRegistry([]).bytes_per_entry() == 0
+
+    def test_diff_by_id(self):
+        """Test that diff reports added, removed and changed coins."""
+        registry = CoinRegistry.from_dicts(self.CMC_COINS)
+        new = [
+            CoinInfo(1, "BTC", "Bitcoin", 1),
+            CoinInfo(1027, "ETH", "Ethereum", 3),
+            CoinInfo(8000, "ETC", "Ethereum Classic Wrapped", 900),
+            CoinInfo(5, "SOL", "Solana", 5),
+        ]
+        delta = registry.diff(new)
+        assert delta.added == [CoinInfo(5, "SOL", "Solana", 5)]
+        assert delta.removed == [CoinInfo(9000, "ETH", "Ether Clone")]
+        assert [after.id for _before, after in delta.changed] == [1027, 8000]
+        assert delta.changed[0][0].rank == 2
+        assert delta.symbols() == {"SOL", "ETH", "ETC"}
+        assert not registry.diff(registry)
+
+    def test_update_applies_delta(self):
+        """Test that an applied delta is visible in the new registry only."""
+        registry = CoinRegistry.from_dicts(self.CMC_COINS)
+        delta = CoinDelta(
+            added=[CoinInfo(5, "SOL", "Solana", 5)],
+            removed=[CoinInfo(1, "BTC", "Bitcoin", 1)],
+            changed=[(CoinInfo(9000, "ETH", "Ether Clone"), CoinInfo(9000, "ETH", "Ether Clone", 3))],
+        )
+        # Enough unchanged coins that the delta is applied incrementally rather than by a rebuild.
+        registry = CoinRegistry([*registry, *(CoinInfo(f"filler-{i}", f"F{i}", "Filler") for i in range(20))])
+        updated = registry.update(delta)
+        assert updated.candidates("ETH")[:2] == [
+            CoinInfo(1027, "ETH", "Ethereum", 2),
+            CoinInfo(9000, "ETH", "Ether Clone", 3),
+        ]
+        assert updated.ids_for_symbol("BTC") == [] and 1 not in updated
+        assert updated.get(5) == CoinInfo(5, "SOL", "Solana", 5)
+        assert len(updated) == len(registry)
+        assert registry.ids_for_symbol("BTC") == [1]
+
+    def test_rank_delta(self):
+        """Test that a ranking yields changes only for coins whose rank moves."""
+        registry = CoinRegistry.from_dicts(self.CMC_COINS)
+        delta = registry.rank_delta({1: 1, 1027: 3, 9000: 50})
+        assert [(before.rank, after.rank) for before, after in delta.changed] == [(None, 50), (2, 3), (900, None)]
+        assert not delta.added and not delta.removed
+        assert registry.update(delta).candidates("ETH")[0] == CoinInfo(1027, "ETH", "Ethereum", 3)
+
+    @pytest.mark.parametrize(
+        ("ranks", "expected"),
+        [
+            ({"bitcoin": 1}, "bitcoin"),
+            ({"bitcoin": 1, "batcat": 10}, "bitcoin"),
+            ({"bitcoin": 1, "batcat": 9}, None),
+            ({"batcat": 300}, "batcat"),
+            ({}, None),
+        ],
+    )
+    def test_dominant(self, ranks, expected):
+        """Test that a symbol resolves directly only when its best coin clearly outranks the rest."""
+        registry = CoinRegistry.from_dicts(self.CG_COINS)
+        registry = registry.update(registry.rank_delta(ranks))
+        dominant = registry.dominant("btc", ratio=10)
+        assert (dominant and dominant.id) == expected
+        assert registry.dominant("eth", ratio=10).id == "ethereum"
+        assert registry.dominant("doge", ratio=10) is None
+
+    def test_label(self):
+        """Test disambiguation button labels."""
+        assert CoinInfo(1, "BTC", "Bitcoin", 1).label() == "1° Bitcoin"
+        assert CoinInfo(2, "BTC", "Batcat").label() == "Batcat"
+
+    @pytest.mark.parametrize("churn", [0.01, 0.1, 0.5])
+    def test_update_matches_rebuild(self, churn):
+        """Test that applying a random delta gives the same registry as building the new list from scratch."""
+        rng = random.Random(churn)
+
+        def coin(i: int) -> CoinInfo:
+            return CoinInfo(f"coin-{i}", f"s{rng.randrange(40)}", f"Coin {i}", rng.choice([None, rng.randrange(1, 99)]))
+
+        old = [coin(i) for i in range(400)]
+        new = [c for c in old if rng.random() > churn / 2]
+        new = [coin(int(c.id[5:])) if rng.random() < churn / 2 else c for c in new]
+        new += [coin(i) for i in range(400, 400 + int(400 * churn / 2))]
+        rng.shuffle(new)
+
+        registry = CoinRegistry(old)
+        updated = registry.update(registry.diff(new))
+        rebuilt = CoinRegistry(new)
+        assert sorted(updated, key=lambda c: c.id) == sorted(rebuilt, key=lambda c: c.id)
+        for symbol in {c.symbol for c in new}:
+            # Ties and unranked coins follow row order, which a delta does not reshuffle.
+            assert [c.rank for c in updated.candidates(symbol)] == [c.rank for c in rebuilt.candidates(symbol)]
+            assert sorted(updated.ids_for_symbol(symbol)) == sorted(rebuilt.ids_for_symbol(symbol))
+        assert not updated.diff(new)
+
+
 class TestCallbackData:
     """Tests for CallbackData model."""
 
@@ -0,0 +1,81 @@
+"""Tests for request popularity tracking."""
+
+import pytest
+
+from src.utils.popularity import DecayingCountMinSketch, PopularityTracker
+from tests.test_cache import FakeClock
+
+
+class TestDecayingCountMinSketch:
+    """Tests for DecayingCountMinSketch."""
+
+    def test_counts_are_never_underestimated(self):
+        """Test that every key's estimate is at least its true count."""
+        sketch = DecayingCountMinSketch(width=64, depth=4, half_life=3600, clock=FakeClock())
+        counts = {f"coin-{i}": i % 7 + 1 for i in range(200)}
+        for key, count in counts.items():
+            sketch.add(key, count)
+        assert all(sketch.estimate(key) >= count for key, count in counts.items())
+
+    def test_counts_halve_every_half_life(self):
+        """Test that a count decays to half after one half-life."""
+        clock = FakeClock()
+        sketch = DecayingCountMinSketch(width=64, depth=4, half_life=100, clock=clock)
+        sketch.add("bitcoin", 8)
+        clock.now = 100
+        assert sketch.estimate("bitcoin") == pytest.approx(4)
+        clock.now = 300
+        assert sketch.estimate("bitcoin") == pytest.approx(1)
+
+    def test_rescaling_keeps_estimates(self):
+        """Test that rescaling after a long run does not change decayed counts."""
+        clock = FakeClock()
+        sketch = DecayingCountMinSketch(width=64, depth=4, half_life=1, clock=clock)
+        sketch.add("bitcoin", 2**20)
+        clock.now = 40
+        sketch.add("ethereum")
+        assert sketch.estimate("bitcoin") == pytest.approx(2**-20)
+        assert sketch.estimate("ethereum") == pytest.approx(1)
+
+
+class TestPopularityTracker:
+    """Tests for PopularityTracker."""
+
+    def test_top_orders_by_frequency(self):
+        """Test that the most requested keys come first."""
+        tracker = PopularityTracker(capacity=10, half_life=3600, clock=FakeClock())
+        for key, count in (("bitcoin", 5), ("ethereum", 3), ("solana", 1)):
+            for _ in range(count):
+                tracker.record(key)
+        assert tracker.top(2) == ["bitcoin", "ethereum"]
+        assert tracker.top(5, min_count=2) == ["bitcoin", "ethereum"]
+
+    def test_zero_capacity_disables_tracking(self):
+        """Test that a tracker sized for PREFETCH_TOP_N=0 accepts requests and never returns keys."""
+        tracker = PopularityTracker(capacity=4 * 0, half_life=3600, clock=FakeClock())
+        tracker.record("bitcoin")
+        tracker.record("bitcoin")
+        assert len(tracker) == 0
+        assert tracker.top(5) == []
+
+    def test_heavy_key_displaces_weakest_candidate(self):
+        """Test that a key requested more often than a candidate replaces it when the set is full."""
+        tracker = PopularityTracker(capacity=2, half_life=3600, clock=FakeClock())
+        tracker.record("bitcoin")
+        tracker.record("bitcoin")
+        tracker.record("dogecoin")
+        tracker.record("ethereum")
+        assert set(tracker.top(2)) == {"bitcoin", "dogecoin"}
+        tracker.record("ethereum")
+        assert set(tracker.top(2)) == {"bitcoin", "ethereum"}
+        assert len(tracker) == 2
+
+    def test_old_requests_fade(self):
+        """Test that recent requests outweigh older, more numerous ones."""
+        clock = FakeClock()
+        tracker = PopularityTracker(capacity=10, half_life=60, clock=clock)
+        for _ in range(4):
+            tracker.record("bitcoin")
+        clock.now = 180
+        tracker.record("solana")
+        assert tracker.top(1) == ["solana"]
@@ -0,0 +1,58 @@
+"""Tests for the per-chat rate limiter."""
+
+from src.utils.ratelimit import GCRALimiter
+from tests.test_cache import FakeClock
+
+
+class TestGCRALimiter:
+    """Tests for GCRALimiter."""
+
+    def test_allows_burst_up_to_limit(self):
+        """Test that `limit` requests are allowed at once and the next is denied."""
+        limiter = GCRALimiter(limit=10, period=3600, max_keys=100, clock=FakeClock())
+        assert all(limiter.allow("chat") for _ in range(10))
+        assert not limiter.allow("chat")
+
+    def test_allowance_recovers_over_time(self):
+        """Test that one request is allowed again after one emission interval."""
+        clock = FakeClock()
+        limiter = GCRALimiter(limit=10, period=3600, max_keys=100, clock=clock)
+        for _ in range(10):
+            limiter.allow("chat")
+        clock.now = 359
+        assert not limiter.allow("chat")
+        clock.now = 360
+        assert limiter.allow("chat")
+        assert not limiter.allow("chat")
+
+    def test_chats_are_independent(self):
+        """Test that one chat's usage does not affect another."""
+        limiter = GCRALimiter(limit=1, period=60, max_keys=100, clock=FakeClock())
+        assert limiter.allow("a")
+        assert not limiter.allow("a")
+        assert limiter.allow("b")
+
+    def test_saturate_blocks_chat(self):
+        """Test that a saturated chat is denied until its next interval."""
+        clock = FakeClock()
+        limiter = GCRALimiter(limit=10, period=3600, max_keys=100, clock=clock)
+        limiter.saturate("chat")
+        assert not limiter.allow("chat")
+        clock.now = 360
+        assert limiter.allow("chat")
+
+    def test_memory_bounded_by_max_keys(self):
+        """Test that the number of tracked chats never exceeds max_keys."""
+        limiter = GCRALimiter(limit=10, period=3600, max_keys=1000, clock=FakeClock())
+        for chat_id in range(10_000):
+            limiter.allow(chat_id)
+        assert len(limiter) == 1000
+
+    def test_expired_keys_dropped(self):
+        """Test that keys with no remaining state are pruned."""
+        clock = FakeClock()
+        limiter = GCRALimiter(limit=10, period=3600, max_keys=100, clock=clock)
+        limiter.allow("old")
+        clock.now = 3600
+        limiter.allow("new")
+        assert len(limiter) == 1
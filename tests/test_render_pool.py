@@ -0,0 +1,166 @@
+"""Tests for chart rendering and the chart render pool."""
+
+import asyncio
+import gc
+import os
+import signal
+import sys
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+from src.utils.chart_render import market_chart_arrays, render_chart
+from src.utils.render_pool import ChartRenderPool, RenderQueueFullError
+
+JPEG_MAGIC = b"\xff\xd8"
+
+
+def make_series(points: int = 50) -> tuple[np.ndarray, np.ndarray]:
+    times = np.datetime64("2026-01-01T00:00:00") + np.arange(points) * np.timedelta64(3600, "s")
+    prices = 100 + np.sin(np.arange(points, dtype=np.float64))
+    return times, prices
+
+
+class TestMarketChartArrays:
+    """Tests for market_chart_arrays."""
+
+    def test_converts_pairs(self):
+        """Test that millisecond timestamps become datetime64 and values float64."""
+        times, prices = market_chart_arrays([[1767225600000, 87000.5], [1767225900000, 87010]])
+        assert times.dtype == np.dtype("datetime64[ms]")
+        assert (times == np.array(["2026-01-01T00:00:00", "2026-01-01T00:05:00"], dtype="datetime64[ms]")).all()
+        assert prices.dtype == np.float64
+        assert prices.tolist() == [87000.5, 87010.0]
+
+    def test_null_values_become_nan(self):
+        """Test that null prices in the payload are kept as NaN gaps."""
+        times, prices = market_chart_arrays([[1767225600000, 87000.5], [1767225900000, None], [1767226200000, 87020]])
+        assert len(times) == 3
+        assert prices[0] == 87000.5 and np.isnan(prices[1]) and prices[2] == 87020.0
+
+    def test_empty(self):
+        """Test that an empty payload gives empty arrays."""
+        times, prices = market_chart_arrays([])
+        assert len(times) == len(prices) == 0
+
+
+class TestRenderChart:
+    """Tests for render_chart."""
+
+    @pytest.mark.parametrize(("template", "period"), [("dark", "1"), ("light", "365")])
+    def test_returns_jpeg(self, template, period):
+        """Test that both themes and date formats encode to a JPEG."""
+        image = render_chart(*make_series(), "Bitcoin (btc)", f"{period} days chart", template, period)
+        assert image.startswith(JPEG_MAGIC)
+
+
+class TestChartRenderPool:
+    """Tests for ChartRenderPool."""
+
+    def test_renders_in_worker(self):
+        """Test that a chart rendered in a worker process comes back as JPEG bytes with its render time."""
+
+        async def scenario():
+            pool = ChartRenderPool(workers=1, max_queue=1)
+            try:
+                image, render_seconds = await pool.render(*make_series(), "Bitcoin (btc)", "1 day chart", "dark", "1")
+            finally:
+                pool.close()
+            assert image.startswith(JPEG_MAGIC)
+            assert render_seconds > 0
+            assert pool.queue_depth == 0
+
+        asyncio.run(scenario())
+
+    def test_workers_only_load_the_renderer(self):
+        """Test that worker processes import the renderer but not the bot's settings, handlers or clients."""
+
+        async def scenario():
+            pool = ChartRenderPool(workers=1, max_queue=0)
+            pool.start()
+            try:
+                probe = "sorted(name for name in __import__('sys').modules if name.startswith('src'))"
+                return await asyncio.wrap_future(pool._executor.submit(eval, probe))
+            finally:
+                pool.close()
+
+        assert asyncio.run(scenario()) == ["src", "src.utils", "src.utils.chart_render"]
+
+    def test_restarts_after_worker_dies(self):
+        """Test that a killed worker fails the chart in flight and the next chart renders on a fresh pool."""
+
+        async def scenario():
+            pool = ChartRenderPool(workers=1, max_queue=1)
+            series = make_series()
+            try:
+                await pool.render(*series, "Bitcoin (btc)", "1 day chart", "dark", "1")
+                broken = pool._executor
+                for pid in list(broken._processes):
+                    os.kill(pid, signal.SIGKILL)
+                with pytest.raises(BrokenProcessPool):
+                    await pool.render(*series, "Bitcoin (btc)", "1 day chart", "dark", "1")
+                image, _ = await pool.render(*series, "Bitcoin (btc)", "1 day chart", "dark", "1")
+            finally:
+                pool.close()
+            assert pool._executor is None
+            assert image.startswith(JPEG_MAGIC)
+
+        asyncio.run(scenario())
+
+    def test_rejects_when_queue_full(self):
+        """Test that charts beyond the workers and the queue limit are rejected without being rendered."""
+
+        async def scenario():
+            pool = ChartRenderPool(workers=1, max_queue=1)
+            series = make_series()
+            try:
+                renders = [
+                    asyncio.ensure_future(pool.render(*series, "Bitcoin (btc)", "1 day chart", "dark", "1"))
+                    for _ in range(3)
+                ]
+                results = await asyncio.gather(*renders, return_exceptions=True)
+            finally:
+                pool.close()
+            assert [type(result) for result in results] == [tuple, tuple, RenderQueueFullError]
+
+        asyncio.run(scenario())
+
+    def test_thread_executor(self):
+        """Test that the thread executor renders without starting worker processes."""
+
+        async def scenario():
+            pool = ChartRenderPool(workers=2, max_queue=2, executor="thread")
+            try:
+                results = await asyncio.gather(
+                    *(pool.render(*make_series(), "Bitcoin (btc)", "7 days chart", "light", "7") for _ in range(3))
+                )
+            finally:
+                pool.close()
+            assert all(image.startswith(JPEG_MAGIC) for image, _ in results)
+
+        asyncio.run(scenario())
+
+
+class TestConcurrentRendering:
+    """Concurrency and memory checks for render_chart; see benchmarks.chart_render_stress for thousands of charts."""
+
+    def test_threads_do_not_leak_figures(self):
+        """Test that charts rendered concurrently in threads are freed and never registered with pyplot."""
+        series = make_series()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: render_chart(*series, "t", "b", "dark", "30"), range(4)))
+            gc.collect()
+            tracemalloc.start()
+            try:
+                baseline = tracemalloc.get_traced_memory()[0]
+                images = list(executor.map(lambda _: render_chart(*series, "t", "b", "dark", "30"), range(12)))
+                del images
+                gc.collect()
+                grown = tracemalloc.get_traced_memory()[0] - baseline
+            finally:
+                tracemalloc.stop()
+        assert grown < 1_000_000
+        assert "matplotlib.pyplot" not in sys.modules or not sys.modules["matplotlib.pyplot"].get_fignums()
@@ -0,0 +1,68 @@
+"""Tests for the outbound request scheduler."""
+
+import asyncio
+
+import pytest
+
+from src.utils.scheduler import DeadlineExceededError, Priority, TokenBucketScheduler
+
+
+class TestTokenBucketScheduler:
+    """Tests for TokenBucketScheduler."""
+
+    def test_burst_admitted_immediately(self):
+        """Test that requests within the burst do not wait."""
+
+        async def scenario():
+            scheduler = TokenBucketScheduler(rate=1, burst=3)
+            return [await scheduler.acquire(Priority.INTERACTIVE, deadline=1) for _ in range(3)]
+
+        assert asyncio.run(scenario()) == [0.0, 0.0, 0.0]
+
+    def test_higher_priority_served_first(self):
+        """Test that queued interactive requests overtake background ones."""
+        order = []
+
+        async def request(scheduler, priority, label):
+            await scheduler.acquire(priority, deadline=2)
+            order.append(label)
+
+        async def scenario():
+            scheduler = TokenBucketScheduler(rate=20, burst=1)
+            await scheduler.acquire(Priority.INTERACTIVE, deadline=1)
+            background = asyncio.create_task(request(scheduler, Priority.BACKGROUND, "background"))
+            refresh = asyncio.create_task(request(scheduler, Priority.REFRESH, "refresh"))
+            interactive = asyncio.create_task(request(scheduler, Priority.INTERACTIVE, "interactive"))
+            await asyncio.sleep(0)
+            assert scheduler.queue_depth == 3
+            await asyncio.gather(background, refresh, interactive)
+
+        asyncio.run(scenario())
+        assert order == ["interactive", "refresh", "background"]
+
+    def test_request_shed_when_wait_exceeds_deadline(self):
+        """Test that a request fails fast when it cannot be admitted in time."""
+
+        async def scenario():
+            scheduler = TokenBucketScheduler(rate=1, burst=1)
+            await scheduler.acquire(Priority.INTERACTIVE, deadline=1)
+            with pytest.raises(DeadlineExceededError):
+                await scheduler.acquire(Priority.BACKGROUND, deadline=0.1)
+            assert scheduler.queue_depth == 0
+
+        asyncio.run(scenario())
+
+    def test_queued_request_times_out(self):
+        """Test that a queued request overtaken by higher priorities is shed at its deadline."""
+
+        async def scenario():
+            scheduler = TokenBucketScheduler(rate=10, burst=1)
+            await scheduler.acquire(Priority.INTERACTIVE, deadline=1)
+            background = asyncio.create_task(scheduler.acquire(Priority.BACKGROUND, deadline=0.15))
+            await asyncio.sleep(0)
+            interactive = [asyncio.create_task(scheduler.acquire(Priority.INTERACTIVE, deadline=1)) for _ in range(3)]
+            with pytest.raises(DeadlineExceededError):
+                await background
+            await asyncio.gather(*interactive)
+
+        asyncio.run(scenario())
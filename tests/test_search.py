@@ -0,0 +1,128 @@
+"""Tests for the symbol search index."""
+
+import pytest
+
+from src.handlers.inline import cg_simple_price_url, inline_quote, inline_result, inline_symbols
+from src.models import CoinInfo, CoinRegistry
+from src.utils.search import SymbolSearchIndex, _one_edit_apart
+
+COINS = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "rank": 1},
+    {"id": "batcat", "symbol": "btc", "name": "Batcat"},
+    {"id": "bitcoin-cash", "symbol": "bch", "name": "Bitcoin Cash", "rank": 15},
+    {"id": "btcs", "symbol": "btcs", "name": "BTCs"},
+    {"id": "bitcoin-gold", "symbol": "btg", "name": "Bitcoin Gold", "rank": 90},
+    {"id": "ethereum", "symbol": "eth", "name": "Ethereum", "rank": 2},
+    {"id": "ethena", "symbol": "ena", "name": "Ethena", "rank": 40},
+    {"id": "ether-fi", "symbol": "ethfi", "name": "ether.fi", "rank": 80},
+    {"id": "pepe", "symbol": "pepe", "name": "Pepe", "rank": 30},
+]
+
+
+@pytest.fixture
+def index():
+    return SymbolSearchIndex(CoinRegistry.from_dicts(COINS))
+
+
+class TestOneEditApart:
+    """Tests for the edit distance check."""
+
+    @pytest.mark.parametrize(
+        ("a", "b", "expected"),
+        [
+            ("btc", "btg", True),
+            ("btc", "bct", True),
+            ("btc", "bt", True),
+            ("btc", "btcs", True),
+            ("btc", "xbtc", True),
+            ("btc", "btc", False),
+            ("btc", "bgg", False),
+            ("btc", "tcb", False),
+            ("eth", "ethfi", False),
+        ],
+    )
+    def test_pairs(self, a, b, expected):
+        """Test insertions, deletions, substitutions and transpositions in both directions."""
+        assert _one_edit_apart(a, b) is expected
+        assert _one_edit_apart(b, a) is expected
+
+
+class TestSymbolSearchIndex:
+    """Tests for SymbolSearchIndex."""
+
+    def test_complete_exact_match_first_then_by_rank(self, index):
+        """Test that the exact symbol leads and longer symbols follow by rank."""
+        assert index.complete("eth") == ["eth", "ethfi"]
+        assert index.complete("BT") == ["btc", "btg", "btcs"]
+        assert index.complete("b", limit=2) == ["btc", "bch"]
+        assert index.complete("xyz") == []
+        assert index.complete("  ") == []
+
+    def test_similar_finds_one_edit_typos(self, index):
+        """Test that typos resolve to symbols one edit away, best ranked first."""
+        assert index.similar("btx") == ["btc", "btg"]
+        assert index.similar("BCT") == ["btc", "bch"]
+        assert index.similar("pepee") == ["pepe"]
+        assert index.similar("etj") == ["eth"]
+        assert index.similar("zzz") == []
+
+    def test_coins_expands_symbols_up_to_limit(self, index):
+        """Test that coins sharing a symbol are listed best rank first and capped."""
+        coins = index.coins(["btc", "bch"], limit=2)
+        assert [coin.id for coin in coins] == ["bitcoin", "batcat"]
+
+    def test_uppercase_registry(self):
+        """Test that CoinMarketCap's upper-case symbols are matched and returned as stored."""
+        index = SymbolSearchIndex(CoinRegistry.from_dicts([{"id": 1, "symbol": "BTC", "name": "Bitcoin", "rank": 1}]))
+        assert index.complete("bt") == ["BTC"]
+        assert index.similar("btx") == ["BTC"]
+        assert [coin.id for coin in index.coins(index.similar("btx"), limit=5)] == [1]
+
+    def test_update_matches_rebuild(self, index):
+        """Test that an index updated with a delta answers like one built from scratch."""
+        new = [
+            *(coin for coin in index.registry if coin.id not in ("bitcoin-gold", "pepe", "ethena")),
+            CoinInfo("ethena", "ena", "Ethena", 12),
+            CoinInfo("bitcoin-cat", "btcat", "Bitcoin Cat"),
+            CoinInfo("pepe-v2", "PEPE", "Pepe", 31),
+        ]
+        delta = index.registry.diff(new)
+        updated = index.update(index.registry.update(delta), delta)
+        rebuilt = SymbolSearchIndex(CoinRegistry(new))
+        for query in ("b", "bt", "btc", "btx", "e", "en", "pep", "pepee", "btg"):
+            assert updated.complete(query) == rebuilt.complete(query)
+            assert updated.similar(query) == rebuilt.similar(query)
+        assert len(updated) == len(rebuilt)
+        assert index.complete("btg") == ["btg"]
+
+    def test_inline_symbols_fall_back_to_typos(self, index):
+        """Test that inline results add typo matches after the prefix matches."""
+        assert inline_symbols(index, "pep") == ["pepe"]
+        assert inline_symbols(index, "btx") == ["btc", "btg"]
+        assert inline_symbols(index, "bt", limit=2) == ["btc", "btg"]
+
+    def test_inline_quote_carries_the_price(self, index):
+        """Test that the posted inline message contains the quote rather than a command."""
+        bitcoin = index.registry.get("bitcoin")
+        summary, text = inline_quote(bitcoin, {"usd": 87000, "usd_24h_change": 1.234})
+        assert summary == "87K$ (+1.2% 24h)"
+        assert text == "1° Bitcoin (BTC)\nPrice: 87K$ (+1.2% 24h)"
+        assert inline_quote(bitcoin, {"usd": 87000})[0] == "87K$"
+        assert inline_quote(bitcoin, {}) is None
+
+    def test_inline_result_without_quote_lists_the_coin(self, index):
+        """Test that a coin whose quote is missing is still offered, without a price."""
+        bitcoin = index.registry.get("bitcoin")
+        quoted = inline_result(bitcoin, {"usd": 87000})
+        assert quoted.description == "87K$"
+        assert quoted.input_message_content.message_text == "1° Bitcoin (BTC)\nPrice: 87K$"
+        for quote in (None, {}):
+            result = inline_result(bitcoin, quote)
+            assert result.title == "BTC · 1° Bitcoin"
+            assert result.description is None
+            assert result.input_message_content.message_text == "1° Bitcoin (BTC)"
+
+    def test_simple_price_url_batches_ids(self):
+        """Test that one request quotes every offered coin."""
+        url = cg_simple_price_url(["bitcoin", "batcat"])
+        assert url.endswith("/simple/price?ids=bitcoin,batcat&vs_currencies=usd&include_24hr_change=true")
@@ -0,0 +1,224 @@
+"""Tests for the background coin list refresh."""
+
+import asyncio
+
+import pytest
+
+from src.config import settings
+from src.models import CoinInfo, CoinRegistry
+from src.utils import shared
+from src.utils.http import NotModifiedError
+from src.utils.periodic import PeriodicTask
+from src.utils.shared import CGCoinList, CoinList
+
+COINS = [{"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}]
+
+
+class FakeCoinList(CoinList):
+    """Coin list whose download is scripted by the test."""
+
+    name = "fake"
+    _instance = None
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.results: list = []
+        self.downloads = 0
+
+    async def _download(self) -> list[CoinInfo] | None:
+        self.downloads += 1
+        await asyncio.sleep(0.01)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture(autouse=True)
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "COIN_SNAPSHOT_DIR", str(tmp_path))
+    return tmp_path
+
+
+def make_coin_list(results: list) -> FakeCoinList:
+    coin_list = FakeCoinList()
+    coin_list.results = results
+    return coin_list
+
+
+class TestCoinListRefresh:
+    """Tests for CoinList.update and CoinList.request_refresh."""
+
+    def test_subclass_must_implement_download(self):
+        """Test that a coin list without a download fails when it is created, not on refresh."""
+
+        class IncompleteCoinList(CoinList):
+            _instance = None
+
+        with pytest.raises(TypeError, match="_download"):
+            IncompleteCoinList()
+
+    def test_concurrent_updates_download_once(self, snapshot_dir):
+        """Test that concurrent refreshes share a single download and save a snapshot."""
+        coin_list = make_coin_list([CoinRegistry.from_dicts(COINS)])
+
+        async def scenario():
+            await asyncio.gather(*(coin_list.update() for _ in range(5)))
+
+        asyncio.run(scenario())
+        assert coin_list.downloads == 1
+        assert list(coin_list.registry.ids_for_symbol("btc")) == ["bitcoin"]
+        assert (snapshot_dir / "fake.snapshot").exists()
+
+    def test_failed_download_keeps_registry(self):
+        """Test that a failing or raising download leaves the current registry in place."""
+        coin_list = make_coin_list([None, RuntimeError("boom")])
+        registry = coin_list.registry
+
+        async def scenario():
+            await coin_list.update(force=True)
+            await coin_list.update(force=True)
+
+        asyncio.run(scenario())
+        assert coin_list.downloads == 2
+        assert coin_list.registry is registry
+
+    def test_refresh_applies_only_the_changes(self):
+        """Test that an unchanged list keeps the registry and a changed one updates the search index too."""
+        bitcoin, ethereum = CoinInfo("bitcoin", "btc", "Bitcoin"), CoinInfo("ethereum", "eth", "Ethereum")
+        coin_list = make_coin_list([[bitcoin], [bitcoin], [bitcoin, ethereum]])
+
+        async def scenario():
+            await coin_list.update(force=True)
+            registry, index = coin_list.registry, coin_list.search_index()
+            await coin_list.update(force=True)
+            assert coin_list.registry is registry
+            await coin_list.update(force=True)
+            assert coin_list.registry is not registry
+            assert coin_list._search_index.registry is coin_list.registry
+            assert index.complete("e") == []
+
+        asyncio.run(scenario())
+        assert coin_list.search_index().complete("e") == ["eth"]
+        assert coin_list.registry.ids_for_symbol("eth") == ["ethereum"]
+
+    def test_miss_refresh_is_rate_limited(self, monkeypatch):
+        """Test that a burst of misses triggers a single background download."""
+        monkeypatch.setattr(settings, "COIN_LIST_MISS_REFRESH_INTERVAL", 300.0)
+        coin_list = make_coin_list([CoinRegistry.from_dicts(COINS)])
+
+        async def scenario():
+            scheduled = [coin_list.request_refresh() for _ in range(3)]
+            await asyncio.gather(*coin_list._background)
+            scheduled.append(coin_list.request_refresh())
+            return scheduled
+
+        assert asyncio.run(scenario()) == [True, False, False, False]
+        assert coin_list.downloads == 1
+        assert len(coin_list.registry) == 1
+
+
+class FakeCGCoinList(CGCoinList):
+    """CoinGecko list whose coins/list and /coins/markets downloads are scripted by the test."""
+
+    _instance = None
+    ranks: dict[str, int] | None = None
+
+    async def _download(self) -> list[CoinInfo] | None:
+        coins = [CoinInfo("bitcoin", "btc", "Bitcoin"), CoinInfo("batcat", "btc", "Batcat")]
+        for coin in coins:
+            coin.rank = self._market_ranks.get(coin.id)
+        return coins
+
+    async def _download_ranks(self) -> dict[str, int] | None:
+        return self.ranks
+
+
+class TestMarketRanks:
+    """Tests for CGCoinList.update_ranks."""
+
+    def test_ranks_survive_list_refresh(self):
+        """Test that market cap ranks are applied to the registry and kept by later list refreshes."""
+        coin_list = FakeCGCoinList()
+
+        async def scenario():
+            await coin_list.update(force=True)
+            assert coin_list.registry.dominant("btc", ratio=10) is None
+            coin_list.ranks = {"bitcoin": 1}
+            await coin_list.update_ranks()
+            registry = coin_list.registry
+            await coin_list.update(force=True)
+            assert coin_list.registry is registry
+            coin_list.ranks = None
+            await coin_list.update_ranks(force=True)
+
+        asyncio.run(scenario())
+        assert coin_list.registry.dominant("btc", ratio=10).id == "bitcoin"
+        assert [coin.label() for coin in coin_list.registry.candidates("btc")] == ["1° Bitcoin", "Batcat"]
+
+
+class StreamedCGCoinList(CGCoinList):
+    """CoinGecko list downloaded through the real _download, with the stream patched by the test."""
+
+    _instance = None
+
+
+class TestCGCoinListDownload:
+    """Tests for the conditional coins/list download of CGCoinList."""
+
+    def test_changed_exclusions_bypass_not_modified(self, monkeypatch):
+        """Test that the list is downloaded in full when the exclusions changed since the last download."""
+        exclusions = [["-peg"]]
+        conditionals = []
+
+        async def get_excluded():
+            return exclusions[-1]
+
+        async def stream_json_array(url, service, priority, conditional):
+            conditionals.append(conditional)
+            if conditional:
+                raise NotModifiedError(url)
+            for coin_id in ("bitcoin", "binance-peg-dogecoin", "wrapped-bitcoin"):
+                yield {"id": coin_id, "symbol": coin_id[:3], "name": coin_id}
+
+        monkeypatch.setattr(shared, "get_excluded", get_excluded)
+        monkeypatch.setattr(shared, "stream_json_array", stream_json_array)
+        coin_list = StreamedCGCoinList()
+
+        async def scenario():
+            ids = []
+            for excluded in (["-peg"], ["-peg"], ["wrapped-"], ["wrapped-"]):
+                exclusions.append(excluded)
+                await coin_list.update(force=True)
+                ids.append(sorted(coin.id for coin in coin_list.registry))
+            return ids
+
+        assert asyncio.run(scenario()) == [
+            ["bitcoin", "wrapped-bitcoin"],
+            ["bitcoin", "wrapped-bitcoin"],
+            ["binance-peg-dogecoin", "bitcoin"],
+            ["binance-peg-dogecoin", "bitcoin"],
+        ]
+        assert conditionals == [False, True, False, True]
+
+
+class TestPeriodicTask:
+    """Tests for PeriodicTask scheduling."""
+
+    def test_immediate_first_run_and_jitter_bounds(self):
+        """Test that a zero start delay runs at once and jittered delays stay in range."""
+        runs = []
+
+        async def run():
+            runs.append(1)
+
+        task = PeriodicTask(run, interval=10.0, name="test", jitter=2.0)
+        assert all(8.0 <= task._next_delay() <= 12.0 for _ in range(100))
+
+        async def scenario():
+            task.start(delay=0)
+            await asyncio.sleep(0.01)
+            await task.stop()
+
+        asyncio.run(scenario())
+        assert runs == [1]
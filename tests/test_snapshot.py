@@ -0,0 +1,74 @@
+"""Tests for coin registry snapshots."""
+
+import pytest
+
+from src.models import CoinRegistry
+from src.utils.snapshot import SNAPSHOT_VERSION, SnapshotError, read_snapshot, write_snapshot
+
+CG_COINS = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+    {"id": "batcat", "symbol": "btc", "name": "Batcat"},
+    {"id": "nan-ë", "symbol": "ë", "name": "Ünïcödé 🚀"},
+]
+CMC_COINS = [
+    {"id": 1027, "symbol": "ETH", "name": "Ethereum", "rank": 2},
+    {"id": 1, "symbol": "BTC", "name": "Bitcoin", "rank": 1},
+    {"id": 9000, "symbol": "ETH", "name": "Ether Clone"},
+]
+
+
+class TestSnapshot:
+    """Tests for writing and reading registry snapshots."""
+
+    @pytest.mark.parametrize("items", [CG_COINS, CMC_COINS, []])
+    def test_round_trip(self, tmp_path, items):
+        """Test that a registry and its creation time survive a round trip."""
+        registry = CoinRegistry.from_dicts(items)
+        path = tmp_path / "coins.snapshot"
+        write_snapshot(path, registry, created_at=1_700_000_000.5)
+
+        loaded, created_at = read_snapshot(path)
+        assert created_at == 1_700_000_000.5
+        assert list(loaded) == list(registry)
+        for symbol in {item["symbol"] for item in items}:
+            assert loaded.ids_for_symbol(symbol) == registry.ids_for_symbol(symbol)
+
+    def test_replace_leaves_no_temporary_files(self, tmp_path):
+        """Test that rewriting a snapshot replaces it in place."""
+        path = tmp_path / "coins.snapshot"
+        write_snapshot(path, CoinRegistry.from_dicts(CG_COINS), created_at=1.0)
+        write_snapshot(path, CoinRegistry.from_dicts(CG_COINS[:1]), created_at=2.0)
+        assert [p.name for p in tmp_path.iterdir()] == ["coins.snapshot"]
+        registry, created_at = read_snapshot(path)
+        assert (len(registry), created_at) == (1, 2.0)
+
+    def test_corruption_is_detected(self, tmp_path):
+        """Test that a flipped payload byte fails the checksum."""
+        path = tmp_path / "coins.snapshot"
+        write_snapshot(path, CoinRegistry.from_dicts(CG_COINS), created_at=1.0)
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+        with pytest.raises(SnapshotError, match="checksum"):
+            read_snapshot(path)
+
+    def test_truncated_file_is_rejected(self, tmp_path):
+        """Test that truncated and empty files are rejected."""
+        path = tmp_path / "coins.snapshot"
+        write_snapshot(path, CoinRegistry.from_dicts(CG_COINS), created_at=1.0)
+        path.write_bytes(path.read_bytes()[:-3])
+        with pytest.raises(SnapshotError):
+            read_snapshot(path)
+        path.write_bytes(b"")
+        with pytest.raises(SnapshotError):
+            read_snapshot(path)
+
+    def test_other_version_is_rejected(self, tmp_path):
+        """Test that snapshots of another format version are not loaded."""
+        path = tmp_path / "coins.snapshot"
+        write_snapshot(path, CoinRegistry.from_dicts(CG_COINS), created_at=1.0)
+        data = bytearray(path.read_bytes())
+        data[8:10] = (SNAPSHOT_VERSION + 1).to_bytes(2, "little")
+        path.write_bytes(bytes(data))
+        with pytest.raises(SnapshotError, match="version"):
+            read_snapshot(path)
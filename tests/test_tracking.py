@@ -0,0 +1,122 @@
+"""Tests for batched call tracking."""
+
+import asyncio
+import json
+
+from src.utils.tracking import CallTracker
+
+
+class RecordingSender:
+    """Batch sender that records deliveries and fails a configurable number of times."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.batches: list[list[dict]] = []
+
+    async def __call__(self, batch: list[dict]) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("hcpb-api unavailable")
+        self.batches.append(batch)
+
+
+def _tracker(send, tmp_path, **overrides) -> CallTracker:
+    options = {"max_queue": 100, "batch_size": 3, "flush_interval": 0.05, "backoff": 0.001}
+    options.update(overrides)
+    return CallTracker(send=send, spill_path=tmp_path / "spill.jsonl", **options)
+
+
+class TestCallTracker:
+    """Tests for CallTracker."""
+
+    def test_flushes_full_batches_and_on_interval(self, tmp_path):
+        """Test that events are sent in batches of batch_size, and leftovers after the interval."""
+        sender = RecordingSender()
+
+        async def scenario():
+            tracker = _tracker(sender, tmp_path)
+            tracker.start()
+            for i in range(4):
+                tracker.record({"chat_id": str(i)})
+            await asyncio.sleep(0.2)
+            await tracker.stop()
+
+        asyncio.run(scenario())
+        assert [len(batch) for batch in sender.batches] == [3, 1]
+
+    def test_record_drops_when_queue_full(self, tmp_path):
+        """Test that recording never blocks and drops events beyond the queue bound."""
+        tracker = _tracker(RecordingSender(), tmp_path, max_queue=2)
+        assert tracker.record({"chat_id": "1"})
+        assert tracker.record({"chat_id": "2"})
+        assert not tracker.record({"chat_id": "3"})
+        assert tracker.pending == 2
+
+    def test_retries_before_succeeding(self, tmp_path):
+        """Test that transient failures are retried."""
+        sender = RecordingSender(failures=2)
+
+        async def scenario():
+            return await _tracker(sender, tmp_path).flush([{"chat_id": "1"}])
+
+        assert asyncio.run(scenario())
+        assert sender.batches == [[{"chat_id": "1"}]]
+
+    def test_spills_and_replays_after_recovery(self, tmp_path):
+        """Test that undeliverable batches are spilled to disk and replayed after the next success."""
+        sender = RecordingSender(failures=3)
+
+        async def scenario():
+            tracker = _tracker(sender, tmp_path)
+            assert not await tracker.flush([{"chat_id": "1"}])
+            spilled = [json.loads(line) for line in tracker.spill_path.read_text().splitlines()]
+            assert spilled == [{"chat_id": "1"}]
+            assert await tracker.flush([{"chat_id": "2"}])
+            assert not tracker.spill_path.exists()
+
+        asyncio.run(scenario())
+        assert sender.batches == [[{"chat_id": "2"}], [{"chat_id": "1"}]]
+
+    def test_replay_skips_corrupt_spill_lines(self, tmp_path):
+        """Test that a truncated spill line is skipped and the other spilled events are still delivered."""
+        sender = RecordingSender()
+
+        async def scenario():
+            tracker = _tracker(sender, tmp_path)
+            tracker.spill_path.write_text('{"chat_id": "1"}\n{"chat_id": "2"}\n{"chat_\n')
+            assert await tracker.flush([{"chat_id": "3"}])
+            assert not tracker.spill_path.exists()
+
+        asyncio.run(scenario())
+        assert sender.batches == [[{"chat_id": "3"}], [{"chat_id": "1"}, {"chat_id": "2"}]]
+
+    def test_stop_spills_half_gathered_batch(self, tmp_path):
+        """Test that events taken off the queue for a batch still being gathered are spilled on stop."""
+        sender = RecordingSender()
+
+        async def scenario():
+            tracker = _tracker(sender, tmp_path, flush_interval=10)
+            tracker.start()
+            tracker.record({"chat_id": "1"})
+            tracker.record({"chat_id": "2"})
+            await asyncio.sleep(0.05)
+            assert tracker.pending == 0
+            await tracker.stop()
+            return [json.loads(line) for line in tracker.spill_path.read_text().splitlines()]
+
+        assert asyncio.run(scenario()) == [{"chat_id": "1"}, {"chat_id": "2"}]
+        assert sender.batches == []
+
+    def test_stop_spills_batch_waiting_to_retry(self, tmp_path):
+        """Test that a batch sleeping in retry backoff is spilled on stop."""
+        sender = RecordingSender(failures=10)
+
+        async def scenario():
+            tracker = _tracker(sender, tmp_path, batch_size=1, backoff=10)
+            tracker.start()
+            tracker.record({"chat_id": "1"})
+            await asyncio.sleep(0.05)
+            await tracker.stop()
+            return [json.loads(line) for line in tracker.spill_path.read_text().splitlines()]
+
+        assert asyncio.run(scenario()) == [{"chat_id": "1"}]